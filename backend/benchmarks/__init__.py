@@ -0,0 +1 @@
+# Package de benchmarks de performance de l'API heptuple
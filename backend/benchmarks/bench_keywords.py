@@ -0,0 +1,74 @@
+"""
+Benchmark du comptage de mots-clés de HeptupleAnalyzer
+
+Compare l'ancienne implémentation (une regex \\b...\\b recompilée par mot-clé)
+à l'automate précompilé (normalisation et découpage en jetons compris),
+vérifie que les comptes sont identiques sur des textes non vocalisés et
+affiche le débit sur des textes longs.
+
+Usage (depuis le répertoire backend) :
+    python -m benchmarks.bench_keywords [--sizes 10000,100000,1000000] [--repeat 3]
+"""
+import argparse
+import re
+import time
+from typing import List
+
+from benchmarks.corpus import build_text
+from services.heptuple_analyzer import HeptupleAnalyzer
+from services.text_normalizer import tokenize
+
+def legacy_analyze_keywords(analyzer: HeptupleAnalyzer, text: str, language: str) -> List[float]:
+    """Implémentation d'origine (une recherche regex par mot-clé)"""
+    text_lower = text.lower()
+    scores = [0.0] * 7
+
+    for dim_id, keywords in analyzer.dimension_keywords.items():
+        lang_keywords = keywords.get(language, keywords.get('fr', []))
+
+        for keyword in lang_keywords:
+            pattern = r'\b' + re.escape(keyword.lower()) + r'\b'
+            matches = len(re.findall(pattern, text_lower))
+            scores[dim_id - 1] += matches * 10
+
+    return scores
+
+
+def time_call(func, repeat: int) -> float:
+    """Retourne le meilleur temps d'exécution (secondes) sur `repeat` essais"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du comptage de mots-clés")
+    parser.add_argument("--sizes", default="10000,100000,1000000",
+                        help="Tailles de texte en caractères, séparées par des virgules")
+    parser.add_argument("--repeat", type=int, default=3, help="Nombre d'essais par mesure")
+    args = parser.parse_args()
+
+    analyzer = HeptupleAnalyzer()
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+
+    print(f"{'langue':<7}{'taille':>10}{'ancien (ms)':>14}{'automate (ms)':>16}{'débit (Mo/s)':>15}{'gain':>8}")
+    for language in ('ar', 'fr', 'en'):
+        for size in sizes:
+            text = build_text(language, size, dimension_keywords=analyzer.dimension_keywords)
+            expected = legacy_analyze_keywords(analyzer, text, language)
+            actual = analyzer._analyze_keywords(tokenize(text), language)
+            if expected != actual:
+                raise SystemExit(f"Divergence ({language}, {size}): {expected} != {actual}")
+
+            legacy_time = time_call(lambda: legacy_analyze_keywords(analyzer, text, language), args.repeat)
+            new_time = time_call(lambda: analyzer._analyze_keywords(tokenize(text), language), args.repeat)
+            throughput = len(text.encode('utf-8')) / new_time / 1e6
+            print(f"{language:<7}{size:>10}{legacy_time * 1000:>14.2f}{new_time * 1000:>16.2f}"
+                  f"{throughput:>15.1f}{legacy_time / new_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
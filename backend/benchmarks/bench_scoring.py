@@ -0,0 +1,76 @@
+"""
+Benchmark du re-scoring d'un corpus de versets par le moteur de scoring par lot
+
+Compare l'analyse texte par texte (analyze_text_heptuple) au scoring par lot
+de ScoringEngine, en NumPy et en Python pur, sur un corpus synthétique de la
+taille du Coran (6236 versets), et vérifie que les profils sont identiques.
+
+Usage (depuis le répertoire backend) :
+    python -m benchmarks.bench_scoring [--documents 6236] [--repeat 3]
+"""
+import argparse
+import random
+
+from benchmarks.bench_keywords import time_call
+from benchmarks.corpus import FILLER_WORDS
+from services.heptuple_analyzer import HeptupleAnalyzer
+from services.scoring_engine import ScoringEngine, np
+from services.text_normalizer import tokenize
+
+
+def build_corpus(analyzer: HeptupleAnalyzer, documents: int, seed: int = 42):
+    """Génère des versets synthétiques de 5 à 60 mots, toutes langues mêlées"""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(documents):
+        language = rng.choice(('ar', 'fr', 'en'))
+        keywords = [kw for kws in analyzer.dimension_keywords.values() for kw in kws[language]]
+        words = [rng.choice(keywords) if rng.random() < 0.15 else rng.choice(FILLER_WORDS[language])
+                 for _ in range(rng.randint(5, 60))]
+        corpus.append(' '.join(words))
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du scoring par lot")
+    parser.add_argument("--documents", type=int, default=6236, help="Nombre de versets du corpus")
+    parser.add_argument("--repeat", type=int, default=3, help="Nombre d'essais par mesure")
+    args = parser.parse_args()
+
+    analyzer = HeptupleAnalyzer()
+    corpus = build_corpus(analyzer, args.documents)
+
+    def score_one_by_one():
+        return [analyzer.analyze_text_heptuple(text) for text in corpus]
+
+    expected = [(r.profil_heptuple.to_array(), r.confidence_scores) for r in score_one_by_one()]
+    reference_time = time_call(score_one_by_one, args.repeat)
+    print(f"{'moteur':<22}{'total (ms)':>12}{'scoring (ms)':>14}{'gain':>8}")
+    print(f"{'texte par texte':<22}{reference_time * 1000:>12.1f}{'-':>14}{'1.0x':>8}")
+
+    backends = [False] + ([True] if np is not None else [])
+    for use_numpy in backends:
+        engine = ScoringEngine(analyzer.dimension_keywords, use_numpy=use_numpy)
+
+        def score_batch():
+            streams = [tokenize(text) for text in corpus]
+            languages = [analyzer.detect_language(stream) for stream in streams]
+            return engine.score(streams, languages)
+
+        batch = score_batch()
+        if [(p, c) for p, c in zip(batch.normalized, batch.confidence)] != expected:
+            raise SystemExit(f"Divergence du moteur {engine.backend}")
+
+        streams = [tokenize(text) for text in corpus]
+        languages = [analyzer.detect_language(stream) for stream in streams]
+        total_time = time_call(score_batch, args.repeat)
+        scoring_time = time_call(lambda: engine.score(streams, languages), args.repeat)
+        print(f"{'lot ' + engine.backend:<22}{total_time * 1000:>12.1f}{scoring_time * 1000:>14.1f}"
+              f"{reference_time / total_time:>7.1f}x")
+
+    if np is None:
+        print("NumPy non installé : seul le moteur Python pur a été mesuré")
+
+
+if __name__ == "__main__":
+    main()
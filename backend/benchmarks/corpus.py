@@ -0,0 +1,85 @@
+"""
+Textes de benchmark : corpus extrait des fichiers SQL du dépôt et textes synthétiques
+"""
+import random
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from services.lexicon import DEFAULT_DIMENSION_KEYWORDS
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+CORPUS_FILES = ("sourates_complete.sql", "extensions_references.sql")
+
+# Littéraux SQL entre apostrophes ('' pour une apostrophe échappée)
+_SQL_STRING = re.compile(r"'((?:[^']|'')*)'")
+
+FILLER_WORDS = {
+    'ar': ['في', 'من', 'على', 'قال', 'كان', 'الذين', 'هذا', 'إلى', 'عن', 'ما'],
+    'fr': ['le', 'la', 'de', 'et', 'dans', 'que', 'les', 'pour', 'par', 'avec'],
+    'en': ['the', 'and', 'of', 'to', 'in', 'that', 'is', 'for', 'with', 'as'],
+}
+
+SYNTHETIC_SIZES = {
+    "1KB": 1_000,
+    "10KB": 10_000,
+    "100KB": 100_000,
+    "1MB": 1_000_000,
+    "10MB": 10_000_000,
+}
+
+
+def _insert_statements(content: str) -> str:
+    """Texte des requêtes INSERT d'un script SQL, sans les lignes de commentaire"""
+    lines = []
+    inside = False
+    for line in content.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("--"):
+            continue
+        if stripped.upper().startswith("INSERT INTO"):
+            inside = True
+        if inside:
+            lines.append(line)
+            if stripped.endswith(";"):
+                inside = False
+    return "\n".join(lines)
+
+
+def load_sql_corpus(files: Sequence[str] = CORPUS_FILES, min_words: int = 4) -> List[str]:
+    """Extrait les textes (littéraux d'au moins ``min_words`` mots) des INSERT des fichiers SQL du dépôt"""
+    texts = []
+    for name in files:
+        path = REPO_ROOT / name
+        if not path.exists():
+            continue
+        statements = _insert_statements(path.read_text(encoding="utf-8"))
+        for match in _SQL_STRING.finditer(statements):
+            text = match.group(1).replace("''", "'")
+            if len(text.split()) >= min_words:
+                texts.append(text)
+    return texts
+
+
+def build_text(language: str, size: int, seed: int = 42,
+               dimension_keywords: Optional[Dict] = None) -> str:
+    """Génère un texte synthétique de ``size`` caractères mêlant mots-clés et mots de remplissage"""
+    rng = random.Random(seed)
+    keywords = [kw for kws in (dimension_keywords or DEFAULT_DIMENSION_KEYWORDS).values() for kw in kws[language]]
+    words = FILLER_WORDS[language]
+    parts = []
+    length = 0
+    while length < size:
+        word = rng.choice(keywords) if rng.random() < 0.1 else rng.choice(words)
+        if rng.random() < 0.05:
+            word = word.capitalize() + rng.choice(['.', ',', ' -', ';'])
+        parts.append(word)
+        length += len(word) + 1
+    return ' '.join(parts)[:size]
+
+
+def build_text_bytes(language: str, size_bytes: int, seed: int = 42) -> str:
+    """Texte synthétique d'environ ``size_bytes`` octets une fois encodé en UTF-8"""
+    text = build_text(language, size_bytes, seed)
+    encoded = text.encode("utf-8")[:size_bytes]
+    return encoded.decode("utf-8", errors="ignore")
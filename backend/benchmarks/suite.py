@@ -0,0 +1,227 @@
+"""
+Suite de benchmarks de l'analyseur heptuple
+
+Mesure analyze_text_heptuple, detect_language et le scoring par lot
+(score_many, analyze_many) sur le corpus des fichiers SQL du dépôt et sur des
+textes synthétiques de 1 Ko à 10 Mo en arabe, français et anglais : latences
+(p50, p95, p99), débit et pic mémoire (tracemalloc). Les résultats sont
+enregistrés dans un fichier JSON de référence ; le mode compare signale les
+régressions par rapport à cette référence.
+
+Usage (depuis le répertoire backend) :
+    python -m benchmarks.suite run [--output benchmarks/baseline.json] [--quick] [--max-size 1MB]
+    python -m benchmarks.suite compare benchmarks/baseline.json [current.json] [--threshold 0.2]
+
+Sans fichier actuel, compare relance la suite avec les paramètres de la
+référence (--quick, --max-size).
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Sequence
+
+from benchmarks.bench_scoring import build_corpus
+from benchmarks.corpus import SYNTHETIC_SIZES, build_text_bytes, load_sql_corpus
+from services.heptuple_analyzer import HeptupleAnalyzer
+
+LANGUAGES = ('ar', 'fr', 'en')
+
+# Taille de lot du scoring (nombre de versets du Coran)
+BATCH_SIZE = 6236
+
+# Métriques comparées : une hausse au-delà du seuil est une régression
+COMPARED_METRICS = ("p50_ms", "p95_ms", "peak_memory_kb")
+# Paramètres d'exécution repris par compare : deux rapports ne se comparent qu'à paramètres égaux
+RUN_PARAMETERS = ("quick", "max_size")
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Percentile par interpolation linéaire"""
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def numpy_version():
+    """Version de NumPy installée (None sans NumPy) : le scoring par lot en dépend"""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy.__version__
+
+
+def peak_memory_kb(func: Callable[[], object]) -> float:
+    """Pic d'allocation (Ko) d'un appel, mesuré par tracemalloc"""
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / 1024, 1)
+
+
+def measure(calls: List[Callable[[], object]], size_bytes: int, items: int, repeat: int) -> Dict:
+    """Mesure une série d'appels : latences par appel, débit et pic mémoire de la série"""
+    # Premier passage hors mesure (caches de normalisation, imports paresseux)
+    calls[0]()
+
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for call in calls:
+            call_start = time.perf_counter()
+            call()
+            latencies.append((time.perf_counter() - call_start) * 1000)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "calls": len(latencies),
+        "p50_ms": round(percentile(latencies, 50), 4),
+        "p95_ms": round(percentile(latencies, 95), 4),
+        "p99_ms": round(percentile(latencies, 99), 4),
+        "mean_ms": round(statistics.fmean(latencies), 4),
+        "throughput_mb_s": round(size_bytes * repeat / elapsed / 1_000_000, 3),
+        "items_per_s": round(items * repeat / elapsed, 1),
+        "peak_memory_kb": peak_memory_kb(lambda: [call() and None for call in calls]),
+    }
+
+
+def run_suite(quick: bool = False, max_size: str = "10MB") -> Dict:
+    """Exécute tous les benchmarks et renvoie le rapport (métadonnées et résultats)"""
+    analyzer = HeptupleAnalyzer()
+    corpus = load_sql_corpus()
+    if not corpus:
+        raise SystemExit("Corpus SQL introuvable (sourates_complete.sql, extensions_references.sql)")
+    corpus_bytes = sum(len(text.encode("utf-8")) for text in corpus)
+    repeat = 3 if quick else 10
+    size_limit = SYNTHETIC_SIZES[max_size]
+    results: Dict[str, Dict] = {}
+
+    def run(name: str, calls: List[Callable[[], object]], size_bytes: int, items: int, times: int = repeat):
+        results[name] = measure(calls, size_bytes, items, times)
+        print(f"{name:<34}p50 {results[name]['p50_ms']:>10.3f} ms  p99 {results[name]['p99_ms']:>10.3f} ms  "
+              f"{results[name]['throughput_mb_s']:>8.2f} Mo/s  {results[name]['peak_memory_kb']:>10.1f} Ko")
+
+    # Textes réels : un appel par texte du corpus
+    run("analyze/corpus", [lambda t=text: analyzer.analyze_text_heptuple(t) for text in corpus],
+        corpus_bytes, len(corpus))
+    run("detect_language/corpus", [lambda t=text: analyzer.detect_language(t) for text in corpus],
+        corpus_bytes, len(corpus))
+
+    # Textes synthétiques : moins de répétitions pour les gros volumes
+    for label, size in SYNTHETIC_SIZES.items():
+        if size > size_limit or (quick and size > 100_000):
+            continue
+        times = max(1, min(repeat, 10_000_000 // (size * 10)))
+        for language in LANGUAGES:
+            text = build_text_bytes(language, size)
+            text_bytes = len(text.encode("utf-8"))
+            run(f"analyze/{language}/{label}", [lambda t=text: analyzer.analyze_text_heptuple(t)],
+                text_bytes, 1, times)
+            run(f"detect_language/{language}/{label}", [lambda t=text: analyzer.detect_language(t)],
+                text_bytes, 1, times)
+
+    # Scoring par lot : versets synthétiques distincts, à la taille du Coran (analyze_many
+    # n'analyse qu'une fois chaque doublon, le débit est compté en textes distincts)
+    batch = build_corpus(analyzer, BATCH_SIZE // 10 if quick else BATCH_SIZE)
+    batch_texts = len(set(batch))
+    batch_bytes = sum(len(text.encode("utf-8")) for text in set(batch))
+    batch_repeat = max(1, repeat // 3)
+    run("batch/score_many", [lambda: analyzer.score_many(batch)], batch_bytes, batch_texts, batch_repeat)
+    run("batch/analyze_many", [lambda: analyzer.analyze_many(batch)], batch_bytes, batch_texts, batch_repeat)
+
+    return {
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": numpy_version(),
+            "analyzer_version": analyzer.VERSION,
+            "lexicon_hash": analyzer.lexicon_hash,
+            "quick": quick,
+            "max_size": max_size,
+            "corpus_texts": len(corpus),
+            "batch_texts": batch_texts,
+        },
+        "results": results,
+    }
+
+
+def compare_reports(baseline: Dict, current: Dict, threshold: float) -> List[str]:
+    """Compare deux rapports et renvoie la liste des régressions (hausse relative > threshold)"""
+    regressions = []
+    for parameter in RUN_PARAMETERS:
+        if baseline["meta"].get(parameter) != current["meta"].get(parameter):
+            print(f"Attention : {parameter} diffère ({baseline['meta'].get(parameter)} -> "
+                  f"{current['meta'].get(parameter)}), les mesures ne sont pas comparables")
+    print(f"{'benchmark':<34}{'métrique':<16}{'référence':>12}{'actuel':>12}{'écart':>9}")
+    for name, reference in baseline["results"].items():
+        measured = current["results"].get(name)
+        if measured is None:
+            continue
+        for metric in COMPARED_METRICS:
+            before, after = reference[metric], measured[metric]
+            delta = (after - before) / before if before else 0.0
+            flag = ""
+            if delta > threshold:
+                flag = "  RÉGRESSION"
+                regressions.append(f"{name} {metric}: {before} -> {after} (+{delta:.0%})")
+            print(f"{name:<34}{metric:<16}{before:>12.3f}{after:>12.3f}{delta:>+8.0%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suite de benchmarks de l'analyseur heptuple")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Exécute les benchmarks et enregistre les résultats")
+    run_parser.add_argument("--output", default="benchmarks/baseline.json", help="Fichier JSON de résultats")
+    run_parser.add_argument("--quick", action="store_true", help="Moins de répétitions, textes jusqu'à 100KB")
+    run_parser.add_argument("--max-size", default="10MB", choices=list(SYNTHETIC_SIZES),
+                            help="Taille maximale des textes synthétiques")
+
+    compare_parser = commands.add_parser("compare", help="Compare des résultats à une référence")
+    compare_parser.add_argument("baseline", help="Fichier JSON de référence")
+    compare_parser.add_argument("current", nargs="?", help="Résultats à comparer (sinon, nouvelle exécution)")
+    compare_parser.add_argument("--threshold", type=float, default=0.2,
+                                help="Hausse relative tolérée avant de signaler une régression")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        report = run_suite(quick=args.quick, max_size=args.max_size)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Résultats enregistrés dans {args.output}")
+        return
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if args.current:
+        with open(args.current, encoding="utf-8") as f:
+            current = json.load(f)
+    else:
+        current = run_suite(quick=baseline["meta"].get("quick", False),
+                            max_size=baseline["meta"].get("max_size", "10MB"))
+
+    regressions = compare_reports(baseline, current, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} régression(s) au-delà de {args.threshold:.0%} :")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print("Aucune régression")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# Jobs hors ligne de précalcul sur le corpus
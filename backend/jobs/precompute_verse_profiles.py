@@ -0,0 +1,105 @@
+"""
+Précalcul des profils heptuple des versets
+
+Analyse le texte arabe de chaque verset et enregistre son profil dans
+profils_versets avec la version de l'analyseur, l'empreinte du lexique et
+celle du texte ; versets.dimension_principale est renseignée au passage.
+Seuls les versets sans profil ou au profil périmé sont recalculés, par lots
+répartis sur plusieurs processus, puis enregistrés par upsert groupé.
+
+Usage (depuis le répertoire backend) :
+    python -m jobs.precompute_verse_profiles [--workers 4] [--batch-size 500] [--force]
+"""
+import argparse
+import hashlib
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from database import DatabaseService, SessionLocal
+from services.heptuple_analyzer import HeptupleAnalyzer
+from services.lexicon import LexiconSnapshot, LexiconStore, load_configured_lexicon
+
+logger = logging.getLogger(__name__)
+
+SCORE_COLUMNS = [
+    "mysteres_score", "creation_score", "attributs_score", "eschatologie_score",
+    "tawhid_score", "guidance_score", "egarement_score",
+]
+
+# Analyseur propre à chaque processus de travail
+_worker_analyzer: Optional[HeptupleAnalyzer] = None
+
+
+def _init_worker(dimension_keywords: Mapping, source: str) -> None:
+    """Initialise l'analyseur d'un processus de travail avec le lexique du processus principal"""
+    global _worker_analyzer
+    _worker_analyzer = HeptupleAnalyzer(LexiconStore(LexiconSnapshot(dimension_keywords, source)))
+
+
+def score_versets(versets: List[Tuple[int, str]], analyzer: Optional[HeptupleAnalyzer] = None) -> List[Dict]:
+    """Calcule les lignes profils_versets d'un lot de versets (id, texte arabe)"""
+    analyzer = analyzer or _worker_analyzer
+    texts = [texte for _, texte in versets]
+    batch = analyzer.score_many(texts)
+
+    rows = []
+    for (verset_id, texte), scores, confidence in zip(versets, batch.normalized, batch.confidence):
+        row = dict(zip(SCORE_COLUMNS, scores))
+        row.update({
+            "verset_id": verset_id,
+            "dimension_principale": scores.index(max(scores)) + 1,
+            "confidence_score": round(sum(confidence) / len(confidence), 2),
+            "analyzer_version": analyzer.VERSION,
+            "lexicon_hash": analyzer.lexicon_hash,
+            "texte_hash": hashlib.md5(texte.encode("utf-8")).hexdigest(),
+        })
+        rows.append(row)
+    return rows
+
+
+def precompute_verse_profiles(workers: int = 1, batch_size: int = 500, force: bool = False) -> int:
+    """Recalcule les profils périmés et renvoie le nombre de versets traités"""
+    db = SessionLocal()
+    try:
+        # Même lexique que l'API (LEXICON_SOURCE), pour des empreintes cohérentes
+        analyzer = HeptupleAnalyzer(LexiconStore())
+        lexicon = load_configured_lexicon(analyzer.lexicon, db=db)
+        db_service = DatabaseService(db)
+        stale = db_service.get_stale_versets(analyzer.VERSION, analyzer.lexicon_hash, force=force)
+        logger.info(f"{len(stale)} versets à (re)calculer (analyseur {analyzer.VERSION}, lexique {analyzer.lexicon_hash})")
+        if not stale:
+            return 0
+
+        batches = [stale[i:i + batch_size] for i in range(0, len(stale), batch_size)]
+        if workers > 1 and len(batches) > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(lexicon.to_dict(), lexicon.source)) as pool:
+                for rows in pool.map(score_versets, batches):
+                    db_service.upsert_verse_profiles(rows)
+        else:
+            for batch in batches:
+                db_service.upsert_verse_profiles(score_versets(batch, analyzer))
+        return len(stale)
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Précalcul des profils heptuple des versets")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1),
+                        help="Nombre de processus d'analyse")
+    parser.add_argument("--batch-size", type=int, default=500, help="Versets par lot (analyse et upsert)")
+    parser.add_argument("--force", action="store_true", help="Recalcule tous les versets, même à jour")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    start = time.perf_counter()
+    count = precompute_verse_profiles(workers=args.workers, batch_size=args.batch_size, force=args.force)
+    logger.info(f"{count} profils de versets enregistrés en {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,10 @@
-from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks, status
+from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from typing import List, Optional, Dict
+import asyncio
 import os
 import time
 import hashlib
@@ -16,20 +17,33 @@ from passlib.hash import bcrypt
 
 # Import des modèles et services
 from models import (
-    ProfilHeptuple, AnalyseRequest, AnalyseResponse, 
+    ProfilHeptuple, AnalyseRequest, AnalyseBatchRequest, AnalyseResponse, 
     ComparisonRequest, SearchRequest, SearchResult,
     FeedbackRequest, Sourate, Verset, DimensionType,
     HadithModel, ExegeseModel, CitationModel, HistoireModel,
-    UserCreate, UserLogin, Token, UserResponse
+    UserCreate, UserLogin, Token, UserResponse, UniversalSearchRequest, SimilarTextRequest
 )
 from services.heptuple_analyzer import HeptupleAnalyzer
+from services.analysis_executor import AnalysisExecutor
+from services.scoring_engine import sliding_window_scores
+from services.analysis_stream import (
+    STREAM_FORMATS, RequestBodyStreamingResponse, format_stream_event, iter_analysis_text
+)
 from services.auth_service import AuthService
-from services.search_service import SearchService
+from services.local_cache import LocalCache
+from services.lexicon import load_configured_lexicon
+from services.search_backends import create_search_backend
+from services.search_service import FUZZY_SEARCH_TYPES, FUZZY_THRESHOLD, SearchFanout, SearchService
+from services.suggest_index import SUGGEST_MAX_LIMIT, SUGGEST_TYPES, SuggestIndex
+from services.similarity_index import SIMILARITY_MAX_K, SIMILARITY_TYPES, SimilarityIndex, profile_scores
+from services.sourate_catalog import SourateCatalog
+from services.pagination import decode_after, decode_cursor, encode_cursor, paginate
 from services import DeepSeekService
 from models import ChatRequest, ChatResponse
-from database import get_db, DatabaseService, check_database_connection, User
+from database import get_db, DatabaseService, SessionLocal, check_database_connection, User, parse_profile_ranges
 from services.redis_service import RedisService
 from sqlalchemy.orm import Session
+from starlette.requests import ClientDisconnect
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
@@ -45,6 +59,26 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
 
+# Nombre maximum de textes par lot d'analyse
+ANALYZE_BATCH_MAX_SIZE = int(os.getenv("ANALYZE_BATCH_MAX_SIZE", "500"))
+
+# Largeur maximale de la fenêtre de lissage de /api/v2/sourates/{numero}/timeline
+TIMELINE_MAX_WINDOW = 50
+
+# Taille maximale (en caractères) d'un texte analysé en flux
+ANALYZE_STREAM_MAX_CHARS = int(os.getenv("ANALYZE_STREAM_MAX_CHARS", "50000000"))
+
+# Moteur de recherche classée (postgres, memory ou elasticsearch) et période de rafraîchissement de son index
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "memory")
+SEARCH_INDEX_REFRESH_SECONDS = int(os.getenv("SEARCH_INDEX_REFRESH_SECONDS", "300"))
+
+# Période de vérification du lexique publié par /api/v2/admin/lexicon/reload (un rechargement
+# atteint les autres workers uvicorn au plus tard après ce délai)
+LEXICON_SYNC_SECONDS = int(os.getenv("LEXICON_SYNC_SECONDS", "10"))
+
+# Taille maximale d'une page de résultats de recherche (pagination par curseur)
+SEARCH_MAX_PAGE_SIZE = int(os.getenv("SEARCH_MAX_PAGE_SIZE", "100"))
+
 # Configuration CORS sécurisée
 ALLOWED_ORIGINS = os.getenv("ALLOWED_ORIGINS", "http://localhost:3000,http://localhost:8080").split(",")
 ALLOWED_HOSTS = os.getenv("ALLOWED_HOSTS", "localhost,127.0.0.1").split(",")
@@ -73,12 +107,111 @@ app.add_middleware(
 
 # Initialisation des services
 analyzer = HeptupleAnalyzer()
+analysis_executor = AnalysisExecutor(analyzer)
 auth_service = AuthService()
 redis_service = RedisService()
 deepseek_service = DeepSeekService() if DeepSeekService else None
 
-# Cache simple en mémoire (fallback si Redis indisponible)
-analysis_cache = {}
+# Cache LRU en mémoire devant Redis (sert aussi de repli si Redis est indisponible)
+analysis_cache = LocalCache()
+
+# Moteur de recherche des corpus (plein texte en base tant que son index n'est pas construit)
+search_backend = create_search_backend(SEARCH_BACKEND)
+
+# Autocomplétion par préfixe, servie depuis la mémoire
+suggest_index = SuggestIndex()
+
+# Plus proches voisins des profils heptuple (sourates, versets précalculés)
+similarity_index = SimilarityIndex(analyzer)
+
+# Sourates et profils heptuple en mémoire (recherche, comparaison)
+sourate_catalog = SourateCatalog()
+
+# Recherche universelle : sources en parallèle, une connexion par source
+search_fanout = SearchFanout(SessionLocal, search_backend, catalog=sourate_catalog)
+
+def ensure_sourate_catalog(db: Session) -> None:
+    """Charge le catalogue des sourates au premier appel s'il ne l'est pas encore"""
+    if not sourate_catalog.ready:
+        sourate_catalog.build(db)
+
+def update_search_index(index, full: bool = False) -> Dict[str, int]:
+    """Construit ou rafraîchit un index de recherche (moteur, suggestions) avec une session dédiée"""
+    db = SessionLocal()
+    try:
+        return index.build(db) if full else index.refresh(db)
+    finally:
+        db.close()
+
+async def refresh_search_index_periodically():
+    """Construit les index de recherche (catalogue, suggestions, similarité, moteur) puis les rafraîchit par incréments"""
+    indexes = [sourate_catalog, suggest_index, similarity_index] + ([search_backend] if search_backend.needs_indexing else [])
+    built = set()
+    while True:
+        for index in indexes:
+            full = index.name not in built
+            try:
+                counts = await asyncio.to_thread(update_search_index, index, full)
+                if full:
+                    logger.info(f"Index de recherche {index.name} construit: {counts}")
+                built.add(index.name)
+            except Exception as e:
+                log_error(e, f"Mise à jour de l'index de recherche {index.name} impossible")
+        await asyncio.sleep(SEARCH_INDEX_REFRESH_SECONDS)
+
+def sync_lexicon() -> bool:
+    """Recharge le lexique publié dans Redis s'il diffère de celui du worker ; vrai s'il a changé"""
+    published = redis_service.get_published_lexicon()
+    if not published or published.get("version") == analyzer.lexicon_hash:
+        return False
+    previous = analyzer.lexicon.snapshot
+    db = SessionLocal()
+    try:
+        lexicon = load_configured_lexicon(analyzer.lexicon, published.get("source"), db)
+    finally:
+        db.close()
+    if lexicon is previous:
+        return False
+    analysis_executor.reload_lexicon()
+    if lexicon.version != published.get("version"):
+        logger.warning(f"Lexique {lexicon.source} modifié depuis sa publication: "
+                       f"{published.get('version')} publié, {lexicon.version} chargé")
+    logger.info(f"Lexique synchronisé: {previous.version} -> {lexicon.version}")
+    return True
+
+async def sync_lexicon_periodically():
+    """Aligne le lexique du worker sur le dernier rechargement, fait par n'importe quel worker"""
+    while True:
+        try:
+            await asyncio.to_thread(sync_lexicon)
+        except Exception as e:
+            log_error(e, "Synchronisation du lexique impossible")
+        await asyncio.sleep(LEXICON_SYNC_SECONDS)
+
+@app.on_event("startup")
+async def startup_event():
+    """Charge le lexique configuré, démarre le pool d'exécution des analyses et l'index de recherche"""
+    db = SessionLocal()
+    try:
+        lexicon = load_configured_lexicon(analyzer.lexicon, db=db)
+        logger.info(f"Lexique chargé: source={lexicon.source}, version={lexicon.version}")
+    except Exception as e:
+        log_error(e, "Chargement du lexique impossible, lexique intégré conservé")
+    finally:
+        db.close()
+    analysis_executor.start()
+    app.state.search_index_task = asyncio.create_task(refresh_search_index_periodically())
+    app.state.lexicon_sync_task = asyncio.create_task(sync_lexicon_periodically())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Arrête les pools d'exécution (analyses, recherche universelle) et le rafraîchissement de l'index"""
+    analysis_executor.shutdown()
+    search_fanout.shutdown()
+    for name in ("search_index_task", "lexicon_sync_task"):
+        task = getattr(app.state, name, None)
+        if task is not None:
+            task.cancel()
 
 # Fonctions d'authentification
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -134,6 +267,69 @@ def get_text_hash(text: str) -> str:
     """Génère un hash pour un texte"""
     return hashlib.sha256(text.encode()).hexdigest()
 
+def get_analysis_cache_key(text_hash: str, include_confidence: bool, include_details: bool) -> str:
+    """Clé de cache d'une analyse : texte, options et versions de l'analyseur et du lexique"""
+    return (f"{text_hash}:c{int(include_confidence)}d{int(include_details)}"
+            f":{analyzer.VERSION}:{analyzer.lexicon_hash}")
+
+def get_cached_analyses(cache_keys: List[str]) -> List[Optional[Dict]]:
+    """Lit les analyses dans le cache local puis, pour les absentes, dans Redis (MGET)"""
+    results = analysis_cache.get_many(cache_keys)
+    missing = [i for i, cached in enumerate(results) if cached is None]
+    if missing:
+        from_redis = redis_service.get_cached_analyses([cache_keys[i] for i in missing])
+        promoted = {}
+        for i, cached in zip(missing, from_redis):
+            if cached is not None:
+                results[i] = promoted[cache_keys[i]] = cached
+        analysis_cache.set_many(promoted)
+    return results
+
+def cache_analyses(results: Dict[str, Dict], expire_seconds: int = 7200) -> None:
+    """Met en cache des analyses indexées par clé, en local et dans Redis"""
+    analysis_cache.set_many(results)
+    redis_service.cache_analyses(results, expire_seconds)
+
+def scores_to_dict(scores: List[int]) -> Dict[str, int]:
+    """Convertit un profil [7 scores] en dictionnaire par dimension"""
+    return dict(zip(ProfilHeptuple.model_fields, scores))
+
+def format_analysis_result(texte: str, analysis: AnalyseResponse) -> Dict:
+    """Convertit une analyse en structure conviviale pour le front"""
+    return {"texte_analyse": texte, **format_profile_result(analysis)}
+
+def format_profile_result(analysis: AnalyseResponse) -> Dict:
+    """Profil, dimension dominante et confiance d'une analyse, sans le texte"""
+    profil: ProfilHeptuple = analysis.profil_heptuple
+    scores_dict = {
+        "mysteres": profil.mysteres,
+        "creation": profil.creation,
+        "attributs": profil.attributs,
+        "eschatologie": profil.eschatologie,
+        "tawhid": profil.tawhid,
+        "guidance": profil.guidance,
+        "egarement": profil.egarement,
+    }
+
+    confidence_score = None
+    if analysis.confidence_scores:
+        confidence_score = round(sum(analysis.confidence_scores) / len(analysis.confidence_scores), 3)
+
+    return {
+        "dimension_dominante": int(analysis.dimension_dominante),
+        "scores": scores_dict,
+        "intensity_max": analysis.intensity_max,
+        "confidence_score": confidence_score,
+        "processing_time_ms": analysis.processing_time_ms,
+        "version": analysis.version,
+    }
+
+def get_page_size(limit: int) -> int:
+    """Taille de page demandée, bornée à SEARCH_MAX_PAGE_SIZE"""
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="limit doit être positif")
+    return min(limit, SEARCH_MAX_PAGE_SIZE)
+
 def log_error(error: Exception, context: str = ""):
     """Log une erreur avec contexte"""
     logger.error(f"{context}: {str(error)}", exc_info=True)
@@ -180,8 +376,11 @@ async def root():
         "timestamp": datetime.utcnow().isoformat(),
         "endpoints": {
             "analyze": "/api/v2/analyze",
+            "analyze_batch": "/api/v2/analyze/batch",
+            "analyze_stream": "/api/v2/analyze/stream",
             "sourates": "/api/v2/sourates",
             "compare": "/api/v2/compare",
+            "similar": "/api/v2/similar",
             "search": "/api/v2/search",
             "feedback": "/api/v2/feedback",
             "ai_chat": "/api/v2/ai/chat"
@@ -211,14 +410,14 @@ async def get_sourates(
             return cached_sourates
         
         db_service = DatabaseService(db)
-        sourates = db_service.get_sourates_all()
+        # Sourates et profil le plus récent de chacune en une seule requête
+        sourates = db_service.get_sourates_with_profile()
         
         if not sourates:
             raise HTTPException(status_code=404, detail="Aucune sourate trouvée dans la base de données")
         
         result = []
         for sourate in sourates:
-            profil = db_service.get_profil_heptuple_by_sourate(sourate.id)
             sourate_dict = {
                 "id": sourate.id,
                 "numero": sourate.numero,
@@ -229,15 +428,15 @@ async def get_sourates(
                 "profil_heptuple": None
             }
             
-            if profil:
+            if sourate.profil_id is not None:
                 sourate_dict["profil_heptuple"] = {
-                    "mysteres": profil.mysteres_score,
-                    "creation": profil.creation_score,
-                    "attributs": profil.attributs_score,
-                    "eschatologie": profil.eschatologie_score,
-                    "tawhid": profil.tawhid_score,
-                    "guidance": profil.guidance_score,
-                    "egarement": profil.egarement_score
+                    "mysteres": sourate.mysteres_score,
+                    "creation": sourate.creation_score,
+                    "attributs": sourate.attributs_score,
+                    "eschatologie": sourate.eschatologie_score,
+                    "tawhid": sourate.tawhid_score,
+                    "guidance": sourate.guidance_score,
+                    "egarement": sourate.egarement_score
                 }
             
             result.append(sourate_dict)
@@ -261,32 +460,107 @@ async def get_sourates(
 
 @app.get("/api/v2/sourates/{numero}", response_model=Dict)
 async def get_sourate(numero: int, db: Session = Depends(get_db)):
-    """Récupère une sourate spécifique par son numéro"""
+    """Récupère une sourate spécifique par son numéro (catalogue en mémoire)"""
+    ensure_sourate_catalog(db)
+    s = sourate_catalog.get_by_numero(numero)
+    if not s:
+        raise HTTPException(status_code=404, detail=f"Sourate {numero} non trouvée")
+    return s.to_dict()
+
+@app.get("/api/v2/sourates/{numero}/versets", response_model=List[Dict])
+async def get_sourate_versets(numero: int, db: Session = Depends(get_db)):
+    """Versets d'une sourate avec leur profil heptuple précalculé (job jobs.precompute_verse_profiles)"""
     db_service = DatabaseService(db)
-    s = db_service.get_sourate_by_numero(numero)
+    ensure_sourate_catalog(db)
+    s = sourate_catalog.get_by_numero(numero)
     if not s:
         raise HTTPException(status_code=404, detail=f"Sourate {numero} non trouvée")
-    profil = db_service.get_profil_heptuple_by_sourate(s.id)
-    sourate_dict = {
-        "id": s.id,
-        "numero": s.numero,
-        "nom_arabe": s.nom_arabe,
-        "nom_francais": s.nom_francais,
-        "type_revelation": s.type_revelation,
-        "nombre_versets": s.nombre_versets,
-        "profil_heptuple": None
-    }
-    if profil:
-        sourate_dict["profil_heptuple"] = {
-            "mysteres": profil.mysteres_score,
-            "creation": profil.creation_score,
-            "attributs": profil.attributs_score,
-            "eschatologie": profil.eschatologie_score,
-            "tawhid": profil.tawhid_score,
-            "guidance": profil.guidance_score,
-            "egarement": profil.egarement_score
+    
+    versets = []
+    for v, profil in db_service.get_versets_with_profiles(s.id, analyzer.VERSION, analyzer.lexicon_hash):
+        verset_dict = {
+            "id": v.id,
+            "numero_verset": v.numero_verset,
+            "texte_arabe": v.texte_arabe,
+            "traduction_francaise": v.traduction_francaise,
+            "dimension_principale": v.dimension_principale,
+            "profil_heptuple": None,
+            "confidence_score": None
         }
-    return sourate_dict
+        # Profil absent ou périmé : renvoyé à null plutôt que recalculé à la volée
+        if profil:
+            verset_dict["profil_heptuple"] = {
+                "mysteres": profil.mysteres_score,
+                "creation": profil.creation_score,
+                "attributs": profil.attributs_score,
+                "eschatologie": profil.eschatologie_score,
+                "tawhid": profil.tawhid_score,
+                "guidance": profil.guidance_score,
+                "egarement": profil.egarement_score
+            }
+            verset_dict["confidence_score"] = float(profil.confidence_score) if profil.confidence_score is not None else None
+        versets.append(verset_dict)
+    return versets
+
+@app.get("/api/v2/sourates/{numero}/timeline", response_model=Dict)
+async def get_sourate_timeline(numero: int, window: int = 5, db: Session = Depends(get_db)):
+    """Profil heptuple de chaque verset d'une sourate et courbe lissée sur une fenêtre glissante"""
+    if not 1 <= window <= TIMELINE_MAX_WINDOW:
+        raise HTTPException(status_code=400, detail=f"La fenêtre doit être comprise entre 1 et {TIMELINE_MAX_WINDOW}")
+    try:
+        cache_key = f"timeline:{numero}:{window}:{analyzer.VERSION}:{analyzer.lexicon_hash}"
+        cached = analysis_cache.get(cache_key)
+        if cached is None:
+            cached = redis_service.get_cache(cache_key)
+            if cached is not None:
+                analysis_cache.set(cache_key, cached)
+        if cached is not None:
+            return cached
+        
+        start_time = time.time()
+        db_service = DatabaseService(db)
+        ensure_sourate_catalog(db)
+        s = sourate_catalog.get_by_numero(numero)
+        if not s:
+            raise HTTPException(status_code=404, detail=f"Sourate {numero} non trouvée")
+        versets = db_service.get_versets_by_sourate(s.id)
+        
+        # Scoring de tous les versets en une passe, puis fenêtres par sommes glissantes
+        batch = await analysis_executor.run("score_many", [v.texte_arabe for v in versets])
+        smoothed = sliding_window_scores(batch.raw, window)
+        
+        timeline = {
+            "sourate": {"id": s.id, "numero": s.numero, "nom_arabe": s.nom_arabe, "nom_francais": s.nom_francais},
+            "window": window,
+            "version": analyzer.VERSION,
+            "versets": [
+                {
+                    "numero_verset": v.numero_verset,
+                    "dimension_dominante": scores.index(max(scores)) + 1,
+                    "scores": scores_to_dict(scores),
+                    "confidence_score": round(sum(confidence) / len(confidence), 3)
+                }
+                for v, scores, confidence in zip(versets, batch.normalized, batch.confidence)
+            ],
+            "lissage": [
+                {
+                    "numero_verset": v.numero_verset,
+                    "dimension_dominante": scores.index(max(scores)) + 1,
+                    "scores": scores_to_dict(scores)
+                }
+                for v, scores in zip(versets, smoothed)
+            ],
+            "processing_time_ms": int((time.time() - start_time) * 1000)
+        }
+        
+        analysis_cache.set(cache_key, timeline)
+        redis_service.set_cache(cache_key, timeline, 3600)
+        return timeline
+    except HTTPException:
+        raise
+    except Exception as e:
+        log_error(e, f"Erreur lors du calcul de la timeline de la sourate {numero}")
+        raise HTTPException(status_code=500, detail="Erreur lors du calcul de la timeline")
 
 @app.post("/api/v2/analyze")
 async def analyze_text(
@@ -296,57 +570,35 @@ async def analyze_text(
 ):
     """Analyse un texte selon la vision heptuple de la Fatiha"""
     try:
-        # Génération du hash du texte pour le cache
+        # Génération du hash du texte et de la clé de cache (options et version comprises)
         text_hash = get_text_hash(request.texte)
+        cache_key = get_analysis_cache_key(text_hash, request.include_confidence, request.include_details)
         
-        # Vérification du cache Redis
-        cached_analysis = redis_service.get_cached_analysis(text_hash)
+        # Vérification du cache local puis Redis
+        cached_analysis = get_cached_analyses([cache_key])[0]
         if cached_analysis:
             logger.info(f"Analyse récupérée du cache pour le texte: {request.texte[:50]}...")
             return cached_analysis
         
-        # Analyse du texte
-        analysis: AnalyseResponse = analyzer.analyze_text_heptuple(
+        # Analyse du texte (hors de la boucle d'événements)
+        analysis: AnalyseResponse = await analysis_executor.analyze(
             request.texte, 
             include_confidence=request.include_confidence, 
             include_details=request.include_details
         )
 
         # Conversion en structure conviviale pour le front
-        profil: ProfilHeptuple = analysis.profil_heptuple
-        scores_dict = {
-            "mysteres": profil.mysteres,
-            "creation": profil.creation,
-            "attributs": profil.attributs,
-            "eschatologie": profil.eschatologie,
-            "tawhid": profil.tawhid,
-            "guidance": profil.guidance,
-            "egarement": profil.egarement,
-        }
-
-        confidence_score = None
-        if analysis.confidence_scores:
-            confidence_score = round(sum(analysis.confidence_scores) / len(analysis.confidence_scores), 3)
-
-        response = {
-            "texte_analyse": request.texte,
-            "dimension_dominante": int(analysis.dimension_dominante),
-            "scores": scores_dict,
-            "intensity_max": analysis.intensity_max,
-            "confidence_score": confidence_score,
-            "processing_time_ms": analysis.processing_time_ms,
-            "version": analysis.version,
-        }
+        response = format_analysis_result(request.texte, analysis)
         
         # Mise en cache de l'analyse
-        redis_service.cache_analysis(text_hash, response, 7200)
+        cache_analyses({cache_key: response})
         
         # Sauvegarde de la prédiction IA en base
         db_service = DatabaseService(db)
         db_service.save_ai_prediction(
             text_hash=text_hash,
             text=request.texte,
-            profile=profil.to_array(),
+            profile=analysis.profil_heptuple.to_array(),
             confidence=analysis.confidence_scores or [],
             model_version=analysis.version,
             processing_time=analysis.processing_time_ms
@@ -361,10 +613,163 @@ async def analyze_text(
         )
         
         return response
+    except HTTPException:
+        raise
     except Exception as e:
         log_error(e, "Erreur lors de l'analyse")
         raise HTTPException(status_code=500, detail="Erreur lors de l'analyse")
 
+@app.post("/api/v2/analyze/batch")
+async def analyze_text_batch(
+    request: AnalyseBatchRequest,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Analyse un lot de textes (cache MGET, insertion groupée, ordre d'entrée conservé)"""
+    if len(request.textes) > ANALYZE_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Lot trop volumineux: {len(request.textes)} textes (maximum {ANALYZE_BATCH_MAX_SIZE})"
+        )
+    try:
+        db_service = DatabaseService(db)
+        text_hashes = [get_text_hash(texte) for texte in request.textes]
+        cache_keys = [
+            get_analysis_cache_key(text_hash, request.include_confidence, request.include_details)
+            for text_hash in text_hashes
+        ]
+        
+        # Vérification du cache local puis Redis (une seule commande MGET)
+        cached_results = get_cached_analyses(cache_keys)
+        
+        # Analyse des seuls textes absents du cache (dédupliqués)
+        misses: Dict[str, str] = {}
+        for text_hash, texte, cached in zip(text_hashes, request.textes, cached_results):
+            if cached is None:
+                misses.setdefault(text_hash, texte)
+        
+        computed: Dict[str, Dict] = {}
+        if misses:
+            analyses = await analysis_executor.analyze_many(
+                list(misses.values()),
+                include_confidence=request.include_confidence,
+                include_details=request.include_details
+            )
+            predictions = []
+            for (text_hash, texte), analysis in zip(misses.items(), analyses):
+                computed[text_hash] = format_analysis_result(texte, analysis)
+                predictions.append({
+                    "text_hash": text_hash,
+                    "text": texte,
+                    "profile": analysis.profil_heptuple.to_array(),
+                    "confidence": analysis.confidence_scores or [],
+                    "model_version": analysis.version,
+                    "processing_time": analysis.processing_time_ms,
+                })
+            
+            # Mise en cache (local et pipeline Redis) et sauvegarde groupée des prédictions
+            cache_analyses({
+                get_analysis_cache_key(text_hash, request.include_confidence, request.include_details): result
+                for text_hash, result in computed.items()
+            })
+            db_service.save_ai_predictions_bulk(predictions)
+        
+        results = [
+            cached if cached is not None else computed[text_hash]
+            for text_hash, cached in zip(text_hashes, cached_results)
+        ]
+        cache_hits = sum(1 for cached in cached_results if cached is not None)
+        
+        # Log de l'action utilisateur (une seule ligne pour le lot)
+        db_service.log_user_action(
+            user_id=current_user.id,
+            action="text_analysis_batch",
+            resource_type="analysis",
+            metadata={"batch_size": len(request.textes), "cache_hits": cache_hits}
+        )
+        
+        return {"results": results, "total": len(results), "cache_hits": cache_hits}
+    except HTTPException:
+        raise
+    except Exception as e:
+        log_error(e, "Erreur lors de l'analyse par lot")
+        raise HTTPException(status_code=500, detail="Erreur lors de l'analyse par lot")
+
+@app.post("/api/v2/analyze/stream")
+async def analyze_text_stream(
+    request: Request,
+    format: Optional[str] = None,
+    include_confidence: bool = True,
+    include_details: bool = False,
+    snapshot_every: int = 65536,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Analyse en flux d'un texte long envoyé en corps brut (text/plain).
+
+    Le corps est lu par morceaux et des profils intermédiaires sont émis tous
+    les ``snapshot_every`` caractères, en NDJSON (défaut) ou en SSE
+    (``format=sse`` ou ``Accept: text/event-stream``). Le dernier événement,
+    ``final``, est identique à l'analyse en une fois du texte complet.
+    """
+    stream_format = format or ("sse" if "text/event-stream" in request.headers.get("accept", "") else "ndjson")
+    if stream_format not in STREAM_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Format de flux inconnu: {stream_format} (attendu: ndjson ou sse)")
+    if snapshot_every < 1:
+        raise HTTPException(status_code=400, detail="snapshot_every doit être positif")
+
+    async def events():
+        session = analyzer.stream_session(include_confidence=include_confidence, include_details=include_details)
+        next_snapshot = snapshot_every
+        try:
+            async for text in iter_analysis_text(request.stream()):
+                if session.text_length + len(text) > ANALYZE_STREAM_MAX_CHARS:
+                    yield format_stream_event("error", {
+                        "status_code": 413,
+                        "detail": f"Texte trop volumineux (maximum {ANALYZE_STREAM_MAX_CHARS} caractères)"
+                    }, stream_format)
+                    return
+
+                # Découpage et comptage hors de la boucle d'événements, dans la file bornée des analyses
+                await analysis_executor.run_step(session.feed, text)
+                if session.text_length >= next_snapshot:
+                    next_snapshot = session.text_length + snapshot_every
+                    yield format_stream_event("snapshot", {
+                        "chars_processed": session.text_length,
+                        **format_profile_result(session.snapshot())
+                    }, stream_format)
+
+            if session.text_length == 0:
+                yield format_stream_event("error", {
+                    "status_code": 422, "detail": "Le texte ne peut pas être vide"
+                }, stream_format)
+                return
+
+            analysis: AnalyseResponse = await analysis_executor.run_step(session.finish)
+            yield format_stream_event("final", {
+                "chars_processed": session.text_length,
+                **format_profile_result(analysis)
+            }, stream_format)
+
+            DatabaseService(db).log_user_action(
+                user_id=current_user.id,
+                action="text_analysis_stream",
+                resource_type="analysis",
+                metadata={"text_length": session.text_length, "dimension_dominante": int(analysis.dimension_dominante)}
+            )
+        except ClientDisconnect:
+            logger.info(f"Analyse en flux interrompue par le client après {session.text_length} caractères")
+        except HTTPException as e:
+            # File d'analyse saturée (503) ou délai dépassé (504)
+            yield format_stream_event("error", {"status_code": e.status_code, "detail": e.detail}, stream_format)
+        except Exception as e:
+            log_error(e, "Erreur lors de l'analyse en flux")
+            yield format_stream_event("error", {
+                "status_code": 500, "detail": "Erreur lors de l'analyse en flux"
+            }, stream_format)
+
+    return RequestBodyStreamingResponse(events(), media_type=STREAM_FORMATS[stream_format])
+
 
 @app.post("/api/v2/ai/chat", response_model=ChatResponse)
 async def ai_chat(request: ChatRequest, current_user: User = Depends(get_current_active_user)):
@@ -415,38 +820,15 @@ async def ai_chat(request: ChatRequest, current_user: User = Depends(get_current
 async def analyze_text_enriched(request: AnalyseRequest, db: Session = Depends(get_db)):
     """Analyse enrichie avec hadiths, exégèses et citations"""
     try:
-        # Analyse de base
-        analyzer = HeptupleAnalyzer()
-        analysis: AnalyseResponse = analyzer.analyze_text_heptuple(
+        # Analyse de base (hors de la boucle d'événements)
+        analysis: AnalyseResponse = await analysis_executor.analyze(
             request.texte, include_confidence=request.include_confidence, include_details=request.include_details
         )
         # Conversion pour le front
-        profil: ProfilHeptuple = analysis.profil_heptuple
-        scores_dict = {
-            "mysteres": profil.mysteres,
-            "creation": profil.creation,
-            "attributs": profil.attributs,
-            "eschatologie": profil.eschatologie,
-            "tawhid": profil.tawhid,
-            "guidance": profil.guidance,
-            "egarement": profil.egarement,
-        }
-        confidence_score = None
-        if analysis.confidence_scores:
-            confidence_score = round(sum(analysis.confidence_scores) / len(analysis.confidence_scores), 3)
-        analyse_base = {
-            "texte_analyse": request.texte,
-            "dimension_dominante": int(analysis.dimension_dominante),
-            "scores": scores_dict,
-            "intensity_max": analysis.intensity_max,
-            "confidence_score": confidence_score,
-            "processing_time_ms": analysis.processing_time_ms,
-            "version": analysis.version,
-        }
+        analyse_base = format_analysis_result(request.texte, analysis)
         
         # Enrichissement avec références
         db_service = DatabaseService(db)
-        dimension = result["dimension_dominante"]
         
         # Récupération des références par dimension
         hadiths = db_service.get_hadiths_by_dimension(str(int(analysis.dimension_dominante)), 3)
@@ -533,9 +915,60 @@ async def analyze_text_enriched(request: AnalyseRequest, db: Session = Depends(g
         
         return response_enrichie
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur lors de l'analyse enrichie: {str(e)}")
 
+@app.get("/api/v2/lexicon")
+async def get_lexicon():
+    """Version, source et taille du lexique courant de l'analyseur"""
+    return analyzer.lexicon.snapshot.describe()
+
+@app.post("/api/v2/admin/lexicon/reload")
+async def reload_lexicon(
+    source: Optional[str] = None,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Recharge le lexique (builtin, file ou db) sans redémarrage et le propage aux workers.
+
+    Le worker qui reçoit la requête recharge immédiatement et publie la
+    source et la version dans Redis ; les autres workers uvicorn rechargent
+    la même source au plus tard LEXICON_SYNC_SECONDS après. Sans Redis
+    (``propagated`` faux), seul ce worker est rechargé.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Réservé aux administrateurs")
+    try:
+        previous = analyzer.lexicon.snapshot
+        # Compilation hors de la boucle d'événements, puis remplacement atomique
+        lexicon = await asyncio.to_thread(load_configured_lexicon, analyzer.lexicon, source, db)
+        if lexicon is not previous:
+            await asyncio.to_thread(analysis_executor.reload_lexicon)
+        propagated = await asyncio.to_thread(redis_service.publish_lexicon, lexicon.source, lexicon.version)
+        logger.info(f"Lexique rechargé par {current_user.username}: {previous.version} -> {lexicon.version}")
+        return {**lexicon.describe(), "previous_version": previous.version, "changed": lexicon is not previous,
+                "propagated": propagated}
+    except (ValueError, OSError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        log_error(e, "Erreur lors du rechargement du lexique")
+        raise HTTPException(status_code=500, detail="Erreur lors du rechargement du lexique")
+
+@app.get("/api/v2/analyzer/metrics")
+async def analyzer_metrics():
+    """Métriques de la file d'exécution des analyses, du cache local et des index de recherche"""
+    return {
+        **analysis_executor.get_metrics(),
+        "local_cache": analysis_cache.get_stats(),
+        "search_backend": search_backend.get_stats(),
+        "suggest_index": suggest_index.get_stats(),
+        "similarity_index": similarity_index.get_stats(),
+        "sourate_catalog": sourate_catalog.get_stats(),
+        "universal_search": search_fanout.get_metrics(),
+    }
+
 @app.get("/api/v2/db/health")
 async def db_health():
     """Vérifie l'état de la base de données"""
@@ -547,15 +980,16 @@ async def db_health():
 
 @app.get("/api/v2/search/advanced", response_model=List[SearchResult])
 async def advanced_search(query: str, search_type: str = "keyword", limit: int = 20, db: Session = Depends(get_db)):
-    """Recherche avancée dans le Coran et les hadiths (fallback LIKE)"""
+    """Recherche avancée plein texte dans le Coran et les hadiths, classée par ts_rank_cd"""
     try:
         db_service = DatabaseService(db)
+        ensure_sourate_catalog(db)
         results: List[SearchResult] = []
 
-        # Versets
-        versets = db_service.search_versets(query, limit=limit)
-        for v in versets:
-            s = db_service.get_sourate_by_numero(v.sourate_id)
+        # Versets (sourates lues dans le catalogue en mémoire)
+        versets = db_service.search_versets_ranked(query, limit=limit)
+        for v, rank, highlights in versets:
+            s = sourate_catalog.get(v.sourate_id)
             verset_model = Verset(
                 id=v.id,
                 sourate_id=v.sourate_id,
@@ -563,22 +997,25 @@ async def advanced_search(query: str, search_type: str = "keyword", limit: int =
                 texte_arabe=v.texte_arabe,
                 traduction_francaise=v.traduction_francaise
             )
-            result = SearchResult(verset=verset_model, sourate=Sourate(
+            sourate_model = Sourate(
                 id=s.id, numero=s.numero, nom_arabe=s.nom_arabe, nom_francais=s.nom_francais,
                 type_revelation=s.type_revelation, nombre_versets=s.nombre_versets
-            ), similarity_score=None, score=None)
+            ) if s else Sourate(id=0, numero=0, nom_arabe="", nom_francais="", type_revelation="Mecquoise", nombre_versets=0)
+            result = SearchResult(verset=verset_model, sourate=sourate_model,
+                                  similarity_score=None, score=rank, highlights=highlights)
             results.append(result)
 
         # Hadiths
-        hadiths = db_service.search_hadiths(query, limit=max(0, limit - len(results)))
-        for h in hadiths:
+        hadiths = db_service.search_hadiths_ranked(query, limit=max(0, limit - len(results)))
+        for h, rank, highlights in hadiths:
             # On ne retourne pas de verset pour un hadith, mais on peut encapsuler minimalement
             dummy_verset = Verset(id=0, sourate_id=0, numero_verset=0, texte_arabe="", traduction_francaise=None)
             dummy_sourate = Sourate(id=0, numero=0, nom_arabe="", nom_francais="",
                                     type_revelation="Mecquoise", nombre_versets=0)
             result = SearchResult(verset=dummy_verset, sourate=dummy_sourate,
-                                   similarity_score=None, score=None,
-                                   highlights={"hadith": [h.texte_francais or h.texte_arabe]})
+                                   similarity_score=None, score=rank,
+                                   highlights={"hadith": highlights["francais"] or highlights["arabe"]
+                                               or [h.texte_francais or h.texte_arabe]})
             results.append(result)
 
         return results[:limit]
@@ -665,51 +1102,28 @@ async def get_exegeses_by_dimension(dimension: str, limit: int = 5, db: Session
 
 @app.post("/api/v2/compare", response_model=Dict)
 async def compare_sourates(request: ComparisonRequest, db: Session = Depends(get_db)):
-    """Compare plusieurs sourates selon leurs profils heptuple (depuis la BD)"""
-    db_service = DatabaseService(db)
+    """Compare plusieurs sourates selon leurs profils heptuple (catalogue en mémoire)"""
+    ensure_sourate_catalog(db)
     sourates_to_compare = []
     for sourate_id in request.sourate_ids:
-        s = db_service.get_sourate_by_id(sourate_id)
+        s = sourate_catalog.get(sourate_id)
         if not s:
             raise HTTPException(status_code=404, detail=f"Sourate {sourate_id} non trouvée")
-        profil = db_service.get_profil_heptuple_by_sourate(s.id)
-        sourate_dict = {
-            "id": s.id,
-            "numero": s.numero,
-            "nom_arabe": s.nom_arabe,
-            "nom_francais": s.nom_francais,
-            "type_revelation": s.type_revelation,
-            "nombre_versets": s.nombre_versets,
-            "profil_heptuple": None
-        }
-        if profil:
-            sourate_dict["profil_heptuple"] = {
-                "mysteres": profil.mysteres_score,
-                "creation": profil.creation_score,
-                "attributs": profil.attributs_score,
-                "eschatologie": profil.eschatologie_score,
-                "tawhid": profil.tawhid_score,
-                "guidance": profil.guidance_score,
-                "egarement": profil.egarement_score
-            }
-        sourates_to_compare.append(sourate_dict)
+        sourates_to_compare.append(s.to_dict())
 
     if len(sourates_to_compare) < 2:
         raise HTTPException(status_code=400, detail="Au moins 2 sourates requises pour la comparaison")
 
-    similarity_matrix = []
-    for i, sourate_a in enumerate(sourates_to_compare):
-        row = []
-        for j, sourate_b in enumerate(sourates_to_compare):
-            if i == j:
-                row.append(1.0)
-            else:
-                similarity = calculate_similarity(
-                    sourate_a["profil_heptuple"],
-                    sourate_b["profil_heptuple"]
-                )
-                row.append(similarity)
-        similarity_matrix.append(row)
+    # Matrice symétrique : chaque paire n'est calculée qu'une fois
+    count = len(sourates_to_compare)
+    similarity_matrix = [[1.0] * count for _ in range(count)]
+    for i in range(count):
+        for j in range(i + 1, count):
+            similarity = calculate_similarity(
+                sourates_to_compare[i]["profil_heptuple"],
+                sourates_to_compare[j]["profil_heptuple"]
+            )
+            similarity_matrix[i][j] = similarity_matrix[j][i] = similarity
 
     stats = calculate_comparison_statistics(sourates_to_compare)
     return {
@@ -719,20 +1133,107 @@ async def compare_sourates(request: ComparisonRequest, db: Session = Depends(get
         "insights": generate_comparison_insights(sourates_to_compare)
     }
 
+def get_similarity_types(types: List[str]) -> List[str]:
+    """Types d'éléments demandés à l'index de similarité (400 si inconnus)"""
+    unknown = [t for t in types if t not in SIMILARITY_TYPES]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Types de similarité inconnus: {', '.join(unknown)}")
+    return list(dict.fromkeys(types))
+
+def ensure_similarity_index(db: Session) -> None:
+    """Construit l'index de similarité au premier appel s'il ne l'est pas encore"""
+    if not similarity_index.ready:
+        similarity_index.build(db)
+
+@app.get("/api/v2/similar", response_model=Dict)
+async def similar_items(
+    sourate: Optional[int] = None,
+    verset: Optional[int] = None,
+    k: int = 10,
+    types: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Sourates et versets dont le profil heptuple est le plus proche de celui d'une sourate ou d'un verset"""
+    try:
+        if (sourate is None) == (verset is None):
+            raise HTTPException(status_code=400, detail="Indiquez soit une sourate, soit un verset")
+        if not 1 <= k <= SIMILARITY_MAX_K:
+            raise HTTPException(status_code=400, detail=f"k doit être compris entre 1 et {SIMILARITY_MAX_K}")
+        search_types = get_similarity_types(
+            [t.strip() for t in types.split(",") if t.strip()] if types else list(SIMILARITY_TYPES)
+        )
+        
+        ensure_similarity_index(db)
+        kind, item_id = ("sourates", sourate) if sourate is not None else ("versets", verset)
+        profile = similarity_index.profile(kind, item_id)
+        if profile is None:
+            raise HTTPException(status_code=404, detail=f"Profil heptuple introuvable ({kind} {item_id})")
+        
+        return {
+            "reference": {"type": kind, "id": item_id, "profil_heptuple": scores_to_dict(profile)},
+            "k": k,
+            **similarity_index.similar(profile, search_types, k, exclude=(kind, item_id)),
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        log_error(e, "Erreur de recherche de profils similaires")
+        raise HTTPException(status_code=500, detail="Erreur de recherche de profils similaires")
+
+@app.post("/api/v2/similar", response_model=Dict)
+async def similar_to_text(request: SimilarTextRequest, db: Session = Depends(get_db)):
+    """Sourates et versets dont le profil heptuple est le plus proche de celui d'un texte analysé"""
+    try:
+        search_types = get_similarity_types(request.types)
+        analysis: AnalyseResponse = await analysis_executor.analyze(
+            request.texte, include_confidence=False, include_details=False
+        )
+        profile = analysis.profil_heptuple.to_array()
+        
+        ensure_similarity_index(db)
+        return {
+            "reference": {"type": "texte", "profil_heptuple": scores_to_dict(profile)},
+            "k": request.k,
+            **similarity_index.similar(profile, search_types, request.k),
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        log_error(e, "Erreur de recherche de profils similaires")
+        raise HTTPException(status_code=500, detail="Erreur de recherche de profils similaires")
+
 @app.get("/api/v2/search", response_model=List[SearchResult])
 async def search_content(
+    response: Response,
     query: str,
     search_type: str = "keyword",
     dimensions: Optional[str] = None,
     limit: int = 20,
+    cursor: Optional[str] = None,
+    profil: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    """Recherche dans le corpus (fallback LIKE)"""
+    """Recherche plein texte dans le corpus, classée par ts_rank_cd.
+
+    Pagination par curseur : le curseur de la page suivante est renvoyé dans l'en-tête X-Next-Cursor.
+    ``profil`` restreint aux versets dont le profil respecte des bornes, ex. ``tawhid>=80,eschatologie<=20``.
+    """
+    page_size = get_page_size(limit)
+    try:
+        after = decode_after(cursor) if cursor else None
+        profile = parse_profile_ranges(profil)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     db_service = DatabaseService(db)
+    ensure_sourate_catalog(db)
     results: List[SearchResult] = []
-    versets = db_service.search_versets(query, limit=limit)
-    for v in versets:
-        sourate_obj = db_service.get_sourate_by_id(v.sourate_id)
+    found = db_service.search_versets_ranked(query, limit=page_size + 1, after=after, profile=profile,
+                                             analyzer_version=analyzer.VERSION, lexicon_hash=analyzer.lexicon_hash)
+    versets, next_cursor = paginate(found, page_size, lambda found: (found[1], found[0].id))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    for v, rank, highlights in versets:
+        sourate_obj = sourate_catalog.get(v.sourate_id)
         sourate_model = Sourate(
             id=sourate_obj.id,
             numero=sourate_obj.numero,
@@ -748,8 +1249,8 @@ async def search_content(
             texte_arabe=v.texte_arabe,
             traduction_francaise=v.traduction_francaise
         )
-        results.append(SearchResult(verset=verset_model, sourate=sourate_model))
-    return results[:limit]
+        results.append(SearchResult(verset=verset_model, sourate=sourate_model, score=rank, highlights=highlights))
+    return results
 
 @app.post("/api/v2/feedback")
 async def submit_feedback(request: FeedbackRequest):
@@ -926,7 +1427,9 @@ async def universal_search(
     """Recherche universelle dans Coran, Hadiths et Fiqh"""
     try:
         # Génération du hash de la requête pour le cache
-        query_hash = get_text_hash(f"{request.query}_{request.search_types}_{request.filters}")
+        query_hash = get_text_hash(
+            f"{request.query}_{request.search_types}_{request.filters}_{request.limit}_{request.cursor}"
+        )
         
         # Vérification du cache
         cached_results = redis_service.get_cached_search_results(query_hash)
@@ -934,16 +1437,21 @@ async def universal_search(
             logger.info(f"Résultats de recherche récupérés du cache pour: {request.query}")
             return cached_results
         
-        # Recherche dans la base de données
-        search_service = SearchService(db)
-        results = search_service.search_universal(
+        # Recherche dans la base de données (sources en parallèle, hors de la boucle d'événements)
+        search_service = SearchService(db, search_backend, fanout=search_fanout, catalog=sourate_catalog)
+        results = await asyncio.to_thread(
+            search_service.search_universal,
             request.query,
             request.search_types,
-            request.limit
+            request.limit,
+            request.cursor
         )
         
-        # Mise en cache des résultats
-        redis_service.cache_search_results(query_hash, results, 1800)
+        # Mise en cache des résultats complets uniquement
+        if not results["partial"]:
+            redis_service.cache_search_results(query_hash, results, 1800)
+        else:
+            logger.warning(f"Recherche universelle partielle, sources manquantes: {results['missing_sources']}")
         
         # Log de l'action utilisateur
         db_service = DatabaseService(db)
@@ -956,6 +1464,8 @@ async def universal_search(
         
         return results
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         log_error(e, "Erreur de recherche universelle")
         raise HTTPException(status_code=500, detail="Erreur de recherche")
@@ -965,14 +1475,18 @@ async def search_coran(
     query: str,
     filters: Optional[str] = None,
     limit: int = 20,
+    cursor: Optional[str] = None,
+    facets: bool = True,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Recherche avancée dans le Coran"""
+    """Recherche avancée dans le Coran, paginée par curseur (next_cursor), avec comptes par facette (facets)"""
     try:
-        search_service = SearchService(db)
+        search_service = SearchService(db, search_backend, catalog=sourate_catalog, analyzer=analyzer)
         filter_dict = json.loads(filters) if filters else None
-        results = search_service.search_coran_advanced(query, filter_dict, limit)
+        results, next_cursor = search_service.search_page("coran", query, filter_dict, get_page_size(limit), cursor)
+        # Comptes par facette sur la première page seulement : ils ne dépendent pas du curseur
+        facet_counts = search_service.search_facets("coran", query, filter_dict) if facets and not cursor else None
         
         # Log de l'action utilisateur
         db_service = DatabaseService(db)
@@ -983,8 +1497,12 @@ async def search_coran(
             metadata={"query": query, "filters": filter_dict}
         )
         
-        return {"results": results, "total": len(results)}
+        return {"results": results, "total": len(results), "next_cursor": next_cursor, "facets": facet_counts}
         
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         log_error(e, "Erreur de recherche Coran")
         raise HTTPException(status_code=500, detail="Erreur de recherche Coran")
@@ -994,14 +1512,18 @@ async def search_hadiths(
     query: str,
     filters: Optional[str] = None,
     limit: int = 20,
+    cursor: Optional[str] = None,
+    facets: bool = True,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Recherche avancée dans les Hadiths Sahih"""
+    """Recherche avancée dans les Hadiths Sahih, paginée par curseur (next_cursor), avec comptes par facette (facets)"""
     try:
-        search_service = SearchService(db)
+        search_service = SearchService(db, search_backend, catalog=sourate_catalog)
         filter_dict = json.loads(filters) if filters else None
-        results = search_service.search_hadiths_advanced(query, filter_dict, limit)
+        results, next_cursor = search_service.search_page("hadiths", query, filter_dict, get_page_size(limit), cursor)
+        # Comptes par facette sur la première page seulement : ils ne dépendent pas du curseur
+        facet_counts = search_service.search_facets("hadiths", query, filter_dict) if facets and not cursor else None
         
         # Log de l'action utilisateur
         db_service = DatabaseService(db)
@@ -1012,8 +1534,12 @@ async def search_hadiths(
             metadata={"query": query, "filters": filter_dict}
         )
         
-        return {"results": results, "total": len(results)}
+        return {"results": results, "total": len(results), "next_cursor": next_cursor, "facets": facet_counts}
         
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         log_error(e, "Erreur de recherche Hadiths")
         raise HTTPException(status_code=500, detail="Erreur de recherche Hadiths")
@@ -1023,14 +1549,18 @@ async def search_fiqh_advanced(
     query: str,
     filters: Optional[str] = None,
     limit: int = 20,
+    cursor: Optional[str] = None,
+    facets: bool = True,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Recherche avancée dans la jurisprudence (Fiqh)"""
+    """Recherche avancée dans la jurisprudence (Fiqh), paginée par curseur (next_cursor), avec comptes par facette (facets)"""
     try:
-        search_service = SearchService(db)
+        search_service = SearchService(db, search_backend, catalog=sourate_catalog)
         filter_dict = json.loads(filters) if filters else None
-        results = search_service.search_fiqh_advanced(query, filter_dict, limit)
+        results, next_cursor = search_service.search_page("fiqh", query, filter_dict, get_page_size(limit), cursor)
+        # Comptes par facette sur la première page seulement : ils ne dépendent pas du curseur
+        facet_counts = search_service.search_facets("fiqh", query, filter_dict) if facets and not cursor else None
         
         # Log de l'action utilisateur
         db_service = DatabaseService(db)
@@ -1041,12 +1571,154 @@ async def search_fiqh_advanced(
             metadata={"query": query, "filters": filter_dict}
         )
         
-        return {"results": results, "total": len(results)}
+        return {"results": results, "total": len(results), "next_cursor": next_cursor, "facets": facet_counts}
         
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         log_error(e, "Erreur de recherche Fiqh")
         raise HTTPException(status_code=500, detail="Erreur de recherche Fiqh")
 
+@app.get("/api/v2/search/profils")
+async def search_by_profile(
+    profil: str,
+    type: str = "versets",
+    sourate_id: Optional[int] = None,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Sourates ou versets dont le profil heptuple respecte des bornes de scores, ex. ``tawhid>=80,eschatologie<=20``.
+
+    Les versets (profils précalculés) sont paginés par curseur dans l'ordre des
+    identifiants ; les sourates (une par profil le plus récent) sont renvoyées en une fois.
+    """
+    try:
+        if type not in ("sourates", "versets"):
+            raise HTTPException(status_code=400, detail="Type inconnu: attendu sourates ou versets")
+        profile = parse_profile_ranges(profil)
+        if not profile:
+            raise HTTPException(status_code=400, detail="Filtre de profil vide")
+        db_service = DatabaseService(db)
+        
+        if type == "sourates":
+            results = [
+                {
+                    "id": s.id,
+                    "numero": s.numero,
+                    "nom_arabe": s.nom_arabe,
+                    "nom_francais": s.nom_francais,
+                    "profil_heptuple": scores_to_dict(profile_scores(p)),
+                }
+                for s, p in db_service.get_sourates_with_latest_profile(profile)
+            ]
+            return {"results": results, "total": len(results), "next_cursor": None}
+        
+        page_size = get_page_size(limit)
+        after_id = decode_cursor(cursor, 1)[0] if cursor else None
+        if after_id is not None and (isinstance(after_id, bool) or not isinstance(after_id, int)):
+            raise ValueError("Curseur de pagination invalide")
+        found = db_service.get_versets_by_profile(profile, analyzer.VERSION, analyzer.lexicon_hash,
+                                                  sourate_id, page_size + 1, after_id)
+        results = [
+            {
+                "id": v.id,
+                "sourate_id": v.sourate_id,
+                "numero_verset": v.numero_verset,
+                "texte_arabe": v.texte_arabe,
+                "traduction_francaise": v.traduction_francaise,
+                "dimension_principale": p.dimension_principale,
+                "profil_heptuple": scores_to_dict(profile_scores(p)),
+            }
+            for v, p in found[:page_size]
+        ]
+        next_cursor = encode_cursor(results[-1]["id"]) if len(found) > page_size else None
+        return {"results": results, "total": len(results), "next_cursor": next_cursor}
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        log_error(e, "Erreur de recherche par profil")
+        raise HTTPException(status_code=500, detail="Erreur de recherche par profil")
+
+@app.get("/api/v2/search/suggest")
+async def search_suggest(
+    prefix: str,
+    types: Optional[str] = None,
+    limit: int = 10,
+    username: str = Depends(verify_token)
+):
+    """Autocomplétion par préfixe : sourates, recueils, narrateurs, thèmes de fiqh et termes fréquents.
+
+    Servie depuis l'index en mémoire à chaque frappe : le jeton est vérifié
+    sans relire l'utilisateur en base et l'appel n'est pas journalisé.
+    """
+    try:
+        search_types = [t.strip() for t in types.split(",") if t.strip()] if types else list(SUGGEST_TYPES)
+        unknown = [t for t in search_types if t not in SUGGEST_TYPES]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Types de suggestion inconnus: {', '.join(unknown)}")
+        if not 1 <= limit <= SUGGEST_MAX_LIMIT:
+            raise HTTPException(status_code=400, detail=f"La limite doit être comprise entre 1 et {SUGGEST_MAX_LIMIT}")
+        
+        start = time.perf_counter()
+        suggestions = suggest_index.suggest(prefix, search_types, limit)
+        
+        return {
+            "prefix": prefix,
+            "suggestions": suggestions,
+            "ready": suggest_index.ready,
+            "took_ms": round((time.perf_counter() - start) * 1000, 3),
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        log_error(e, "Erreur d'autocomplétion")
+        raise HTTPException(status_code=500, detail="Erreur d'autocomplétion")
+
+@app.get("/api/v2/search/fuzzy")
+async def search_fuzzy(
+    query: str,
+    types: Optional[str] = None,
+    threshold: float = FUZZY_THRESHOLD,
+    limit: int = 20,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Recherche approchée (trigrammes) : noms de sourates, translittérations, narrateurs, recueils, thèmes de fiqh"""
+    try:
+        search_types = [t.strip() for t in types.split(",") if t.strip()] if types else list(FUZZY_SEARCH_TYPES)
+        unknown = [t for t in search_types if t not in FUZZY_SEARCH_TYPES]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Types de recherche inconnus: {', '.join(unknown)}")
+        if not 0 < threshold <= 1:
+            raise HTTPException(status_code=400, detail="Le seuil doit être compris entre 0 et 1")
+        
+        search_service = SearchService(db, search_backend, catalog=sourate_catalog)
+        results = search_service.search_fuzzy(query, search_types, threshold, get_page_size(limit))
+        
+        # Log de l'action utilisateur
+        db_service = DatabaseService(db)
+        db_service.log_user_action(
+            user_id=current_user.id,
+            action="fuzzy_search",
+            resource_type="search",
+            metadata={"query": query, "types": search_types, "threshold": threshold}
+        )
+        
+        return results
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        log_error(e, "Erreur de recherche approchée")
+        raise HTTPException(status_code=500, detail="Erreur de recherche approchée")
+
 # Fonctions utilitaires
 def calculate_similarity(profile_a: Dict, profile_b: Dict) -> float:
     """Calcule la similarité cosinus entre deux profils"""
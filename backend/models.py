@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, validator
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union
 from enum import Enum
 from datetime import datetime
 import re
@@ -70,6 +70,18 @@ class Verset(BaseModel):
     dimensions_secondaires: List[DimensionType] = Field(default_factory=list, description="Dimensions secondaires")
     mots_cles: List[str] = Field(default_factory=list, description="Mots-clés du verset")
 
+# Caractères supprimés des textes soumis à l'analyse
+DANGEROUS_CHARS_PATTERN = re.compile(r'[<>"\']')
+
+def clean_analysis_text(v: str) -> str:
+    """Validation et nettoyage d'un texte à analyser"""
+    if not v.strip():
+        raise ValueError("Le texte ne peut pas être vide")
+    
+    # Suppression des caractères dangereux
+    cleaned = DANGEROUS_CHARS_PATTERN.sub('', v)
+    return cleaned.strip()
+
 class AnalyseRequest(BaseModel):
     texte: str = Field(..., min_length=1, max_length=10000, description="Texte à analyser")
     langue: str = Field(default="auto", pattern="^(ar|fr|en|auto)$", description="Langue du texte")
@@ -79,12 +91,19 @@ class AnalyseRequest(BaseModel):
     @validator('texte')
     def validate_text(cls, v):
         """Validation et nettoyage du texte"""
-        if not v.strip():
-            raise ValueError("Le texte ne peut pas être vide")
-        
-        # Suppression des caractères dangereux
-        cleaned = re.sub(r'[<>"\']', '', v)
-        return cleaned.strip()
+        return clean_analysis_text(v)
+
+class AnalyseBatchRequest(BaseModel):
+    textes: List[str] = Field(..., min_items=1, description="Textes à analyser (résultats dans le même ordre)")
+    include_confidence: bool = Field(default=True, description="Inclure les scores de confiance")
+    include_details: bool = Field(default=False, description="Inclure les détails d'analyse")
+    
+    @validator('textes', each_item=True)
+    def validate_textes(cls, v):
+        """Validation et nettoyage de chaque texte du lot"""
+        if len(v) > 10000:
+            raise ValueError("Chaque texte doit contenir au plus 10000 caractères")
+        return clean_analysis_text(v)
 
 class AnalyseResponse(BaseModel):
     profil_heptuple: ProfilHeptuple = Field(..., description="Profil heptuple calculé")
@@ -100,6 +119,16 @@ class ComparisonRequest(BaseModel):
     dimensions_focus: Optional[List[DimensionType]] = Field(None, description="Dimensions sur lesquelles se concentrer")
     include_statistics: bool = Field(default=True, description="Inclure les statistiques")
 
+class SimilarTextRequest(BaseModel):
+    texte: str = Field(..., min_length=1, max_length=10000, description="Texte dont chercher les voisins")
+    types: List[str] = Field(default=["sourates", "versets"], min_items=1, description="Types d'éléments : sourates, versets")
+    k: int = Field(default=10, ge=1, le=100, description="Nombre de voisins par type")
+    
+    @validator('texte')
+    def validate_text(cls, v):
+        """Validation et nettoyage du texte"""
+        return clean_analysis_text(v)
+
 class SearchRequest(BaseModel):
     query: str = Field(..., min_length=1, description="Requête de recherche")
     search_type: str = Field(default="semantic", pattern="^(semantic|keyword|hybrid)$", description="Type de recherche")
@@ -220,6 +249,7 @@ class UniversalSearchRequest(BaseModel):
     search_types: List[str] = Field(default=["coran", "hadiths", "fiqh"], description="Types de recherche")
     filters: Optional[Dict[str, Any]] = Field(None, description="Filtres de recherche")
     limit: int = Field(default=20, ge=1, le=100, description="Nombre maximum de résultats")
+    cursor: Optional[str] = Field(None, description="Curseur de la page suivante (next_cursor)")
 
 class SearchFilters(BaseModel):
     sourate_id: Optional[int] = Field(None, description="ID de la sourate")
@@ -228,6 +258,9 @@ class SearchFilters(BaseModel):
     authenticite: Optional[str] = Field(None, description="Degré d'authenticité")
     rite: Optional[str] = Field(None, description="Rite juridique")
     topic: Optional[str] = Field(None, description="Sujet de jurisprudence")
+    profil: Optional[Union[str, Dict[str, Any]]] = Field(
+        None, description="Bornes de scores heptuple des versets, ex. \"tawhid>=80,eschatologie<=20\" ou {\"tawhid\": {\"min\": 80}}"
+    )
 
 # ===== Modèles DeepSeek Chat =====
 
@@ -0,0 +1,244 @@
+"""
+Exécution des analyses heptuple hors de la boucle asyncio
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from fastapi import HTTPException
+
+from models import AnalyseResponse
+from services.heptuple_analyzer import HeptupleAnalyzer
+from services.lexicon import LexiconSnapshot, LexiconStore
+
+logger = logging.getLogger(__name__)
+
+EXECUTION_MODES = ("inline", "thread", "process")
+
+# Analyseur propre à chaque processus de travail : le lexique transmis par le
+# processus principal y est compilé une seule fois, à l'initialisation.
+_worker_analyzer: Optional[HeptupleAnalyzer] = None
+
+
+def _init_worker(dimension_keywords: Optional[Mapping] = None, source: str = "builtin") -> None:
+    """Initialise l'analyseur d'un processus de travail"""
+    global _worker_analyzer
+    lexicon = LexiconStore(LexiconSnapshot(dimension_keywords, source)) if dimension_keywords else None
+    _worker_analyzer = HeptupleAnalyzer(lexicon)
+
+
+def _warmup_worker() -> int:
+    """Tâche de préchauffage exécutée une fois par processus"""
+    _worker_analyzer.analyze_text_heptuple("warm-up", include_confidence=False)
+    return os.getpid()
+
+
+def _call_analyzer(analyzer: Optional[HeptupleAnalyzer], method: str,
+                   args: tuple, kwargs: dict) -> Tuple[float, Any]:
+    """Appelle une méthode de l'analyseur et renvoie (heure de début, résultat)"""
+    started_at = time.time()
+    target = analyzer if analyzer is not None else _worker_analyzer
+    return started_at, getattr(target, method)(*args, **kwargs)
+
+
+def _call_step(step: Callable[..., Any], args: tuple) -> Tuple[float, Any]:
+    """Exécute une étape d'analyse en flux et renvoie (heure de début, résultat)"""
+    started_at = time.time()
+    return started_at, step(*args)
+
+
+class AnalysisExecutor:
+    """Backend d'exécution configurable de l'analyseur (inline, threads ou processus).
+
+    Les analyses sont soumises à un pool borné : au-delà de ``max_queue_size``
+    analyses en cours, les requêtes sont refusées (503) ; chaque analyse est
+    limitée à ``timeout_seconds`` (504). Les temps d'attente dans la file sont
+    mesurés pour dimensionner le nombre de workers.
+    """
+
+    def __init__(self, analyzer: HeptupleAnalyzer, mode: Optional[str] = None,
+                 max_workers: Optional[int] = None, max_queue_size: Optional[int] = None,
+                 timeout_seconds: Optional[float] = None):
+        self.analyzer = analyzer
+        self.mode = (mode or os.getenv("ANALYZER_EXECUTION_MODE", "thread")).lower()
+        if self.mode not in EXECUTION_MODES:
+            raise ValueError(f"Mode d'exécution inconnu: {self.mode} (attendu: {', '.join(EXECUTION_MODES)})")
+
+        self.max_workers = max_workers or int(os.getenv("ANALYZER_WORKERS", str(min(4, os.cpu_count() or 1))))
+        self.max_queue_size = max_queue_size or int(os.getenv("ANALYZER_MAX_QUEUE", "64"))
+        self.timeout_seconds = timeout_seconds or float(os.getenv("ANALYZER_TIMEOUT_SECONDS", "30"))
+
+        self._pool: Optional[Executor] = None
+        # Étapes des analyses en flux en mode processus : leur session reste dans ce processus
+        self._step_pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._recent_waits: deque = deque(maxlen=1000)
+
+    def start(self) -> None:
+        """Crée le pool de workers (préchauffé en mode processus)"""
+        if self._pool is not None or self.mode == "inline":
+            return
+
+        self._pool = self._create_pool()
+
+        logger.info(f"Exécuteur d'analyse démarré: mode={self.mode}, workers={self.max_workers}, "
+                    f"file={self.max_queue_size}, timeout={self.timeout_seconds}s")
+
+    def _create_pool(self) -> Executor:
+        if self.mode == "thread":
+            return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="heptuple-analyzer")
+
+        # Les processus compilent le lexique courant du processus principal
+        lexicon = self.analyzer.lexicon.snapshot
+        pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                   initargs=(lexicon.to_dict(), lexicon.source))
+        pids = {f.result() for f in [pool.submit(_warmup_worker) for _ in range(self.max_workers)]}
+        logger.info(f"Pool d'analyse préchauffé ({len(pids)} processus, lexique {lexicon.version})")
+        return pool
+
+    def reload_lexicon(self) -> None:
+        """Propage le lexique courant aux workers (nouveau pool en mode processus).
+
+        En mode thread ou inline, les workers lisent directement l'instantané
+        partagé. En mode processus, un pool neuf est préchauffé puis substitué à
+        l'ancien, qui termine ses analyses en cours avant de s'arrêter.
+        """
+        if self.mode != "process" or self._pool is None:
+            return
+
+        new_pool = self._create_pool()
+        old_pool, self._pool = self._pool, new_pool
+        old_pool.shutdown(wait=False)
+
+    def shutdown(self) -> None:
+        """Arrête le pool de workers"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        if self._step_pool is not None:
+            self._step_pool.shutdown(wait=False, cancel_futures=True)
+            self._step_pool = None
+
+    def _on_done(self, _future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def _record_wait(self, wait_seconds: float) -> None:
+        wait_seconds = max(0.0, wait_seconds)
+        with self._lock:
+            self._completed += 1
+            self._wait_total += wait_seconds
+            self._wait_max = max(self._wait_max, wait_seconds)
+            self._recent_waits.append(wait_seconds)
+
+    async def run(self, method: str, *args, **kwargs) -> Any:
+        """Exécute une méthode de l'analyseur selon le mode configuré"""
+        if self.mode == "inline":
+            _, result = _call_analyzer(self.analyzer, method, args, kwargs)
+            self._record_wait(0.0)
+            return result
+
+        if self._pool is None:
+            self.start()
+
+        analyzer = self.analyzer if self.mode == "thread" else None
+        return await self._submit(self._pool, _call_analyzer, analyzer, method, args, kwargs)
+
+    async def run_step(self, step: Callable[..., Any], *args) -> Any:
+        """Exécute une étape d'une analyse en flux (session.feed, session.finish) dans la file bornée.
+
+        La session garde son état entre les morceaux et ne peut donc pas être
+        envoyée à un processus de travail : en mode processus, l'étape tourne
+        dans un pool de threads de même taille, mais reste comptée, limitée et
+        mesurée avec les autres analyses.
+        """
+        if self.mode == "inline":
+            _, result = _call_step(step, args)
+            self._record_wait(0.0)
+            return result
+
+        if self.mode == "process":
+            with self._lock:
+                if self._step_pool is None:
+                    self._step_pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                         thread_name_prefix="heptuple-stream")
+                pool = self._step_pool
+        else:
+            if self._pool is None:
+                self.start()
+            pool = self._pool
+        return await self._submit(pool, _call_step, step, args)
+
+    async def _submit(self, pool: Executor, fn: Callable[..., Tuple[float, Any]], *args) -> Any:
+        """Soumet une tâche au pool : refus (503) si la file est pleine, délai (504), temps d'attente mesuré"""
+        with self._lock:
+            if self._in_flight >= self.max_queue_size:
+                self._rejected += 1
+                raise HTTPException(status_code=503, detail="Service d'analyse saturé, réessayez plus tard")
+            self._in_flight += 1
+
+        submitted_at = time.time()
+        try:
+            future = pool.submit(fn, *args)
+        except Exception:
+            self._on_done(None)
+            raise
+        future.add_done_callback(self._on_done)
+
+        try:
+            started_at, result = await asyncio.wait_for(asyncio.wrap_future(future), self.timeout_seconds)
+        except asyncio.TimeoutError:
+            future.cancel()
+            with self._lock:
+                self._timeouts += 1
+            raise HTTPException(status_code=504, detail="Délai d'analyse dépassé")
+
+        self._record_wait(started_at - submitted_at)
+        return result
+
+    async def analyze(self, text: str, include_confidence: bool = True,
+                      include_details: bool = False) -> AnalyseResponse:
+        """Analyse un texte hors de la boucle d'événements"""
+        return await self.run("analyze_text_heptuple", text,
+                              include_confidence=include_confidence, include_details=include_details)
+
+    async def analyze_many(self, texts: List[str], include_confidence: bool = True,
+                           include_details: bool = False) -> List[AnalyseResponse]:
+        """Analyse un lot de textes hors de la boucle d'événements"""
+        return await self.run("analyze_many", texts,
+                              include_confidence=include_confidence, include_details=include_details)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Métriques de la file d'analyse (profondeur, temps d'attente)"""
+        with self._lock:
+            in_flight = self._in_flight
+            completed = self._completed
+            recent = sorted(self._recent_waits)
+            metrics = {
+                "mode": self.mode,
+                "workers": self.max_workers if self.mode != "inline" else 0,
+                "max_queue_size": self.max_queue_size,
+                "timeout_seconds": self.timeout_seconds,
+                "in_flight": in_flight,
+                "queue_depth": max(0, in_flight - self.max_workers) if self.mode != "inline" else 0,
+                "completed": completed,
+                "rejected": self._rejected,
+                "timeouts": self._timeouts,
+                "wait_ms_avg": round(self._wait_total / completed * 1000, 3) if completed else 0.0,
+                "wait_ms_max": round(self._wait_max * 1000, 3),
+            }
+
+        for name, quantile in (("wait_ms_p50", 0.5), ("wait_ms_p95", 0.95), ("wait_ms_p99", 0.99)):
+            metrics[name] = round(recent[min(len(recent) - 1, int(quantile * len(recent)))] * 1000, 3) if recent else 0.0
+        return metrics
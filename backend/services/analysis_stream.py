@@ -0,0 +1,71 @@
+"""
+Analyse heptuple en flux : lecture du corps de requête par morceaux et émission NDJSON/SSE
+"""
+import codecs
+import json
+from typing import AsyncIterator, Dict
+
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from models import DANGEROUS_CHARS_PATTERN
+
+STREAM_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+
+class RequestBodyStreamingResponse(StreamingResponse):
+    """Réponse en flux produite pendant la lecture du corps de la requête.
+
+    ``StreamingResponse`` écoute la déconnexion du client en consommant les
+    messages ``receive`` : cette écoute entrerait en concurrence avec la lecture
+    du corps par le générateur. Ici seul le générateur lit la requête ; une
+    déconnexion y est signalée par ``ClientDisconnect``.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+async def _iter_decoded(byte_chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    async for chunk in byte_chunks:
+        yield decoder.decode(chunk)
+    yield decoder.decode(b"", final=True)
+
+
+async def iter_analysis_text(byte_chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Décode et nettoie le texte reçu par morceaux, comme ``clean_analysis_text``.
+
+    Les caractères dangereux sont supprimés et les blancs de début et de fin du
+    texte complet sont retirés : les blancs de fin de morceau sont retenus
+    jusqu'à l'arrivée d'un caractère non blanc.
+    """
+    started = False
+    held = ""
+
+    async for text in _iter_decoded(byte_chunks):
+        text = DANGEROUS_CHARS_PATTERN.sub("", text)
+        if not started:
+            text = text.lstrip()
+            if not text:
+                continue
+            started = True
+
+        text = held + text
+        kept = text.rstrip()
+        held = text[len(kept):]
+        if kept:
+            yield kept
+
+
+def format_stream_event(event: str, payload: Dict, stream_format: str) -> str:
+    """Sérialise un événement du flux (ligne NDJSON ou bloc SSE)"""
+    data = json.dumps({"type": event, **payload}, ensure_ascii=False)
+    if stream_format == "sse":
+        return f"event: {event}\ndata: {data}\n\n"
+    return data + "\n"
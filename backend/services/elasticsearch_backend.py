@@ -0,0 +1,341 @@
+"""
+Moteur de recherche Elasticsearch : un index par corpus, indexation par lots (API _bulk)
+
+La reconstruction complète écrit dans un nouvel index puis bascule l'alias du
+corpus dessus ; le rafraîchissement incrémental envoie les lignes nouvelles ou
+modifiées depuis la dernière synchronisation (updated_at) et
+supprime les documents dont la ligne a disparu.
+"""
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import Integer, func, or_
+from sqlalchemy.orm import Session
+
+from services.pagination import After, is_after
+from services.search_backends import FacetCounts, IndexedBackend
+from services.search_index import AND_OPERATORS, CORPORA, OR_OPERATORS, CorpusSpec
+
+try:
+    from elasticsearch import Elasticsearch, helpers
+except ImportError:
+    Elasticsearch = None
+    helpers = None
+
+logger = logging.getLogger(__name__)
+
+# Analyseurs arabe (sans tashkeel, hamzas et alef unifiés, racinisation) et français
+ANALYSIS = {
+    "filter": {
+        "french_elision": {
+            "type": "elision",
+            "articles_case": True,
+            "articles": ["l", "m", "t", "qu", "n", "s", "j", "d", "c", "jusqu", "quoiqu", "lorsqu", "puisqu"],
+        },
+        "french_light_stemmer": {"type": "stemmer", "language": "light_french"},
+        "arabic_stemmer": {"type": "stemmer", "language": "arabic"},
+    },
+    "analyzer": {
+        "heptuple_arabic": {
+            "tokenizer": "standard",
+            "filter": ["lowercase", "decimal_digit", "arabic_normalization", "arabic_stemmer"],
+        },
+        "heptuple_french": {
+            "tokenizer": "standard",
+            "filter": ["french_elision", "lowercase", "asciifolding", "french_light_stemmer"],
+        },
+    },
+}
+
+# Analyseur des champs texte (standard pour les autres)
+FIELD_ANALYZERS = {
+    "texte_arabe": "heptuple_arabic",
+    "texte_exegese": "heptuple_arabic",
+    "traduction_francaise": "heptuple_french",
+    "texte_francais": "heptuple_french",
+    "ruling_text": "heptuple_french",
+    "question": "heptuple_french",
+    "topic": "heptuple_french",
+    "traduction_anglaise": "english",
+}
+
+# Champs en plusieurs langues : sous-champ « fr » analysé en français
+MULTILINGUAL_FIELDS = frozenset(["texte_exegese"])
+
+# Demi-unité d'arrondi des scores renvoyés (4 décimales)
+_ROUNDING = 0.00005
+
+# Nombre maximum de valeurs par facette (114 sourates)
+FACET_MAX_VALUES = 200
+
+
+def normalize_score(score: float) -> float:
+    """Score BM25 d'Elasticsearch ramené dans [0, 1[ (score / (score + 1)), arrondi comme les autres moteurs"""
+    return round(score / (score + 1), 4)
+
+
+def to_simple_query(query: str) -> str:
+    """Requête au format simple_query_string : OR/OU -> |, ET/AND implicites"""
+    terms = []
+    for term in query.split():
+        if term.upper() in OR_OPERATORS:
+            terms.append("|")
+        elif term.upper() not in AND_OPERATORS:
+            terms.append(term)
+    return " ".join(terms)
+
+
+class ElasticsearchIndexer:
+    """Indexation des corpus dans Elasticsearch par lots, en flux depuis la base"""
+
+    def __init__(self, client: Any, prefix: str = "heptuple", corpora: Optional[Dict[str, CorpusSpec]] = None,
+                 batch_size: int = 500):
+        self.client = client
+        self.prefix = prefix
+        self.corpora = corpora or CORPORA
+        self.batch_size = batch_size
+
+    def alias(self, corpus: str) -> str:
+        """Alias interrogé pour un corpus (pointe vers l'index courant)"""
+        return f"{self.prefix}-{corpus}"
+
+    def mappings(self, spec: CorpusSpec) -> Dict[str, Any]:
+        """Champs texte analysés, métadonnées de filtrage (entier ou mot-clé) et identifiant de tri"""
+        properties: Dict[str, Any] = {"id": {"type": "integer"}}
+        for field in spec.boosts:
+            properties[field] = {"type": "text", "analyzer": FIELD_ANALYZERS.get(field, "standard")}
+            if field in MULTILINGUAL_FIELDS:
+                properties[field]["fields"] = {"fr": {"type": "text", "analyzer": "heptuple_french"}}
+        columns = spec.model.__table__.columns
+        properties["meta"] = {"properties": {
+            key: {"type": "integer" if isinstance(columns[key].type, Integer) else "keyword"}
+            for key in spec.metadata
+        }}
+        return {"dynamic": "strict", "properties": properties}
+
+    def rebuild(self, db: Session, corpus: str) -> int:
+        """Réindexe tout un corpus dans un nouvel index puis bascule l'alias dessus"""
+        spec = self.corpora[corpus]
+        alias = self.alias(corpus)
+        target = f"{alias}-{time.time_ns()}"
+        # Pas de rafraîchissement pendant le chargement : les segments sont écrits une fois
+        self.client.indices.create(index=target, mappings=self.mappings(spec), settings={
+            "analysis": ANALYSIS, "refresh_interval": "-1",
+        })
+        try:
+            count = self._bulk(self._index_actions(db, spec, target))
+            self.client.indices.put_settings(index=target, settings={"refresh_interval": "1s"})
+            self.client.indices.refresh(index=target)
+        except Exception:
+            self.client.indices.delete(index=target, ignore_unavailable=True)
+            raise
+
+        previous = list(self.client.indices.get_alias(name=alias)) if self.client.indices.exists_alias(name=alias) else []
+        self.client.indices.update_aliases(actions=[
+            *({"remove": {"index": index, "alias": alias}} for index in previous),
+            {"add": {"index": target, "alias": alias}},
+        ])
+        for index in previous:
+            self.client.indices.delete(index=index, ignore_unavailable=True)
+        return count
+
+    def update(self, db: Session, corpus: str, since: Any) -> int:
+        """Envoie les lignes nouvelles ou modifiées depuis ``since`` et supprime les documents orphelins"""
+        spec = self.corpora[corpus]
+        alias = self.alias(corpus)
+        current_ids = {row_id for row_id, in db.query(spec.model.id)}
+        indexed_ids = self.indexed_ids(corpus)
+        removed = sorted(indexed_ids - current_ids)
+        new_ids = sorted(current_ids - indexed_ids)
+
+        timestamp = getattr(spec.model, spec.timestamp)
+        condition = or_(spec.model.id.in_(new_ids), timestamp >= since)
+        count = self._bulk(self._index_actions(db, spec, alias, condition))
+        count += self._bulk({"_op_type": "delete", "_index": alias, "_id": doc_id} for doc_id in removed)
+        if count:
+            self.client.indices.refresh(index=alias)
+        return count
+
+    def indexed_ids(self, corpus: str) -> Set[int]:
+        """Identifiants des documents indexés (parcours sans _source)"""
+        hits = helpers.scan(self.client, index=self.alias(corpus), query={"query": {"match_all": {}}, "_source": False},
+                            size=self.batch_size * 10)
+        return {int(hit["_id"]) for hit in hits}
+
+    def document(self, spec: CorpusSpec, values: Any) -> Dict[str, Any]:
+        return {
+            "id": values["id"],
+            **{field: values[field] for field in spec.boosts},
+            "meta": {key: values[key] for key in spec.metadata},
+        }
+
+    def _index_actions(self, db: Session, spec: CorpusSpec, index: str, condition: Any = None) -> Iterator[Dict[str, Any]]:
+        """Actions _bulk des lignes d'un corpus, lues par lots de batch_size (yield_per)"""
+        names = dict.fromkeys(("id", *spec.boosts, *spec.metadata))
+        query = db.query(*(getattr(spec.model, name) for name in names))
+        if condition is not None:
+            query = query.filter(condition)
+        for row in query.order_by(spec.model.id).yield_per(self.batch_size):
+            values = row._mapping
+            yield {"_index": index, "_id": values["id"], "_source": self.document(spec, values)}
+
+    def _bulk(self, actions: Any) -> int:
+        """Envoie des actions par lots via l'API _bulk ; renvoie le nombre d'actions réussies"""
+        count = 0
+        for ok, item in helpers.streaming_bulk(self.client, actions, chunk_size=self.batch_size,
+                                               raise_on_error=False, max_retries=2):
+            if ok:
+                count += 1
+            else:
+                logger.error(f"Échec d'indexation Elasticsearch: {item}")
+        return count
+
+
+class ElasticsearchBackend(IndexedBackend):
+    """Recherche classée par Elasticsearch (BM25, analyseurs arabe et français)"""
+
+    name = "elasticsearch"
+
+    def __init__(self, client: Any = None, url: Optional[str] = None, prefix: Optional[str] = None,
+                 corpora: Optional[Dict[str, CorpusSpec]] = None, batch_size: Optional[int] = None):
+        super().__init__(corpora)
+        if client is None:
+            if Elasticsearch is None:
+                raise RuntimeError("Le paquet elasticsearch n'est pas installé (SEARCH_BACKEND=elasticsearch)")
+            client = Elasticsearch(url or os.getenv("ELASTICSEARCH_URL", "http://localhost:9200"), request_timeout=30)
+        self.client = client
+        self.indexer = ElasticsearchIndexer(
+            client,
+            prefix or os.getenv("ELASTICSEARCH_INDEX_PREFIX", "heptuple"),
+            self.corpora,
+            batch_size or int(os.getenv("ELASTICSEARCH_BULK_SIZE", "500")),
+        )
+        self._ready = False
+        self._synced_at: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._stats = {"builds": 0, "refreshes": 0, "last_build_ms": None, "last_refresh_ms": None, "documents": {}}
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    def build(self, db: Session) -> Dict[str, int]:
+        with self._lock:
+            start = time.perf_counter()
+            counts = {}
+            for corpus in self.corpora:
+                synced_at = db.query(func.now()).scalar()
+                counts[corpus] = self.indexer.rebuild(db, corpus)
+                self._synced_at[corpus] = synced_at
+            self._ready = True
+            self._stats["builds"] += 1
+            self._stats["last_build_ms"] = round((time.perf_counter() - start) * 1000, 1)
+            self._stats["documents"] = counts
+            return counts
+
+    def refresh(self, db: Session) -> Dict[str, int]:
+        if not self._ready:
+            return self.build(db)
+
+        with self._lock:
+            start = time.perf_counter()
+            changes = {}
+            for corpus in self.corpora:
+                synced_at = db.query(func.now()).scalar()
+                changes[corpus] = self.indexer.update(db, corpus, self._synced_at[corpus])
+                self._synced_at[corpus] = synced_at
+            self._stats["refreshes"] += 1
+            self._stats["last_refresh_ms"] = round((time.perf_counter() - start) * 1000, 1)
+            return changes
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, "ready": self._ready, **self._stats}
+
+    def search_ids(self, corpus: str, query: str, filters: Optional[Dict[str, Any]],
+                   limit: int, after: Optional[After]) -> List[Tuple[int, float]]:
+        """Meilleurs documents par score normalisé décroissant puis id, après la position ``after``.
+
+        Elasticsearch trie sur le score brut : à score arrondi égal, l'ordre des
+        identifiants n'est pas garanti. Les résultats sont donc lus (search_after)
+        jusqu'à épuiser la tranche de score du dernier retenu, puis triés.
+        """
+        spec = self.corpora[corpus]
+        search_query = {"bool": {"must": [self._text_query(spec, query)], "filter": self._filters(spec, filters)}}
+        search_after = None
+        if after is not None:
+            # Score brut au-delà duquel le score arrondi dépasse celui du curseur
+            bound = after[0] + _ROUNDING
+            if bound < 1:
+                search_after = [bound / (1 - bound), -1]
+
+        candidates: List[Tuple[int, float]] = []
+        while True:
+            response = self.client.search(
+                index=self.indexer.alias(corpus), query=search_query, size=limit + 1,
+                sort=[{"_score": "desc"}, {"id": "asc"}], search_after=search_after,
+                source=False, track_total_hits=False,
+            )
+            hits = response["hits"]["hits"]
+            for hit in hits:
+                score, doc_id = normalize_score(hit["sort"][0]), int(hit["_id"])
+                if len(candidates) >= limit and score < candidates[limit - 1][1]:
+                    return self._top(candidates, limit)
+                if is_after(score, doc_id, after):
+                    candidates.append((doc_id, score))
+            if len(hits) <= limit:
+                return self._top(candidates, limit)
+            search_after = hits[-1]["sort"]
+
+    def facets(self, db: Session, corpus: str, query: str, filters: Optional[Dict[str, Any]] = None) -> FacetCounts:
+        """Comptes par facette en une requête : une agrégation terms par facette, sous les filtres des autres facettes"""
+        spec = self.corpora[corpus]
+        clauses = self._filter_clauses(spec, filters)
+        aggregations = {}
+        for name in spec.facets:
+            others = [clause for other, clause in clauses.items() if other in spec.facets and other != name]
+            aggregations[name] = {
+                "filter": {"bool": {"filter": others}},
+                "aggs": {"values": {"terms": {"field": f"meta.{spec.filters[name][0]}", "size": FACET_MAX_VALUES}}},
+            }
+        search_query = {"bool": {
+            "must": [self._text_query(spec, query)],
+            "filter": [clause for name, clause in clauses.items() if name not in spec.facets],
+        }}
+        response = self.client.search(
+            index=self.indexer.alias(corpus), query=search_query, size=0, aggs=aggregations, track_total_hits=False,
+        )
+        return {
+            name: {bucket["key"]: bucket["doc_count"] for bucket in response["aggregations"][name]["values"]["buckets"]}
+            for name in spec.facets
+        }
+
+    @staticmethod
+    def _top(candidates: List[Tuple[int, float]], limit: int) -> List[Tuple[int, float]]:
+        return sorted(candidates, key=lambda item: (-item[1], item[0]))[:limit]
+
+    @staticmethod
+    def _text_query(spec: CorpusSpec, query: str) -> Dict[str, Any]:
+        fields = [f"{field}^{boost}" for field, boost in spec.boosts.items()]
+        fields += [f"{field}.fr^{boost}" for field, boost in spec.boosts.items() if field in MULTILINGUAL_FIELDS]
+        return {"simple_query_string": {"query": to_simple_query(query), "fields": fields, "default_operator": "and"}}
+
+    @classmethod
+    def _filters(cls, spec: CorpusSpec, filters: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return list(cls._filter_clauses(spec, filters).values())
+
+    @staticmethod
+    def _filter_clauses(spec: CorpusSpec, filters: Optional[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Filtres de recherche traduits en clauses sur les métadonnées (égalité ou sous-chaîne), par nom de filtre"""
+        clauses = {}
+        for name, value in (filters or {}).items():
+            if not value or name not in spec.filters:
+                continue
+            key, operator = spec.filters[name]
+            if operator == "contains":
+                clauses[name] = {"wildcard": {f"meta.{key}": {"value": f"*{value}*", "case_insensitive": True}}}
+            else:
+                clauses[name] = {"term": {f"meta.{key}": value}}
+        return clauses
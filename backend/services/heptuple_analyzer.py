@@ -1,62 +1,49 @@
-import re
 import time
-from typing import List, Dict, Tuple, Optional
+from collections import Counter
+from typing import List, Dict, Tuple, Optional, Union
 from models import ProfilHeptuple, DimensionType, AnalyseResponse
+from services.lexicon import LexiconSnapshot, LexiconStore, get_default_store
+from services.scoring_engine import BatchScores, compute_confidence_scores, normalize_scores
+from services.text_normalizer import TokenStream, split_complete, tokenize
+
+# Mots outils révélant un texte anglais
+ENGLISH_MARKERS = frozenset(['the', 'and', 'or', 'in', 'on', 'at'])
 
 class HeptupleAnalyzer:
     """Service d'analyse heptuple basé sur la vision de la Fatiha"""
     
-    def __init__(self):
-        # Mots-clés par dimension
-        self.dimension_keywords = {
-            DimensionType.MYSTERES: {
-                'ar': ['غيب', 'سر', 'مجهول', 'خفية', 'أسرار'],
-                'fr': ['mystère', 'secret', 'inconnu', 'caché', 'mystérieux'],
-                'en': ['mystery', 'secret', 'unknown', 'hidden', 'mysterious']
-            },
-            DimensionType.CREATION: {
-                'ar': ['خلق', 'خلقنا', 'السماء', 'الأرض', 'الكون'],
-                'fr': ['création', 'créé', 'ciel', 'terre', 'univers'],
-                'en': ['creation', 'created', 'heaven', 'earth', 'universe']
-            },
-            DimensionType.ATTRIBUTS: {
-                'ar': ['الرحمن', 'الرحيم', 'العزيز', 'الحكيم', 'السميع'],
-                'fr': ['miséricordieux', 'sage', 'puissant', 'entendant', 'voyant'],
-                'en': ['merciful', 'wise', 'powerful', 'hearing', 'seeing']
-            },
-            DimensionType.ESCHATOLOGIE: {
-                'ar': ['القيامة', 'الآخرة', 'الجنة', 'النار', 'الحساب'],
-                'fr': ['résurrection', 'au-delà', 'paradis', 'enfer', 'jugement'],
-                'en': ['resurrection', 'hereafter', 'paradise', 'hell', 'judgment']
-            },
-            DimensionType.TAWHID: {
-                'ar': ['الله', 'واحد', 'أحد', 'لا إله إلا الله', 'التوحيد'],
-                'fr': ['dieu', 'un', 'unique', 'unicité', 'adoration'],
-                'en': ['god', 'one', 'unique', 'oneness', 'worship']
-            },
-            DimensionType.GUIDANCE: {
-                'ar': ['الهداية', 'الرشد', 'الصراط المستقيم', 'الخير', 'الحق'],
-                'fr': ['guidance', 'droiture', 'chemin droit', 'bien', 'vérité'],
-                'en': ['guidance', 'righteousness', 'straight path', 'good', 'truth']
-            },
-            DimensionType.EGAREMENT: {
-                'ar': ['الضلال', 'الغواية', 'الشر', 'الباطل', 'الظلم'],
-                'fr': ['égarement', 'tentation', 'mal', 'faux', 'injustice'],
-                'en': ['misguidance', 'temptation', 'evil', 'false', 'injustice']
-            }
-        }
+    # Version de l'algorithme d'analyse (à incrémenter quand les scores changent)
+    VERSION = "1.0.0"
     
-    def detect_language(self, text: str) -> str:
-        """Détecte la langue du texte"""
-        arabic_chars = len(re.findall(r'[\u0600-\u06FF]', text))
-        total_chars = len(re.sub(r'\s', '', text))
-        
-        if total_chars == 0:
+    def __init__(self, lexicon: Optional[LexiconStore] = None):
+        # Lexique partagé : instantané précompilé, remplaçable à chaud
+        self.lexicon = lexicon or get_default_store()
+    
+    @property
+    def dimension_keywords(self):
+        """Mots-clés par dimension du lexique courant"""
+        return self.lexicon.snapshot.dimension_keywords
+    
+    @property
+    def lexicon_hash(self) -> str:
+        """Empreinte du lexique courant : les profils calculés avec un autre lexique sont périmés"""
+        return self.lexicon.snapshot.version
+    
+    def detect_language(self, text: Union[str, TokenStream]) -> str:
+        """Détecte la langue du texte (ou d'un flux de jetons déjà normalisé)"""
+        stream = text if isinstance(text, TokenStream) else tokenize(text)
+        return self._language_from_stats(
+            stream.arabic_chars, stream.char_count, not ENGLISH_MARKERS.isdisjoint(stream.tokens)
+        )
+    
+    def _language_from_stats(self, arabic_chars: int, char_count: int, has_english_markers: bool) -> str:
+        """Choisit la langue à partir des statistiques de caractères et des marqueurs anglais"""
+        if char_count == 0:
             return 'fr'
         
-        if arabic_chars / total_chars > 0.3:
+        if arabic_chars / char_count > 0.3:
             return 'ar'
-        elif re.search(r'\b(the|and|or|in|on|at)\b', text.lower()):
+        elif has_english_markers:
             return 'en'
         else:
             return 'fr'
@@ -64,16 +51,75 @@ class HeptupleAnalyzer:
     def analyze_text_heptuple(self, text: str, include_confidence: bool = True, include_details: bool = False) -> AnalyseResponse:
         """Analyse un texte selon la grille heptuple"""
         start_time = time.time()
+        lexicon = self.lexicon.snapshot
+        
+        # Normalisation et découpage en jetons (une seule passe sur le texte)
+        stream = tokenize(text)
         
         # Détection de la langue
-        detected_lang = self.detect_language(text)
+        detected_lang = self.detect_language(stream)
         
         # Analyse par mots-clés
-        scores = self._analyze_keywords(text, detected_lang)
+        scores = self._analyze_keywords(stream, detected_lang, lexicon)
         
-        # Normalisation
-        normalized_scores = self._normalize_scores(scores)
+        return self._build_response(
+            *self._profile_scores(scores, stream.text_length, include_confidence),
+            detected_lang, stream.text_length, stream.word_count, include_details, start_time
+        )
+    
+    def stream_session(self, include_confidence: bool = True, include_details: bool = False) -> "StreamingAnalysis":
+        """Ouvre une analyse incrémentale pour un texte reçu par morceaux"""
+        return StreamingAnalysis(self, include_confidence=include_confidence, include_details=include_details)
+    
+    def analyze_many(self, texts: List[str], include_confidence: bool = True, include_details: bool = False) -> List[AnalyseResponse]:
+        """Analyse un lot de textes, dans l'ordre d'entrée (les doublons ne sont analysés qu'une fois)"""
+        start_time = time.time()
+        unique_texts = list(dict.fromkeys(texts))
+        streams, languages, batch = self._score_batch(unique_texts, include_confidence)
+        
+        analyses: Dict[str, AnalyseResponse] = {}
+        for i, text in enumerate(unique_texts):
+            analyses[text] = self._build_response(
+                batch.normalized[i], batch.confidence[i] if include_confidence else None,
+                languages[i], streams[i].text_length, streams[i].word_count, include_details, start_time
+            )
+        
+        return [analyses[text] for text in texts]
+    
+    def score_many(self, texts: List[str], include_confidence: bool = True) -> BatchScores:
+        """Profils (scores normalisés et confiance) d'un lot de textes, sans construire de réponses"""
+        return self._score_batch(texts, include_confidence)[2]
+    
+    def _score_batch(self, texts: List[str], include_confidence: bool) -> Tuple[List[TokenStream], List[str], BatchScores]:
+        streams = [tokenize(text) for text in texts]
+        languages = [self.detect_language(stream) for stream in streams]
         
+        # Scores bruts, normalisation et confiance du lot par le moteur de scoring
+        batch = self.lexicon.snapshot.scoring_engine.score(streams, languages, include_confidence=include_confidence)
+        return streams, languages, batch
+    
+    def _analyze_keywords(self, stream: TokenStream, language: str,
+                          lexicon: Optional[LexiconSnapshot] = None) -> List[float]:
+        """Analyse basée sur les mots-clés"""
+        matchers = (lexicon or self.lexicon.snapshot).keyword_matchers
+        matcher = matchers.get(language, matchers['fr'])
+        counts = matcher.count_tokens(stream.tokens, stream.separators)
+        
+        return [counts[dim_id] * 10.0 for dim_id in DimensionType]
+    
+    def _profile_scores(self, scores: List[float], text_length: int,
+                        include_confidence: bool) -> Tuple[List[int], Optional[List[float]]]:
+        """Normalise les scores bruts et calcule les scores de confiance"""
+        normalized_scores = self._normalize_scores(scores)
+        confidence = None
+        if include_confidence:
+            confidence = self._calculate_confidence_scores(text_length, normalized_scores)
+        return normalized_scores, confidence
+    
+    def _build_response(self, normalized_scores: List[int], confidence_scores: Optional[List[float]],
+                        language: str, text_length: int, word_count: int,
+                        include_details: bool, start_time: float) -> AnalyseResponse:
+        """Construit la réponse d'analyse à partir des scores normalisés"""
         # Création du profil
         profil = ProfilHeptuple(
             mysteres=normalized_scores[0],
@@ -90,18 +136,13 @@ class HeptupleAnalyzer:
         intensity_max = profil.get_intensity_max()
         processing_time = int((time.time() - start_time) * 1000)
         
-        # Scores de confiance
-        confidence_scores = None
-        if include_confidence:
-            confidence_scores = self._calculate_confidence_scores(text, normalized_scores)
-        
         # Détails
         details = None
         if include_details:
             details = {
-                "language_detected": detected_lang,
-                "text_length": len(text),
-                "word_count": len(text.split()),
+                "language_detected": language,
+                "text_length": text_length,
+                "word_count": word_count,
                 "analysis_method": "keyword_based"
             }
         
@@ -112,51 +153,94 @@ class HeptupleAnalyzer:
             intensity_max=intensity_max,
             details=details,
             processing_time_ms=processing_time,
-            version="1.0.0"
+            version=self.VERSION
         )
     
-    def _analyze_keywords(self, text: str, language: str) -> List[float]:
-        """Analyse basée sur les mots-clés"""
-        text_lower = text.lower()
-        scores = [0.0] * 7
-        
-        for dim_id, keywords in self.dimension_keywords.items():
-            lang_keywords = keywords.get(language, keywords.get('fr', []))
-            
-            for keyword in lang_keywords:
-                pattern = r'\b' + re.escape(keyword.lower()) + r'\b'
-                matches = len(re.findall(pattern, text_lower))
-                scores[dim_id - 1] += matches * 10
-        
-        return scores
-    
     def _normalize_scores(self, scores: List[float]) -> List[int]:
         """Normalise les scores entre 0 et 100"""
-        if not scores or max(scores) == 0:
-            return [14] * 7
-        
-        min_score = min(scores)
-        max_score = max(scores)
-        
-        if max_score == min_score:
-            return [50] * 7
-        
-        normalized = []
-        for score in scores:
-            normalized_score = int(((score - min_score) / (max_score - min_score)) * 100)
-            normalized.append(max(0, min(100, normalized_score)))
-        
-        return normalized
+        return normalize_scores(scores)
     
-    def _calculate_confidence_scores(self, text: str, scores: List[int]) -> List[float]:
+    def _calculate_confidence_scores(self, text_length: int, scores: List[int]) -> List[float]:
         """Calcule les scores de confiance"""
-        confidence_scores = []
-        
-        for i, score in enumerate(scores):
-            text_length_factor = min(1.0, len(text) / 1000)
-            score_intensity_factor = score / 100
-            
-            confidence = (text_length_factor * 0.5 + score_intensity_factor * 0.5)
-            confidence_scores.append(round(confidence, 3))
-        
-        return confidence_scores
+        return compute_confidence_scores(text_length, scores)
+
+class StreamingAnalysis:
+    """Analyse heptuple incrémentale d'un texte reçu par morceaux.
+
+    Seul le texte dont le découpage est définitif est traité : la fin de
+    chaque morceau (dernier mot, éventuellement incomplet) est reportée sur le
+    morceau suivant, et les ``max_tokens - 1`` derniers jetons sont conservés
+    comme contexte des mots-clés multi-mots. La mémoire reste ainsi bornée
+    quelle que soit la longueur du texte, et ``finish()`` renvoie exactement
+    le résultat de ``analyze_text_heptuple`` sur le texte complet.
+    """
+    
+    def __init__(self, analyzer: HeptupleAnalyzer, include_confidence: bool = True, include_details: bool = False):
+        self.analyzer = analyzer
+        self.include_confidence = include_confidence
+        self.include_details = include_details
+        self.start_time = time.time()
+        
+        # Lexique figé pour toute la durée de l'analyse, même en cas de rechargement
+        self._matcher = analyzer.lexicon.snapshot.stream_matcher
+        self._pending = ""
+        self._tokens: List[str] = []
+        self._separators: List[str] = []
+        self._counts: Counter = Counter()
+        
+        self.text_length = 0
+        self.word_count = 0
+        self._arabic_chars = 0
+        self._char_count = 0
+        self._has_english_markers = False
+        self.finished = False
+    
+    def feed(self, chunk: str) -> None:
+        """Ajoute un morceau de texte à l'analyse"""
+        if self.finished:
+            raise RuntimeError("Analyse en flux déjà terminée")
+        
+        self.text_length += len(chunk)
+        complete, self._pending = split_complete(self._pending + chunk)
+        if complete:
+            stream = tokenize(complete)
+            # ``complete`` finit par un séparateur : le jeton vide final n'est pas un mot
+            self._consume(stream, stream.tokens[:-1])
+    
+    def finish(self) -> AnalyseResponse:
+        """Termine l'analyse et renvoie le résultat définitif"""
+        if not self.finished:
+            stream = tokenize(self._pending)
+            self._pending = ""
+            self._consume(stream, stream.tokens, final=True)
+            self.finished = True
+        return self.snapshot()
+    
+    def snapshot(self) -> AnalyseResponse:
+        """Profil heptuple du texte traité jusqu'ici"""
+        language = self.analyzer._language_from_stats(
+            self._arabic_chars, self._char_count, self._has_english_markers
+        )
+        scores = [self._counts[(language, dim_id)] * 10.0 for dim_id in DimensionType]
+        return self.analyzer._build_response(
+            *self.analyzer._profile_scores(scores, self.text_length, self.include_confidence),
+            language, self.text_length, self.word_count, self.include_details, self.start_time
+        )
+    
+    def _consume(self, stream: TokenStream, tokens: List[str], final: bool = False) -> None:
+        self.word_count += stream.word_count
+        self._arabic_chars += stream.arabic_chars
+        self._char_count += stream.char_count
+        if not self._has_english_markers:
+            self._has_english_markers = not ENGLISH_MARKERS.isdisjoint(tokens)
+        
+        self._tokens.extend(tokens)
+        self._separators.extend(stream.separators)
+        
+        # Une occurrence n'est comptée que si tout son contexte possible est connu
+        stop = len(self._tokens) if final else len(self._tokens) - (self._matcher.max_tokens - 1)
+        if stop <= 0:
+            return
+        self._counts.update(self._matcher.count_tokens(self._tokens, self._separators, stop=stop))
+        del self._tokens[:stop]
+        del self._separators[:stop]
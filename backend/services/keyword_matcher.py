@@ -0,0 +1,78 @@
+"""
+Automate de correspondance multi-mots-clés en une seule passe
+"""
+from collections import Counter
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+from services.text_normalizer import tokenize
+
+
+class KeywordMatcher:
+    """Trie de mots-clés (éventuellement multi-mots) parcouru en une passe.
+
+    Un mot-clé commence et finit par un caractère de mot : il correspond donc
+    exactement à une suite de jetons consécutifs du texte, séparés par les
+    mêmes séparateurs que dans le mot-clé. Mots-clés et textes passent par la
+    même normalisation (``services.text_normalizer``), si bien que ``الرحمن``
+    reconnaît aussi le texte vocalisé ``الرَّحْمَٰنِ``.
+    """
+
+    def __init__(self, keywords: Dict[Hashable, Iterable[str]]):
+        # Noeud : (enfants {(séparateur, jeton): noeud}, étiquettes terminales)
+        self._root: Dict[str, Tuple[dict, list]] = {}
+        self.max_tokens = 0
+        for label, words in keywords.items():
+            for word in words:
+                self._add(word, label)
+
+    def _add(self, keyword: str, label: Hashable) -> None:
+        stream = tokenize(keyword)
+        tokens = stream.tokens
+        separators = stream.separators
+        if not tokens[0] or not tokens[-1]:
+            raise ValueError(f"Mot-clé invalide (doit commencer et finir par une lettre): {keyword!r}")
+
+        self.max_tokens = max(self.max_tokens, len(tokens))
+
+        node = self._root.setdefault(tokens[0], ({}, []))
+        for separator, token in zip(separators, tokens[1:]):
+            node = node[0].setdefault((separator, token), ({}, []))
+        node[1].append(label)
+
+    def count_tokens(self, tokens: List[str], separators: List[str],
+                     stop: Optional[int] = None) -> Counter:
+        """Compte les occurrences par étiquette dans un flux de jetons normalisés.
+
+        ``separators[i]`` est le séparateur qui suit ``tokens[i]``. Avec
+        ``stop``, seules les occurrences commençant avant ``tokens[stop]`` sont
+        comptées (les jetons suivants servent alors de contexte).
+        """
+        counts: Counter = Counter()
+        root = self._root
+        n_tokens = len(tokens)
+
+        for i in range(n_tokens if stop is None else min(stop, n_tokens)):
+            node = root.get(tokens[i])
+            if node is None:
+                continue
+
+            children, labels = node
+            if labels:
+                counts.update(labels)
+
+            j = i
+            while children and j + 1 < n_tokens:
+                node = children.get((separators[j], tokens[j + 1]))
+                if node is None:
+                    break
+                children, labels = node
+                if labels:
+                    counts.update(labels)
+                j += 1
+
+        return counts
+
+    def count(self, text: str) -> Counter:
+        """Compte les occurrences par étiquette dans un texte brut"""
+        stream = tokenize(text)
+        return self.count_tokens(stream.tokens, stream.separators)
@@ -0,0 +1,211 @@
+"""
+Lexique des mots-clés par dimension : instantanés précompilés et rechargement à chaud
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional
+
+from models import DimensionType
+from services.keyword_matcher import KeywordMatcher
+from services.scoring_engine import ScoringEngine
+
+LANGUAGES = ('ar', 'fr', 'en')
+LEXICON_SOURCES = ('builtin', 'file', 'db')
+
+# Lexique intégré, utilisé par défaut et en repli si la source configurée est vide
+DEFAULT_DIMENSION_KEYWORDS = {
+    DimensionType.MYSTERES: {
+        'ar': ['غيب', 'سر', 'مجهول', 'خفية', 'أسرار'],
+        'fr': ['mystère', 'secret', 'inconnu', 'caché', 'mystérieux'],
+        'en': ['mystery', 'secret', 'unknown', 'hidden', 'mysterious']
+    },
+    DimensionType.CREATION: {
+        'ar': ['خلق', 'خلقنا', 'السماء', 'الأرض', 'الكون'],
+        'fr': ['création', 'créé', 'ciel', 'terre', 'univers'],
+        'en': ['creation', 'created', 'heaven', 'earth', 'universe']
+    },
+    DimensionType.ATTRIBUTS: {
+        'ar': ['الرحمن', 'الرحيم', 'العزيز', 'الحكيم', 'السميع'],
+        'fr': ['miséricordieux', 'sage', 'puissant', 'entendant', 'voyant'],
+        'en': ['merciful', 'wise', 'powerful', 'hearing', 'seeing']
+    },
+    DimensionType.ESCHATOLOGIE: {
+        'ar': ['القيامة', 'الآخرة', 'الجنة', 'النار', 'الحساب'],
+        'fr': ['résurrection', 'au-delà', 'paradis', 'enfer', 'jugement'],
+        'en': ['resurrection', 'hereafter', 'paradise', 'hell', 'judgment']
+    },
+    DimensionType.TAWHID: {
+        'ar': ['الله', 'واحد', 'أحد', 'لا إله إلا الله', 'التوحيد'],
+        'fr': ['dieu', 'un', 'unique', 'unicité', 'adoration'],
+        'en': ['god', 'one', 'unique', 'oneness', 'worship']
+    },
+    DimensionType.GUIDANCE: {
+        'ar': ['الهداية', 'الرشد', 'الصراط المستقيم', 'الخير', 'الحق'],
+        'fr': ['guidance', 'droiture', 'chemin droit', 'bien', 'vérité'],
+        'en': ['guidance', 'righteousness', 'straight path', 'good', 'truth']
+    },
+    DimensionType.EGAREMENT: {
+        'ar': ['الضلال', 'الغواية', 'الشر', 'الباطل', 'الظلم'],
+        'fr': ['égarement', 'tentation', 'mal', 'faux', 'injustice'],
+        'en': ['misguidance', 'temptation', 'evil', 'false', 'injustice']
+    }
+}
+
+
+def compute_lexicon_hash(dimension_keywords: Mapping[DimensionType, Mapping[str, List[str]]]) -> str:
+    """Empreinte stable (SHA-256 tronqué) d'une table de mots-clés"""
+    canonical = json.dumps(
+        {int(dim_id): {lang: list(words) for lang, words in keywords.items()}
+         for dim_id, keywords in dimension_keywords.items()},
+        ensure_ascii=False, sort_keys=True
+    )
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+def parse_lexicon(data: Mapping[Any, Mapping[str, List[str]]]) -> Dict[DimensionType, Dict[str, List[str]]]:
+    """Valide une table {dimension (1-7): {langue: [mots-clés]}} venue d'un fichier ou de la base"""
+    lexicon: Dict[DimensionType, Dict[str, List[str]]] = {}
+    for dim_key, keywords in data.items():
+        try:
+            dim_id = DimensionType(int(dim_key))
+        except (TypeError, ValueError):
+            raise ValueError(f"Dimension inconnue dans le lexique: {dim_key!r}")
+        if not isinstance(keywords, Mapping):
+            raise ValueError(f"Mots-clés de la dimension {int(dim_id)} mal formés")
+
+        lexicon[dim_id] = {}
+        for lang, words in keywords.items():
+            if lang not in LANGUAGES:
+                raise ValueError(f"Langue inconnue dans le lexique: {lang!r}")
+            if isinstance(words, str) or not all(isinstance(word, str) and word.strip() for word in words):
+                raise ValueError(f"Mots-clés invalides pour la dimension {int(dim_id)} ({lang})")
+            lexicon[dim_id][lang] = [word.strip() for word in words]
+    if not lexicon:
+        raise ValueError("Lexique vide")
+    return lexicon
+
+
+def load_lexicon_file(path: str) -> Dict[DimensionType, Dict[str, List[str]]]:
+    """Charge un lexique JSON {"1": {"ar": [...], "fr": [...], "en": [...]}, ...}"""
+    with open(path, encoding='utf-8') as f:
+        return parse_lexicon(json.load(f))
+
+
+class LexiconSnapshot:
+    """Lexique figé et ses automates précompilés, partagé par toutes les requêtes.
+
+    Un instantané n'est jamais modifié : un rechargement en construit un
+    nouveau. Sa ``version`` (empreinte du lexique) entre dans les clés de
+    cache et l'horodatage des profils précalculés.
+    """
+
+    __slots__ = ("dimension_keywords", "version", "source", "loaded_at",
+                 "keyword_matchers", "stream_matcher", "scoring_engine")
+
+    def __init__(self, dimension_keywords: Mapping[DimensionType, Mapping[str, List[str]]],
+                 source: str = "builtin"):
+        self.dimension_keywords = MappingProxyType({
+            DimensionType(dim_id): MappingProxyType({lang: tuple(words) for lang, words in keywords.items()})
+            for dim_id, keywords in dimension_keywords.items()
+        })
+        self.version = compute_lexicon_hash(self.dimension_keywords)
+        self.source = source
+        self.loaded_at = time.time()
+
+        # Automates précompilés par langue (une seule passe par analyse)
+        self.keyword_matchers = MappingProxyType({
+            lang: KeywordMatcher({
+                dim_id: keywords.get(lang, keywords.get('fr', []))
+                for dim_id, keywords in self.dimension_keywords.items()
+            })
+            for lang in LANGUAGES
+        })
+
+        # Automate commun aux trois langues, étiqueté (langue, dimension), pour
+        # l'analyse en flux où la langue n'est connue qu'à la fin du texte
+        self.stream_matcher = KeywordMatcher({
+            (lang, dim_id): keywords.get(lang, keywords.get('fr', []))
+            for dim_id, keywords in self.dimension_keywords.items()
+            for lang in LANGUAGES
+        })
+
+        # Scoring des lots
+        self.scoring_engine = ScoringEngine(self.dimension_keywords)
+
+    def to_dict(self) -> Dict[int, Dict[str, List[str]]]:
+        """Lexique sous forme de dictionnaire simple (sérialisable, transmis aux processus)"""
+        return {int(dim_id): {lang: list(words) for lang, words in keywords.items()}
+                for dim_id, keywords in self.dimension_keywords.items()}
+
+    def describe(self) -> Dict[str, Any]:
+        """Version, source et taille du lexique"""
+        return {
+            "version": self.version,
+            "source": self.source,
+            "loaded_at": self.loaded_at,
+            "terms": sum(len(words) for keywords in self.dimension_keywords.values() for words in keywords.values()),
+        }
+
+
+class LexiconStore:
+    """Détient l'instantané courant du lexique et le remplace atomiquement.
+
+    Les lecteurs prennent ``store.snapshot`` une fois par analyse, sans
+    verrou : l'affectation d'attribut est atomique et l'ancien instantané
+    reste valide pour les analyses en cours.
+    """
+
+    def __init__(self, snapshot: Optional[LexiconSnapshot] = None):
+        self._snapshot = snapshot or LexiconSnapshot(DEFAULT_DIMENSION_KEYWORDS)
+        self._reload_lock = threading.Lock()
+
+    @property
+    def snapshot(self) -> LexiconSnapshot:
+        return self._snapshot
+
+    def load(self, dimension_keywords: Mapping[Any, Mapping[str, List[str]]], source: str) -> LexiconSnapshot:
+        """Compile un nouveau lexique hors ligne puis le publie (inchangé si même version)"""
+        snapshot = LexiconSnapshot(parse_lexicon(dimension_keywords), source=source)
+        with self._reload_lock:
+            if snapshot.version != self._snapshot.version:
+                self._snapshot = snapshot
+            return self._snapshot
+
+
+def load_configured_lexicon(store: LexiconStore, source: Optional[str] = None, db=None) -> LexiconSnapshot:
+    """Charge dans ``store`` le lexique de la source configurée (LEXICON_SOURCE, LEXICON_FILE)"""
+    source = (source or os.getenv("LEXICON_SOURCE", "builtin")).lower()
+    if source == "builtin":
+        data = DEFAULT_DIMENSION_KEYWORDS
+    elif source == "file":
+        path = os.getenv("LEXICON_FILE", "")
+        if not path:
+            raise ValueError("LEXICON_FILE doit indiquer le fichier du lexique")
+        data = load_lexicon_file(path)
+    elif source == "db":
+        if db is None:
+            raise ValueError("Une session de base de données est requise pour la source 'db'")
+        # Import différé : l'analyseur reste utilisable sans la couche base de données
+        from database import DatabaseService
+        data = DatabaseService(db).get_lexicon_keywords()
+    else:
+        raise ValueError(f"Source de lexique inconnue: {source} (attendu: {', '.join(LEXICON_SOURCES)})")
+    return store.load(data, source)
+
+
+_default_store: Optional[LexiconStore] = None
+_default_store_lock = threading.Lock()
+
+
+def get_default_store() -> LexiconStore:
+    """Lexique partagé par les analyseurs du processus (compilé une seule fois)"""
+    global _default_store
+    if _default_store is None:
+        with _default_store_lock:
+            if _default_store is None:
+                _default_store = LexiconStore()
+    return _default_store
@@ -0,0 +1,136 @@
+"""
+Cache LRU/TTL en mémoire du processus, borné en octets
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+# Surcoût approximatif d'une entrée (clé, tuple, noeud de l'OrderedDict)
+ENTRY_OVERHEAD_BYTES = 200
+
+
+def estimate_size(key: str, value: Any) -> int:
+    """Taille approximative (octets) d'une entrée, d'après sa forme sérialisée"""
+    try:
+        payload = json.dumps(value, ensure_ascii=False, default=str)
+    except (TypeError, ValueError):
+        payload = repr(value)
+    return len(key) + len(payload.encode("utf-8")) + ENTRY_OVERHEAD_BYTES
+
+
+class LocalCache:
+    """Cache LRU en mémoire placé devant Redis.
+
+    Les entrées expirent après ``ttl_seconds`` et les moins récemment lues
+    sont évincées dès que la taille totale estimée dépasse ``max_bytes``. Le
+    cache continue de servir les textes fréquents quand Redis est indisponible.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        self.max_bytes = max_bytes or int(os.getenv("ANALYSIS_LOCAL_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+        self.ttl_seconds = ttl_seconds or float(os.getenv("ANALYSIS_LOCAL_CACHE_TTL_SECONDS", "3600"))
+
+        # clé -> (valeur, taille, expiration)
+        self._entries: "OrderedDict[str, Tuple[Any, int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Récupère une valeur (None si absente ou expirée)"""
+        with self._lock:
+            return self._get(key, time.monotonic())
+
+    def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        """Récupère plusieurs valeurs, dans l'ordre des clés"""
+        now = time.monotonic()
+        with self._lock:
+            return [self._get(key, now) for key in keys]
+
+    def set(self, key: str, value: Any) -> bool:
+        """Met une valeur en cache (refusée si elle dépasse à elle seule la limite)"""
+        size = estimate_size(key, value)
+        with self._lock:
+            return self._set(key, value, size, time.monotonic())
+
+    def set_many(self, items: Dict[str, Any]) -> int:
+        """Met plusieurs valeurs en cache et renvoie le nombre d'entrées stockées"""
+        sized = [(key, value, estimate_size(key, value)) for key, value in items.items()]
+        now = time.monotonic()
+        with self._lock:
+            return sum(self._set(key, value, size, now) for key, value, size in sized)
+
+    def delete(self, key: str) -> bool:
+        """Supprime une entrée"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return False
+            self._size -= entry[1]
+            return True
+
+    def clear(self) -> None:
+        """Vide le cache (les compteurs sont conservés)"""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Statistiques du cache (taille, hits, misses, évictions)"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "size_bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+            }
+
+    def _get(self, key: str, now: float) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+
+        value, size, expires_at = entry
+        if expires_at <= now:
+            del self._entries[key]
+            self._size -= size
+            self._expirations += 1
+            self._misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return value
+
+    def _set(self, key: str, value: Any, size: int, now: float) -> bool:
+        if size > self.max_bytes:
+            return False
+
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._size -= previous[1]
+
+        self._entries[key] = (value, size, now + self.ttl_seconds)
+        self._size += size
+
+        while self._size > self.max_bytes:
+            _, (_, evicted_size, _) = self._entries.popitem(last=False)
+            self._size -= evicted_size
+            self._evictions += 1
+        return True
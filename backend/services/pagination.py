@@ -0,0 +1,80 @@
+"""
+Pagination par curseur des résultats de recherche classés
+
+Les résultats sont triés par score décroissant puis par identifiant croissant.
+Un curseur opaque (JSON encodé en base64) mémorise la position du dernier
+résultat renvoyé ; la page suivante ne retient que les résultats situés après
+cette position, sans OFFSET. Quand plusieurs moteurs peuvent classer les
+résultats, le curseur mémorise aussi le moteur : un score n'est comparable
+qu'aux scores du même moteur.
+"""
+import base64
+import binascii
+import json
+from typing import Any, Callable, List, Optional, Sequence, Tuple, TypeVar
+
+# Position après laquelle reprendre : (score, id) ; id None pour « score strictement inférieur »
+After = Tuple[float, Optional[int]]
+
+T = TypeVar("T")
+
+
+class StaleCursorError(ValueError):
+    """Curseur classé par un autre moteur (ou une autre génération d'index) que celui qui sert la requête"""
+
+    def __init__(self):
+        super().__init__("Curseur de pagination périmé : le classement a changé, relancez la recherche depuis la première page")
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode une position de pagination en jeton opaque"""
+    payload = json.dumps(list(values), separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, length: int) -> Sequence[Any]:
+    """Décode un jeton de pagination ; ValueError s'il est invalide"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, UnicodeError, json.JSONDecodeError) as e:
+        raise ValueError("Curseur de pagination invalide") from e
+    if not isinstance(values, list) or len(values) != length:
+        raise ValueError("Curseur de pagination invalide")
+    return values
+
+
+def is_after(score: float, doc_id: int, after: Optional[After]) -> bool:
+    """Vrai si (score, id) vient après la position ``after`` dans l'ordre score décroissant, id croissant"""
+    if after is None:
+        return True
+    after_score, after_id = after
+    if after_id is None:
+        return score < after_score
+    return score < after_score or (score == after_score and doc_id > after_id)
+
+
+def decode_after(token: str) -> After:
+    """Position (score, id) d'un jeton de pagination ; ValueError s'il est invalide"""
+    score, doc_id = decode_cursor(token, 2)
+    if isinstance(score, bool) or not isinstance(score, (int, float)) or not isinstance(doc_id, int):
+        raise ValueError("Curseur de pagination invalide")
+    return float(score), doc_id
+
+
+def decode_engine_after(token: str) -> Tuple[After, str]:
+    """Position (score, id) et moteur d'un jeton de pagination ; ValueError s'il est invalide"""
+    score, doc_id, engine = decode_cursor(token, 3)
+    if isinstance(score, bool) or not isinstance(score, (int, float)) or not isinstance(doc_id, int) \
+            or not isinstance(engine, str):
+        raise ValueError("Curseur de pagination invalide")
+    return (float(score), doc_id), engine
+
+
+def paginate(items: Sequence[T], limit: int,
+             position: Callable[[T], Sequence[Any]]) -> Tuple[List[T], Optional[str]]:
+    """Page des ``limit`` premiers éléments (sur ``limit + 1`` demandés) et curseur de la suivante (None : fin)"""
+    page = list(items[:limit])
+    if len(items) <= limit or not page:
+        return page, None
+    return page, encode_cursor(*position(page[-1]))
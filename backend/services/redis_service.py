@@ -45,19 +45,28 @@ class RedisService:
             logger.error(f"Redis non connecté: {e}")
         return False
     
+    def _serialize(self, value: Any) -> str:
+        """Sérialise une valeur pour Redis"""
+        if isinstance(value, (dict, list)):
+            return json.dumps(value, ensure_ascii=False)
+        return str(value)
+    
+    def _deserialize(self, value: Optional[str]) -> Optional[Any]:
+        """Désérialise une valeur lue dans Redis"""
+        if value is None:
+            return None
+        try:
+            return json.loads(value)
+        except (json.JSONDecodeError, TypeError):
+            return value
+    
     def set_cache(self, key: str, value: Any, expire_seconds: int = 3600) -> bool:
         """Met en cache une valeur"""
         try:
             if not self.is_connected():
                 return False
             
-            # Sérialisation JSON
-            if isinstance(value, (dict, list)):
-                serialized_value = json.dumps(value, ensure_ascii=False)
-            else:
-                serialized_value = str(value)
-            
-            self.redis_client.setex(key, expire_seconds, serialized_value)
+            self.redis_client.setex(key, expire_seconds, self._serialize(value))
             logger.debug(f"Cache mis à jour: {key}")
             return True
             
@@ -71,20 +80,41 @@ class RedisService:
             if not self.is_connected():
                 return None
             
-            value = self.redis_client.get(key)
-            if value is None:
-                return None
-            
-            # Tentative de désérialisation JSON
-            try:
-                return json.loads(value)
-            except (json.JSONDecodeError, TypeError):
-                return value
+            return self._deserialize(self.redis_client.get(key))
                 
         except Exception as e:
             logger.error(f"Erreur de récupération du cache: {e}")
             return None
     
+    def set_cache_many(self, items: Dict[str, Any], expire_seconds: int = 3600) -> bool:
+        """Met en cache plusieurs valeurs en un seul aller-retour (pipeline)"""
+        try:
+            if not items or not self.is_connected():
+                return False
+            
+            pipe = self.redis_client.pipeline(transaction=False)
+            for key, value in items.items():
+                pipe.setex(key, expire_seconds, self._serialize(value))
+            pipe.execute()
+            logger.debug(f"Cache mis à jour: {len(items)} clés")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Erreur de mise en cache multiple: {e}")
+            return False
+    
+    def get_cache_many(self, keys: List[str]) -> List[Optional[Any]]:
+        """Récupère plusieurs valeurs du cache en une seule commande MGET"""
+        try:
+            if not keys or not self.is_connected():
+                return [None] * len(keys)
+            
+            return [self._deserialize(value) for value in self.redis_client.mget(keys)]
+                
+        except Exception as e:
+            logger.error(f"Erreur de récupération multiple du cache: {e}")
+            return [None] * len(keys)
+    
     def delete_cache(self, key: str) -> bool:
         """Supprime une valeur du cache"""
         try:
@@ -109,6 +139,15 @@ class RedisService:
         cache_key = f"analysis:{text_hash}"
         return self.get_cache(cache_key)
     
+    def cache_analyses(self, analysis_results: Dict[str, Dict[str, Any]], expire_seconds: int = 7200) -> bool:
+        """Met en cache un lot de résultats d'analyse indexés par hash de texte"""
+        items = {f"analysis:{text_hash}": result for text_hash, result in analysis_results.items()}
+        return self.set_cache_many(items, expire_seconds)
+    
+    def get_cached_analyses(self, text_hashes: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Récupère un lot de résultats d'analyse du cache (dans l'ordre des hashes)"""
+        return self.get_cache_many([f"analysis:{text_hash}" for text_hash in text_hashes])
+    
     def cache_search_results(self, query_hash: str, search_results: Dict[str, Any], expire_seconds: int = 1800) -> bool:
         """Met en cache des résultats de recherche"""
         cache_key = f"search:{query_hash}"
@@ -154,6 +193,23 @@ class RedisService:
         cache_key = f"sourate:{sourate_id}"
         return self.get_cache(cache_key)
     
+    def publish_lexicon(self, source: str, version: str) -> bool:
+        """Publie la source et la version du lexique courant, lues par tous les workers (sans expiration)"""
+        try:
+            if not self.is_connected():
+                return False
+            
+            self.redis_client.set("lexicon:current", self._serialize({"source": source, "version": version}))
+            return True
+            
+        except Exception as e:
+            logger.error(f"Erreur de publication du lexique: {e}")
+            return False
+    
+    def get_published_lexicon(self) -> Optional[Dict[str, str]]:
+        """Source et version du lexique publiées par le dernier rechargement"""
+        return self.get_cache("lexicon:current")
+    
     def get_cache_stats(self) -> Dict[str, Any]:
         """Récupère les statistiques du cache"""
         try:
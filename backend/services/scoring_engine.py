@@ -0,0 +1,204 @@
+"""
+Moteur de scoring heptuple par lots (NumPy si disponible, Python pur sinon)
+"""
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from models import DimensionType
+from services.keyword_matcher import KeywordMatcher
+from services.text_normalizer import TokenStream
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+DIMENSIONS = list(DimensionType)
+KEYWORD_WEIGHT = 10.0
+
+
+class BatchScores:
+    """Scores d'un lot de documents : bruts, normalisés (0-100) et confiance"""
+
+    __slots__ = ("raw", "normalized", "confidence")
+
+    def __init__(self, raw: List[List[float]], normalized: List[List[int]],
+                 confidence: Optional[List[List[float]]]):
+        self.raw = raw
+        self.normalized = normalized
+        self.confidence = confidence
+
+    def __len__(self) -> int:
+        return len(self.normalized)
+
+
+class ScoringEngine:
+    """Calcule les profils heptuple d'un lot de documents.
+
+    Les documents sont groupés par langue détectée. Chaque langue a son
+    automate, dont les mots-clés reçoivent des identifiants de terme : un
+    passage compte les termes d'un document, sans parcourir ceux des autres
+    langues. Avec NumPy, les comptes d'un groupe forment une matrice
+    documents×termes (np.bincount) multipliée une fois par la matrice de poids
+    termes×dimensions de la langue ; normalisation min-max et confiance sont
+    vectorisées. Sans NumPy, les mêmes calculs sont faits en Python pur, avec
+    des résultats identiques à ceux de l'analyse texte par texte.
+    """
+
+    def __init__(self, dimension_keywords: Dict[DimensionType, Dict[str, List[str]]],
+                 languages: Sequence[str] = ('ar', 'fr', 'en'), use_numpy: Optional[bool] = None):
+        self.languages = list(languages)
+        self.use_numpy = np is not None if use_numpy is None else use_numpy and np is not None
+
+        # Par langue : automate étiqueté par identifiant de terme, et dimension de chaque terme
+        self.matchers: Dict[str, KeywordMatcher] = {}
+        self.term_dimensions: Dict[str, List[int]] = {}
+        for lang in self.languages:
+            term_keywords: Dict[int, List[str]] = {}
+            dimensions: List[int] = []
+            for dim_index, dim_id in enumerate(DIMENSIONS):
+                keywords = dimension_keywords.get(dim_id, {})
+                for keyword in keywords.get(lang, keywords.get('fr', [])):
+                    term_keywords[len(dimensions)] = [keyword]
+                    dimensions.append(dim_index)
+            self.matchers[lang] = KeywordMatcher(term_keywords)
+            self.term_dimensions[lang] = dimensions
+
+        if self.use_numpy:
+            # Poids termes×dimensions : un seul poids non nul par terme
+            self._weights = {}
+            for lang, dimensions in self.term_dimensions.items():
+                weights = np.zeros((len(dimensions), len(DIMENSIONS)))
+                weights[np.arange(len(dimensions)), dimensions] = KEYWORD_WEIGHT
+                self._weights[lang] = weights
+
+    @property
+    def backend(self) -> str:
+        """Implémentation utilisée : ``numpy`` ou ``python``"""
+        return "numpy" if self.use_numpy else "python"
+
+    def score(self, streams: Sequence[TokenStream], languages: Sequence[str],
+              include_confidence: bool = True) -> BatchScores:
+        """Scores d'un lot de flux de jetons, chacun dans sa langue détectée"""
+        groups: Dict[str, List[int]] = {}
+        for doc, lang in enumerate(languages):
+            groups.setdefault(lang if lang in self.matchers else 'fr', []).append(doc)
+        text_lengths = [stream.text_length for stream in streams]
+
+        if self.use_numpy:
+            return self._score_numpy(streams, groups, text_lengths, include_confidence)
+        return self._score_python(streams, groups, text_lengths, include_confidence)
+
+    def _score_numpy(self, streams: Sequence[TokenStream], groups: Dict[str, List[int]],
+                     text_lengths: List[int], include_confidence: bool) -> BatchScores:
+        raw = np.zeros((len(streams), len(DIMENSIONS)))
+        for lang, docs in groups.items():
+            matcher = self.matchers[lang]
+            n_terms = len(self.term_dimensions[lang])
+            rows: List[int] = []
+            terms: List[int] = []
+            values: List[int] = []
+            for row, doc in enumerate(docs):
+                counts = matcher.count_tokens(streams[doc].tokens, streams[doc].separators)
+                rows.extend([row] * len(counts))
+                terms.extend(counts)
+                values.extend(counts.values())
+            if not values or not n_terms:
+                continue
+            # Comptes documents×termes du groupe, puis un seul produit par les poids de la langue
+            term_counts = np.bincount(np.asarray(rows) * n_terms + np.asarray(terms), weights=values,
+                                      minlength=len(docs) * n_terms).reshape(len(docs), n_terms)
+            raw[docs] = term_counts @ self._weights[lang]
+
+        # Normalisation min-max par document, avec les cas limites de normalize_scores
+        low = raw.min(axis=1, keepdims=True)
+        high = raw.max(axis=1, keepdims=True)
+        spread = high - low
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scaled = np.trunc((raw - low) / spread * 100)
+        normalized = np.clip(np.nan_to_num(scaled), 0, 100).astype(np.int64)
+        normalized[(spread == 0).ravel()] = 50
+        normalized[(high == 0).ravel()] = 14
+
+        confidence = None
+        if include_confidence:
+            # La confiance ne dépend que de (longueur plafonnée à 1000, score normalisé) : chaque couple
+            # distinct est arrondi une fois par round() Python, dont np.round diffère sur certaines valeurs
+            lengths = np.minimum(np.asarray(text_lengths, dtype=np.int64), 1000)
+            keys, inverse = np.unique(lengths[:, None] * 101 + normalized, return_inverse=True)
+            values = np.minimum(1.0, (keys // 101) / 1000) * 0.5 + (keys % 101) / 100 * 0.5
+            rounded = np.array([round(value, 3) for value in values.tolist()])
+            confidence = rounded[inverse.reshape(normalized.shape)].tolist()
+
+        return BatchScores(raw.tolist(), normalized.tolist(), confidence)
+
+    def _score_python(self, streams: Sequence[TokenStream], groups: Dict[str, List[int]],
+                      text_lengths: List[int], include_confidence: bool) -> BatchScores:
+        raw: List[List[float]] = [[]] * len(streams)
+        for lang, docs in groups.items():
+            matcher = self.matchers[lang]
+            dimensions = self.term_dimensions[lang]
+            for doc in docs:
+                scores = [0.0] * len(DIMENSIONS)
+                for term_id, value in matcher.count_tokens(streams[doc].tokens, streams[doc].separators).items():
+                    scores[dimensions[term_id]] += value * KEYWORD_WEIGHT
+                raw[doc] = scores
+
+        normalized = [normalize_scores(scores) for scores in raw]
+        confidence = None
+        if include_confidence:
+            confidence = [compute_confidence_scores(length, scores) for length, scores in zip(text_lengths, normalized)]
+        return BatchScores(raw, normalized, confidence)
+
+
+def normalize_scores(scores: List[float]) -> List[int]:
+    """Normalise les scores entre 0 et 100"""
+    if not scores or max(scores) == 0:
+        return [14] * 7
+
+    min_score = min(scores)
+    max_score = max(scores)
+
+    if max_score == min_score:
+        return [50] * 7
+
+    normalized = []
+    for score in scores:
+        normalized_score = int(((score - min_score) / (max_score - min_score)) * 100)
+        normalized.append(max(0, min(100, normalized_score)))
+
+    return normalized
+
+
+def sliding_window_scores(raw: Sequence[Sequence[float]], window: int) -> List[List[int]]:
+    """Profils normalisés des fenêtres glissantes centrées sur chaque document.
+
+    Le score brut d'une fenêtre est la somme des scores bruts de ses
+    documents, tenue à jour par sommes glissantes (ajout du document entrant,
+    retrait du sortant). Ce n'est pas le score de la concaténation des
+    textes : la langue reste détectée document par document, et un mot-clé
+    de plusieurs mots à cheval sur deux documents n'est pas compté.
+    """
+    n_docs = len(raw)
+    half = window // 2
+    sums = [0.0] * len(DIMENSIONS)
+    start = end = 0
+    profiles = []
+
+    for i in range(n_docs):
+        low = max(0, i - half)
+        high = min(n_docs, i - half + window)
+        while end < high:
+            sums = [total + score for total, score in zip(sums, raw[end])]
+            end += 1
+        while start < low:
+            sums = [total - score for total, score in zip(sums, raw[start])]
+            start += 1
+        profiles.append(normalize_scores(sums))
+
+    return profiles
+
+
+def compute_confidence_scores(text_length: int, scores: Iterable[int]) -> List[float]:
+    """Calcule les scores de confiance"""
+    text_length_factor = min(1.0, text_length / 1000)
+    return [round(text_length_factor * 0.5 + score / 100 * 0.5, 3) for score in scores]
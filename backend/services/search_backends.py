@@ -0,0 +1,178 @@
+"""
+Moteurs de recherche classée de SearchService : PostgreSQL, index BM25 en mémoire et Elasticsearch
+
+Chaque moteur renvoie, pour un corpus (versets, hadiths, fiqh, exégèses), des
+lignes classées par score décroissant puis par identifiant, avec des scores sur
+la même échelle [0, 1[ et la pagination par position (score, id).
+"""
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from database import DatabaseService, parse_profile_ranges
+from services.pagination import After
+from services.search_index import CORPORA, CorpusSpec, SearchIndex
+
+logger = logging.getLogger(__name__)
+
+SEARCH_BACKENDS = ("postgres", "memory", "elasticsearch")
+
+# (ligne, score, extraits surlignés ; None : à générer par SearchService)
+Ranked = List[Tuple[Any, float, Optional[Dict[str, List[str]]]]]
+# Facette -> valeur -> nombre de résultats
+FacetCounts = Dict[str, Dict[Any, int]]
+
+
+class SearchBackend:
+    """Moteur de recherche classée des corpus"""
+
+    name = "base"
+    # Vrai si le moteur tient un index à construire puis rafraîchir (build, refresh)
+    needs_indexing = False
+
+    @property
+    def ready(self) -> bool:
+        return True
+
+    def cursor_tag(self) -> str:
+        """Moteur dont les scores sont mémorisés dans un curseur ; les positions d'un autre moteur n'y ont pas de sens"""
+        return self.name
+
+    def search(self, db: Session, corpus: str, query: str, filters: Optional[Dict[str, Any]] = None,
+               limit: int = 20, after: Optional[After] = None) -> Ranked:
+        """Résultats d'un corpus situés après ``after``, par score décroissant puis id croissant"""
+        raise NotImplementedError
+
+    def facets(self, db: Session, corpus: str, query: str, filters: Optional[Dict[str, Any]] = None) -> FacetCounts:
+        """Nombre de résultats par valeur de chaque facette ; le filtre d'une facette n'est pas appliqué à ses propres comptes"""
+        raise NotImplementedError
+
+    def build(self, db: Session) -> Dict[str, int]:
+        """Construit l'index complet du moteur"""
+        return {}
+
+    def refresh(self, db: Session) -> Dict[str, int]:
+        """Indexe les lignes nouvelles ou modifiées et retire les lignes supprimées"""
+        return {}
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, "ready": self.ready}
+
+
+class PostgresBackend(SearchBackend):
+    """Recherche plein texte en base (index GIN, ts_rank_cd), toujours disponible"""
+
+    name = "postgres"
+
+    def search(self, db: Session, corpus: str, query: str, filters: Optional[Dict[str, Any]] = None,
+               limit: int = 20, after: Optional[After] = None) -> Ranked:
+        filters = filters or {}
+        db_service = DatabaseService(db)
+        if corpus == "versets":
+            return db_service.search_versets_ranked(
+                query, limit=limit, sourate_id=filters.get("sourate_id"), dimension=filters.get("dimension"), after=after,
+                profile=parse_profile_ranges(filters.get("profil")),
+                analyzer_version=filters.get("analyzer_version"), lexicon_hash=filters.get("lexicon_hash")
+            )
+        if corpus == "hadiths":
+            return db_service.search_hadiths_ranked(
+                query, limit=limit, recueil=filters.get("recueil"), authenticite=filters.get("authenticite"),
+                dimension=filters.get("dimension"), after=after
+            )
+        if corpus == "fiqh":
+            return db_service.search_fiqh_ranked(
+                query, rite=filters.get("rite"), topic=filters.get("topic"), limit=limit, after=after
+            )
+        if corpus == "exegeses":
+            return db_service.search_exegeses_ranked(query, limit=limit, after=after)
+        raise ValueError(f"Corpus de recherche inconnu: {corpus}")
+
+    def facets(self, db: Session, corpus: str, query: str, filters: Optional[Dict[str, Any]] = None) -> FacetCounts:
+        filters = filters or {}
+        db_service = DatabaseService(db)
+        if corpus == "versets":
+            return db_service.facet_versets(
+                query, sourate_id=filters.get("sourate_id"), dimension=filters.get("dimension"),
+                profile=parse_profile_ranges(filters.get("profil")),
+                analyzer_version=filters.get("analyzer_version"), lexicon_hash=filters.get("lexicon_hash")
+            )
+        if corpus == "hadiths":
+            return db_service.facet_hadiths(
+                query, recueil=filters.get("recueil"), authenticite=filters.get("authenticite"),
+                dimension=filters.get("dimension")
+            )
+        if corpus == "fiqh":
+            return db_service.facet_fiqh(query, rite=filters.get("rite"), topic=filters.get("topic"))
+        raise ValueError(f"Corpus sans facettes: {corpus}")
+
+
+class IndexedBackend(SearchBackend):
+    """Moteur à index externe à la base : il classe des identifiants, les lignes sont lues ensuite"""
+
+    needs_indexing = True
+
+    def __init__(self, corpora: Optional[Dict[str, CorpusSpec]] = None):
+        self.corpora = corpora or CORPORA
+
+    def search(self, db: Session, corpus: str, query: str, filters: Optional[Dict[str, Any]] = None,
+               limit: int = 20, after: Optional[After] = None) -> Ranked:
+        ranked = self.search_ids(corpus, query, filters, limit, after)
+        if not ranked:
+            return []
+        model = self.corpora[corpus].model
+        rows = {row.id: row for row in db.query(model).filter(model.id.in_([doc_id for doc_id, _ in ranked]))}
+        return [(rows[doc_id], score, None) for doc_id, score in ranked if doc_id in rows]
+
+    def search_ids(self, corpus: str, query: str, filters: Optional[Dict[str, Any]],
+                   limit: int, after: Optional[After]) -> List[Tuple[int, float]]:
+        """(id, score) des meilleurs documents d'un corpus"""
+        raise NotImplementedError
+
+
+class MemoryBackend(IndexedBackend):
+    """Index inversé BM25F en mémoire du processus"""
+
+    name = "memory"
+
+    def __init__(self, index: Optional[SearchIndex] = None):
+        self.index = index or SearchIndex()
+        super().__init__(self.index.corpora)
+
+    @property
+    def ready(self) -> bool:
+        return self.index.ready
+
+    def cursor_tag(self) -> str:
+        # Les scores changent avec le contenu indexé : un curseur n'est valable que pour une génération de l'index
+        return f"{self.name}:{self.index.generation}"
+
+    def search_ids(self, corpus: str, query: str, filters: Optional[Dict[str, Any]],
+                   limit: int, after: Optional[After]) -> List[Tuple[int, float]]:
+        return self.index.search(corpus, query, limit=limit, filters=filters, after=after)
+
+    def facets(self, db: Session, corpus: str, query: str, filters: Optional[Dict[str, Any]] = None) -> FacetCounts:
+        return self.index.facets(corpus, query, filters)
+
+    def build(self, db: Session) -> Dict[str, int]:
+        return self.index.build(db)
+
+    def refresh(self, db: Session) -> Dict[str, int]:
+        return self.index.refresh(db)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, **self.index.get_stats()}
+
+
+def create_search_backend(name: Optional[str] = None) -> SearchBackend:
+    """Moteur de recherche configuré (SEARCH_BACKEND : postgres, memory ou elasticsearch)"""
+    name = (name or os.getenv("SEARCH_BACKEND", "memory")).lower()
+    if name == "postgres":
+        return PostgresBackend()
+    if name == "memory":
+        return MemoryBackend()
+    if name == "elasticsearch":
+        from services.elasticsearch_backend import ElasticsearchBackend
+        return ElasticsearchBackend()
+    raise ValueError(f"Moteur de recherche inconnu: {name} (attendu: {', '.join(SEARCH_BACKENDS)})")
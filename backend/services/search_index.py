@@ -0,0 +1,454 @@
+"""
+Index inversé en mémoire (BM25F) des versets, hadiths, avis de fiqh et exégèses
+"""
+import gc
+import heapq
+import logging
+import math
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from database import Exegese, FiqhRuling, Hadith, Verset
+from services.pagination import After, is_after
+from services.text_normalizer import tokenize
+
+logger = logging.getLogger(__name__)
+
+# Préfixes arabes (article, conjonctions, prépositions) retirés des jetons
+ARABIC_PREFIXES = ('وال', 'بال', 'كال', 'فال', 'لل', 'ال')
+
+# Opérateurs de requête : les termes sont requis (ET) sauf séparés par OU
+OR_OPERATORS = frozenset(['OR', 'OU', '|', '||'])
+AND_OPERATORS = frozenset(['AND', 'ET', '&', '&&'])
+_QUERY_PATTERN = re.compile(r'"([^"]*)"|(\S+)')
+
+
+@lru_cache(maxsize=200_000)
+def light_stem(token: str) -> str:
+    """Retire le préfixe arabe d'un jeton normalisé s'il reste au moins deux lettres"""
+    for prefix in ARABIC_PREFIXES:
+        if token.startswith(prefix) and len(token) - len(prefix) >= 2:
+            return token[len(prefix):]
+    return token
+
+
+def analyze_text(text: Optional[str]) -> List[str]:
+    """Termes indexés d'un texte : jetons normalisés puis allégés de leurs préfixes arabes"""
+    if not text:
+        return []
+    return [light_stem(token) for token in tokenize(text).tokens if token]
+
+
+def parse_query(query: str, default_operator: str = "and") -> List[List[Tuple[str, ...]]]:
+    """Découpe une requête en clauses alternatives (OU) de groupes requis (ET).
+
+    Chaque groupe est un tuple de termes consécutifs : une phrase entre
+    guillemets, ou un mot que la normalisation coupe en plusieurs jetons.
+    Avec ``default_operator="or"``, chaque groupe forme sa propre clause.
+    """
+    clauses: List[List[Tuple[str, ...]]] = [[]]
+    for match in _QUERY_PATTERN.finditer(query):
+        phrase, word = match.groups()
+        if word is not None and word.upper() in OR_OPERATORS:
+            clauses.append([])
+            continue
+        if word is not None and word.upper() in AND_OPERATORS:
+            continue
+        terms = tuple(analyze_text(phrase if phrase is not None else word))
+        if not terms:
+            continue
+        if default_operator == "or" and clauses[-1]:
+            clauses.append([])
+        clauses[-1].append(terms)
+    return [clause for clause in clauses if clause]
+
+
+class InvertedIndex:
+    """Index inversé positionnel d'un corpus, classé par BM25F.
+
+    Chaque document a plusieurs champs pondérés (``boosts``) : les
+    occurrences d'un terme sont pondérées par champ et normalisées par la
+    longueur du champ avant la saturation BM25, ce qui évite qu'un terme
+    répété dans un champ secondaire l'emporte sur le champ principal. Les
+    positions permettent les requêtes par phrase ; ``add``/``remove``
+    mettent l'index à jour document par document.
+    """
+
+    def __init__(self, boosts: Mapping[str, float], k1: float = 1.2, b: float = 0.75):
+        self.boosts = dict(boosts)
+        self.k1 = k1
+        self.b = b
+
+        # terme -> document -> champ -> positions
+        self._postings: Dict[str, Dict[int, Dict[str, List[int]]]] = defaultdict(dict)
+        self._lengths: Dict[int, Dict[str, int]] = {}
+        self._doc_terms: Dict[int, Set[str]] = {}
+        self._metadata: Dict[int, Dict[str, Any]] = {}
+        self._total_lengths = {field: 0 for field in self.boosts}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def __contains__(self, doc_id: int) -> bool:
+        return doc_id in self._lengths
+
+    def doc_ids(self) -> Set[int]:
+        """Identifiants des documents indexés"""
+        with self._lock:
+            return set(self._lengths)
+
+    def add(self, doc_id: int, fields: Mapping[str, Optional[str]], metadata: Optional[Dict[str, Any]] = None) -> None:
+        """Indexe (ou réindexe) un document"""
+        analyzed = {field: analyze_text(fields.get(field)) for field in self.boosts}
+        with self._lock:
+            self._remove(doc_id)
+            lengths = {}
+            doc_terms = set()
+            for field, terms in analyzed.items():
+                lengths[field] = len(terms)
+                self._total_lengths[field] += len(terms)
+                positions = defaultdict(list)
+                for position, term in enumerate(terms):
+                    positions[term].append(position)
+                for term, term_positions in positions.items():
+                    self._postings[term].setdefault(doc_id, {})[field] = term_positions
+                doc_terms.update(positions)
+            self._lengths[doc_id] = lengths
+            self._doc_terms[doc_id] = doc_terms
+            self._metadata[doc_id] = metadata or {}
+
+    def remove(self, doc_id: int) -> bool:
+        """Retire un document de l'index"""
+        with self._lock:
+            return self._remove(doc_id)
+
+    def search(self, query: str, limit: int = 20, default_operator: str = "and",
+               predicate: Optional[Callable[[Dict[str, Any]], bool]] = None,
+               after: Optional[After] = None) -> List[Tuple[int, float]]:
+        """Renvoie les ``limit`` meilleurs documents (id, score BM25F normalisé), par score décroissant.
+
+        Seuls les documents situés après la position ``after`` (score, id) sont retenus.
+        """
+        clauses = parse_query(query, default_operator)
+        if not clauses or limit <= 0:
+            return []
+
+        with self._lock:
+            candidates = self._match(clauses)
+            if predicate is not None:
+                candidates = {doc_id for doc_id in candidates if predicate(self._metadata[doc_id])}
+            if not candidates:
+                return []
+
+            terms = {term for clause in clauses for group in clause for term in group}
+            scores = self._score(candidates, terms)
+
+        # Scores arrondis avant la comparaison au curseur, qui porte des scores arrondis
+        rounded = ((doc_id, round(score, 4)) for doc_id, score in scores.items())
+        if after is not None:
+            rounded = (item for item in rounded if is_after(item[1], item[0], after))
+        # Départage stable : à score égal, le plus petit identifiant d'abord
+        return heapq.nlargest(limit, rounded, key=lambda item: (item[1], -item[0]))
+
+    def facets(self, query: str, facets: Mapping[str, str],
+               conditions: Mapping[str, Callable[[Dict[str, Any]], bool]],
+               default_operator: str = "and") -> Dict[str, Dict[Any, int]]:
+        """Nombre de documents trouvés par valeur de métadonnée, en un passage sur les documents trouvés.
+
+        ``facets`` associe un nom de filtre à sa métadonnée, ``conditions`` les
+        filtres actifs par nom. Le compte d'une facette ignore le filtre posé
+        sur cette même facette.
+        """
+        counts: Dict[str, Counter] = {name: Counter() for name in facets}
+        clauses = parse_query(query, default_operator)
+        if not clauses:
+            return {name: {} for name in facets}
+
+        with self._lock:
+            for doc_id in self._match(clauses):
+                metadata = self._metadata[doc_id]
+                failed = [name for name, condition in conditions.items() if not condition(metadata)]
+                if len(failed) > 1 or (failed and failed[0] not in facets):
+                    continue
+                for name, key in facets.items():
+                    if (not failed or failed[0] == name) and metadata.get(key) is not None:
+                        counts[name][metadata[key]] += 1
+        return {name: dict(counter) for name, counter in counts.items()}
+
+    def _match(self, clauses: List[List[Tuple[str, ...]]]) -> Set[int]:
+        candidates: Set[int] = set()
+        for clause in clauses:
+            candidates |= self._match_clause(clause)
+        return candidates
+
+    def _remove(self, doc_id: int) -> bool:
+        lengths = self._lengths.pop(doc_id, None)
+        if lengths is None:
+            return False
+        for field, length in lengths.items():
+            self._total_lengths[field] -= length
+        self._metadata.pop(doc_id, None)
+        for term in self._doc_terms.pop(doc_id):
+            docs = self._postings[term]
+            del docs[doc_id]
+            if not docs:
+                del self._postings[term]
+        return True
+
+    def _match_clause(self, clause: Sequence[Tuple[str, ...]]) -> Set[int]:
+        # Groupes les plus sélectifs d'abord pour réduire l'intersection au plus tôt
+        ordered = sorted(clause, key=lambda group: min(len(self._postings.get(term, ())) for term in group))
+        matched: Optional[Set[int]] = None
+        for group in ordered:
+            docs = self._match_group(group, matched)
+            matched = docs if matched is None else matched & docs
+            if not matched:
+                return set()
+        return matched or set()
+
+    def _match_group(self, group: Tuple[str, ...], within: Optional[Set[int]]) -> Set[int]:
+        postings = [self._postings.get(term) for term in group]
+        if not all(postings):
+            return set()
+        docs = set(min(postings, key=len))
+        if within is not None:
+            docs &= within
+        for term_docs in postings:
+            docs &= term_docs.keys()
+        if len(group) == 1:
+            return docs
+        return {doc_id for doc_id in docs if self._has_phrase(doc_id, postings)}
+
+    def _has_phrase(self, doc_id: int, postings: List[Dict[int, Dict[str, List[int]]]]) -> bool:
+        first = postings[0][doc_id]
+        for field, positions in first.items():
+            following = [term_docs[doc_id].get(field) for term_docs in postings[1:]]
+            if not all(following):
+                continue
+            following_sets = [set(term_positions) for term_positions in following]
+            for start in positions:
+                if all(start + offset in term_positions
+                       for offset, term_positions in enumerate(following_sets, 1)):
+                    return True
+        return False
+
+    def _score(self, candidates: Set[int], terms: Set[str]) -> Dict[int, float]:
+        doc_count = len(self._lengths)
+        average = {field: (total / doc_count if doc_count else 0.0) or 1.0
+                   for field, total in self._total_lengths.items()}
+        scores = dict.fromkeys(candidates, 0.0)
+        # Score maximal de la requête : chaque terme apporte moins de idf * (k1 + 1)
+        ceiling = 0.0
+
+        for term in terms:
+            docs = self._postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1 + (doc_count - len(docs) + 0.5) / (len(docs) + 0.5))
+            ceiling += idf * (self.k1 + 1)
+            matching = candidates.intersection(docs) if len(candidates) < len(docs) else docs.keys() & candidates
+            for doc_id in matching:
+                lengths = self._lengths[doc_id]
+                weighted_tf = 0.0
+                for field, positions in docs[doc_id].items():
+                    norm = 1 - self.b + self.b * lengths[field] / average[field]
+                    weighted_tf += self.boosts[field] * len(positions) / norm
+                scores[doc_id] += idf * weighted_tf * (self.k1 + 1) / (weighted_tf + self.k1)
+        # Ramené dans [0, 1[ pour être comparable d'un corpus (et d'une requête) à l'autre
+        if ceiling:
+            for doc_id in scores:
+                scores[doc_id] /= ceiling
+        return scores
+
+
+class CorpusSpec(NamedTuple):
+    """Description d'un corpus indexé : modèle, champs pondérés, métadonnées de filtrage"""
+    model: Any
+    boosts: Dict[str, float]
+    metadata: Tuple[str, ...]
+    # Filtre de recherche -> (métadonnée, "eq" ou "contains")
+    filters: Dict[str, Tuple[str, str]]
+    # Filtres dont les valeurs trouvées sont comptées (facettes)
+    facets: Tuple[str, ...]
+    # Colonne de date permettant de repérer les lignes modifiées
+    timestamp: str
+
+
+# Pondérations reprises des scores de pertinence historiques de SearchService
+CORPORA: Dict[str, CorpusSpec] = {
+    "versets": CorpusSpec(
+        model=Verset,
+        boosts={"texte_arabe": 2.0, "traduction_francaise": 1.5, "traduction_anglaise": 1.0},
+        metadata=("sourate_id", "dimension_principale"),
+        filters={"sourate_id": ("sourate_id", "eq"), "dimension": ("dimension_principale", "eq")},
+        facets=("sourate_id", "dimension"),
+        timestamp="updated_at",
+    ),
+    "hadiths": CorpusSpec(
+        model=Hadith,
+        boosts={"texte_francais": 2.0, "texte_arabe": 1.5, "narrateur": 1.0, "recueil": 0.5},
+        metadata=("recueil", "degre_authenticite", "dimension_heptuple"),
+        filters={
+            "recueil": ("recueil", "contains"),
+            "authenticite": ("degre_authenticite", "eq"),
+            "dimension": ("dimension_heptuple", "eq"),
+        },
+        facets=("recueil", "authenticite", "dimension"),
+        timestamp="updated_at",
+    ),
+    "fiqh": CorpusSpec(
+        model=FiqhRuling,
+        boosts={"ruling_text": 2.0, "question": 1.5, "topic": 1.0},
+        metadata=("rite", "topic"),
+        filters={"rite": ("rite", "eq"), "topic": ("topic", "contains")},
+        facets=("rite",),
+        timestamp="updated_at",
+    ),
+    "exegeses": CorpusSpec(
+        model=Exegese,
+        boosts={"texte_exegese": 2.0, "auteur": 1.0, "titre_ouvrage": 0.5},
+        metadata=("sourate_id", "dimension_heptuple", "langue"),
+        filters={"sourate_id": ("sourate_id", "eq"), "dimension": ("dimension_heptuple", "eq")},
+        facets=("sourate_id", "dimension"),
+        timestamp="updated_at",
+    ),
+}
+
+
+def build_conditions(spec: CorpusSpec, filters: Optional[Dict[str, Any]]) -> Dict[str, Callable[[Dict[str, Any]], bool]]:
+    """Traduit chaque filtre actif d'une recherche en condition sur les métadonnées indexées"""
+    conditions = {}
+    for name, value in (filters or {}).items():
+        if not value or name not in spec.filters:
+            continue
+        key, operator = spec.filters[name]
+        if operator == "contains":
+            needle = str(value).lower()
+            conditions[name] = lambda meta, key=key, needle=needle: needle in (meta.get(key) or "").lower()
+        else:
+            conditions[name] = lambda meta, key=key, value=value: meta.get(key) == value
+    return conditions
+
+
+def build_predicate(spec: CorpusSpec, filters: Optional[Dict[str, Any]]) -> Optional[Callable[[Dict[str, Any]], bool]]:
+    """Traduit les filtres d'une recherche en prédicat sur les métadonnées indexées"""
+    conditions = list(build_conditions(spec, filters).values())
+    if not conditions:
+        return None
+    return lambda meta: all(condition(meta) for condition in conditions)
+
+
+class SearchIndex:
+    """Index inversés des corpus de recherche, construits au démarrage et rafraîchis par incréments"""
+
+    def __init__(self, corpora: Optional[Dict[str, CorpusSpec]] = None):
+        self.corpora = corpora or CORPORA
+        self.indexes = {name: InvertedIndex(spec.boosts) for name, spec in self.corpora.items()}
+        self.ready = False
+        # Incrémentée à chaque changement du contenu indexé : les scores BM25 (idf, longueurs moyennes) changent avec lui
+        self.generation = 0
+        self._refreshed_at: Dict[str, Any] = {}
+        self._build_lock = threading.Lock()
+        self._stats = {"builds": 0, "refreshes": 0, "last_build_ms": None, "last_refresh_ms": None}
+
+    def build(self, db: Session) -> Dict[str, int]:
+        """Reconstruit tous les index puis les substitue aux index courants"""
+        with self._build_lock:
+            start = time.perf_counter()
+            indexes = {name: InvertedIndex(spec.boosts) for name, spec in self.corpora.items()}
+            refreshed_at = {}
+            # Le ramasse-miettes cyclique est suspendu pendant la construction :
+            # les postings sont des millions de petits objets sans cycles
+            gc_enabled = gc.isenabled()
+            gc.disable()
+            try:
+                for name, spec in self.corpora.items():
+                    refreshed_at[name] = db.query(func.now()).scalar()
+                    for row in self._rows(db, spec):
+                        self._index_row(indexes[name], spec, row)
+            finally:
+                if gc_enabled:
+                    gc.enable()
+            self.indexes = indexes
+            self._refreshed_at = refreshed_at
+            self.ready = True
+            self.generation += 1
+            self._stats["builds"] += 1
+            self._stats["last_build_ms"] = round((time.perf_counter() - start) * 1000, 1)
+            return {name: len(index) for name, index in indexes.items()}
+
+    def refresh(self, db: Session) -> Dict[str, int]:
+        """Indexe les lignes nouvelles ou modifiées et retire les lignes supprimées"""
+        if not self.ready:
+            return self.build(db)
+
+        with self._build_lock:
+            start = time.perf_counter()
+            changes = {}
+            for name, spec in self.corpora.items():
+                index = self.indexes[name]
+                now = db.query(func.now()).scalar()
+                current_ids = {row_id for row_id, in db.query(spec.model.id)}
+                indexed_ids = index.doc_ids()
+
+                for doc_id in indexed_ids - current_ids:
+                    index.remove(doc_id)
+                new_ids = current_ids - indexed_ids
+                timestamp = getattr(spec.model, spec.timestamp)
+                rows = self._rows(db, spec, or_(spec.model.id.in_(sorted(new_ids)), timestamp >= self._refreshed_at[name]))
+                for row in rows:
+                    self._index_row(index, spec, row)
+                self._refreshed_at[name] = now
+                changes[name] = len(rows) + len(indexed_ids - current_ids)
+
+            if any(changes.values()):
+                self.generation += 1
+            self._stats["refreshes"] += 1
+            self._stats["last_refresh_ms"] = round((time.perf_counter() - start) * 1000, 1)
+            return changes
+
+    def search(self, corpus: str, query: str, limit: int = 20, filters: Optional[Dict[str, Any]] = None,
+               default_operator: str = "and", after: Optional[After] = None) -> List[Tuple[int, float]]:
+        """Recherche classée dans un corpus : liste de (id, score) par pertinence décroissante"""
+        spec = self.corpora[corpus]
+        return self.indexes[corpus].search(query, limit, default_operator, build_predicate(spec, filters), after)
+
+    def facets(self, corpus: str, query: str, filters: Optional[Dict[str, Any]] = None,
+               default_operator: str = "and") -> Dict[str, Dict[Any, int]]:
+        """Nombre de documents trouvés par valeur de chaque facette du corpus"""
+        spec = self.corpora[corpus]
+        facets = {name: spec.filters[name][0] for name in spec.facets}
+        return self.indexes[corpus].facets(query, facets, build_conditions(spec, filters), default_operator)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Taille des index et durées de construction et de rafraîchissement"""
+        return {
+            "ready": self.ready,
+            "generation": self.generation,
+            "documents": {name: len(index) for name, index in self.indexes.items()},
+            **self._stats,
+        }
+
+    def _rows(self, db: Session, spec: CorpusSpec, condition=None) -> List[Any]:
+        names = dict.fromkeys(("id", *spec.boosts, *spec.metadata))
+        columns = [getattr(spec.model, name) for name in names]
+        query = db.query(*columns)
+        if condition is not None:
+            query = query.filter(condition)
+        return query.all()
+
+    def _index_row(self, index: InvertedIndex, spec: CorpusSpec, row: Any) -> None:
+        values = row._mapping
+        index.add(
+            values["id"],
+            {field: values[field] for field in spec.boosts},
+            {key: values[key] for key in spec.metadata},
+        )
@@ -1,338 +1,508 @@
 """
 Service de recherche avancée pour Coran, Hadiths et Fiqh
 """
+import heapq
 import logging
-import re
-from typing import List, Dict, Optional, Any
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable, List, Dict, Optional, Any, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy import or_, and_, func, text
 from database import (
     DatabaseService, Sourate, Verset, Hadith, Exegese, 
-    Citation, Histoire, FiqhRuling, ProfilHeptuple
+    Citation, Histoire, FiqhRuling, ProfilHeptuple, parse_profile_ranges
 )
 from models import SearchResult, Sourate as SourateModel, Verset as VersetModel
+from services.heptuple_analyzer import HeptupleAnalyzer
+from services.pagination import After, StaleCursorError, decode_cursor, decode_engine_after, encode_cursor, paginate
+from services.search_backends import PostgresBackend, SearchBackend
+from services.sourate_catalog import SourateCatalog
+from services.text_normalizer import normalize_text
 
 logger = logging.getLogger(__name__)
 
+# Recherche approchée (pg_trgm) : corpus couverts et seuil de similarité par défaut
+FUZZY_SEARCH_TYPES = ("sourates", "versets", "hadiths", "fiqh")
+FUZZY_THRESHOLD = float(os.getenv("SEARCH_FUZZY_THRESHOLD", "0.3"))
+
+# Sources de la recherche universelle
+UNIVERSAL_SOURCES = ("coran", "hadiths", "fiqh")
+# Source -> corpus dont les résultats sont comptés par facette
+FACET_CORPORA = {"coran": "versets", "hadiths": "hadiths", "fiqh": "fiqh"}
+
+# Moteur de repli, sans état
+POSTGRES_BACKEND = PostgresBackend()
+
 class SearchService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, backend: Optional[SearchBackend] = None, fanout: Optional["SearchFanout"] = None,
+                 catalog: Optional[SourateCatalog] = None, analyzer: Optional[HeptupleAnalyzer] = None,
+                 statement_timeout_ms: Optional[int] = None):
         self.db = db
         self.db_service = DatabaseService(db)
+        # Moteur de recherche configuré ; recherche plein texte en base tant qu'il n'est pas prêt
+        self.backend = backend
+        # Exécution parallèle de la recherche universelle (sinon, sources l'une après l'autre)
+        self.fanout = fanout
+        # Catalogue des sourates en mémoire ; lecture en base tant qu'il n'est pas prêt
+        self.catalog = catalog
+        # Analyseur courant : les filtres de profil ne portent que sur les profils de versets à jour
+        self.analyzer = analyzer
+        # Délai des requêtes posé sur la transaction par l'appelant, rétabli après une annulation
+        self.statement_timeout_ms = statement_timeout_ms
+        # Par corpus : moteur qui a classé la position de reprise (curseur), moteur qui a servi la recherche
+        self.cursor_engines: Dict[str, str] = {}
+        self.served_engines: Dict[str, str] = {}
     
-    def search_coran_advanced(self, query: str, filters: Optional[Dict[str, Any]] = None, limit: int = 20) -> List[SearchResult]:
+    def search_coran_advanced(self, query: str, filters: Optional[Dict[str, Any]] = None, limit: int = 20,
+                              after: Optional[After] = None) -> List[SearchResult]:
         """Recherche avancée dans le Coran"""
         try:
-            results = []
-            query_clean = query.strip()
-            
-            if not query_clean:
-                return results
-            
-            # Recherche dans les versets
-            versets = self._search_versets(query_clean, filters, limit)
-            
-            for verset in versets:
-                sourate = self.db_service.get_sourate_by_id(verset.sourate_id)
-                if sourate:
-                    verset_model = VersetModel(
-                        id=verset.id,
-                        sourate_id=verset.sourate_id,
-                        numero_verset=verset.numero_verset,
-                        texte_arabe=verset.texte_arabe,
-                        traduction_francaise=verset.traduction_francaise
-                    )
-                    
-                    sourate_model = SourateModel(
-                        id=sourate.id,
-                        numero=sourate.numero,
-                        nom_arabe=sourate.nom_arabe,
-                        nom_francais=sourate.nom_francais,
-                        type_revelation=sourate.type_revelation,
-                        nombre_versets=sourate.nombre_versets
-                    )
-                    
-                    # Calcul du score de pertinence
-                    relevance_score = self._calculate_relevance_score(query_clean, verset)
-                    
-                    result = SearchResult(
-                        verset=verset_model,
-                        sourate=sourate_model,
-                        similarity_score=relevance_score,
-                        score=relevance_score,
-                        highlights=self._generate_highlights(query_clean, verset)
-                    )
-                    results.append(result)
-            
-            # Tri par score de pertinence
-            results.sort(key=lambda x: x.score or 0, reverse=True)
-            return results[:limit]
-            
+            return self._search_coran(query, filters, limit, after)
         except Exception as e:
             logger.error(f"Erreur de recherche Coran: {e}")
             return []
     
-    def search_hadiths_advanced(self, query: str, filters: Optional[Dict[str, Any]] = None, limit: int = 20) -> List[Dict[str, Any]]:
-        """Recherche avancée dans les Hadiths Sahih"""
-        try:
-            results = []
-            query_clean = query.strip()
-            
-            if not query_clean:
-                return results
-            
-            # Construction de la requête
-            q = f"%{query_clean}%"
-            query_builder = self.db.query(Hadith).filter(
-                or_(
-                    Hadith.texte_arabe.ilike(q),
-                    Hadith.texte_francais.ilike(q),
-                    Hadith.narrateur.ilike(q),
-                    Hadith.recueil.ilike(q)
+    def _search_coran(self, query: str, filters: Optional[Dict[str, Any]], limit: int,
+                      after: Optional[After]) -> List[SearchResult]:
+        results = []
+        query_clean = query.strip()
+        
+        if not query_clean:
+            return results
+        
+        # Recherche dans les versets, classés par pertinence
+        for verset, relevance_score, highlights in self._ranked("versets", query_clean, filters, limit, after):
+            sourate = self._sourate(verset.sourate_id)
+            if sourate:
+                verset_model = VersetModel(
+                    id=verset.id,
+                    sourate_id=verset.sourate_id,
+                    numero_verset=verset.numero_verset,
+                    texte_arabe=verset.texte_arabe,
+                    traduction_francaise=verset.traduction_francaise
+                )
+        
+                sourate_model = SourateModel(
+                    id=sourate.id,
+                    numero=sourate.numero,
+                    nom_arabe=sourate.nom_arabe,
+                    nom_francais=sourate.nom_francais,
+                    type_revelation=sourate.type_revelation,
+                    nombre_versets=sourate.nombre_versets
+                )
+        
+                result = SearchResult(
+                    verset=verset_model,
+                    sourate=sourate_model,
+                    similarity_score=relevance_score,
+                    score=relevance_score,
+                    highlights=highlights if highlights is not None else self._generate_highlights(query_clean, verset)
                 )
-            )
-            
-            # Filtres additionnels
-            if filters:
-                if filters.get("recueil"):
-                    query_builder = query_builder.filter(Hadith.recueil.ilike(f"%{filters['recueil']}%"))
-                
-                if filters.get("authenticite"):
-                    query_builder = query_builder.filter(Hadith.degre_authenticite == filters["authenticite"])
-                
-                if filters.get("dimension"):
-                    query_builder = query_builder.filter(Hadith.dimension_heptuple == filters["dimension"])
-            
-            hadiths = query_builder.limit(limit).all()
-            
-            for hadith in hadiths:
-                result = {
-                    "id": hadith.id,
-                    "numero_hadith": hadith.numero_hadith,
-                    "recueil": hadith.recueil,
-                    "livre": hadith.livre,
-                    "chapitre": hadith.chapitre,
-                    "texte_arabe": hadith.texte_arabe,
-                    "texte_francais": hadith.texte_francais,
-                    "narrateur": hadith.narrateur,
-                    "degre_authenticite": hadith.degre_authenticite,
-                    "dimension_heptuple": hadith.dimension_heptuple,
-                    "mots_cles": hadith.mots_cles or [],
-                    "themes": hadith.themes or [],
-                    "contexte_historique": hadith.contexte_historique,
-                    "relevance_score": self._calculate_hadith_relevance_score(query_clean, hadith),
-                    "highlights": self._generate_hadith_highlights(query_clean, hadith)
-                }
                 results.append(result)
-            
-            # Tri par score de pertinence
-            results.sort(key=lambda x: x["relevance_score"], reverse=True)
-            return results
-            
+        
+        # Tri par score de pertinence
+        results.sort(key=lambda x: x.score or 0, reverse=True)
+        return results[:limit]
+    
+    def _sourate(self, sourate_id: int) -> Any:
+        """Sourate d'un verset trouvé, lue dans le catalogue s'il est prêt, en base s'il ne la connaît pas encore"""
+        if self.catalog is not None and self.catalog.ready:
+            sourate = self.catalog.get(sourate_id)
+            if sourate is not None:
+                return sourate
+        return self.db_service.get_sourate_by_id(sourate_id)
+    
+    def search_hadiths_advanced(self, query: str, filters: Optional[Dict[str, Any]] = None, limit: int = 20,
+                                after: Optional[After] = None) -> List[Dict[str, Any]]:
+        """Recherche avancée dans les Hadiths Sahih"""
+        try:
+            return self._search_hadiths(query, filters, limit, after)
         except Exception as e:
             logger.error(f"Erreur de recherche Hadiths: {e}")
             return []
     
-    def search_fiqh_advanced(self, query: str, filters: Optional[Dict[str, Any]] = None, limit: int = 20) -> List[Dict[str, Any]]:
+    def _search_hadiths(self, query: str, filters: Optional[Dict[str, Any]], limit: int,
+                        after: Optional[After]) -> List[Dict[str, Any]]:
+        results = []
+        query_clean = query.strip()
+        
+        if not query_clean:
+            return results
+        
+        ranked = self._ranked("hadiths", query_clean, filters, limit, after)
+        return [self._format_hadith(hadith, query_clean, score, highlights) for hadith, score, highlights in ranked]
+    
+    def _format_hadith(self, hadith: Hadith, query: str, relevance_score: float,
+                       highlights: Optional[Dict[str, List[str]]] = None) -> Dict[str, Any]:
+        """Met en forme un hadith trouvé"""
+        return {
+            "id": hadith.id,
+            "numero_hadith": hadith.numero_hadith,
+            "recueil": hadith.recueil,
+            "livre": hadith.livre,
+            "chapitre": hadith.chapitre,
+            "texte_arabe": hadith.texte_arabe,
+            "texte_francais": hadith.texte_francais,
+            "narrateur": hadith.narrateur,
+            "degre_authenticite": hadith.degre_authenticite,
+            "dimension_heptuple": hadith.dimension_heptuple,
+            "mots_cles": hadith.mots_cles or [],
+            "themes": hadith.themes or [],
+            "contexte_historique": hadith.contexte_historique,
+            "relevance_score": relevance_score,
+            "highlights": highlights if highlights is not None else self._generate_hadith_highlights(query, hadith)
+        }
+    
+    def search_fiqh_advanced(self, query: str, filters: Optional[Dict[str, Any]] = None, limit: int = 20,
+                             after: Optional[After] = None) -> List[Dict[str, Any]]:
         """Recherche avancée dans la jurisprudence (Fiqh)"""
         try:
-            results = []
-            query_clean = query.strip()
-            
-            if not query_clean:
-                return results
-            
-            # Construction de la requête
-            q = f"%{query_clean}%"
-            query_builder = self.db.query(FiqhRuling).filter(
-                or_(
-                    FiqhRuling.topic.ilike(q),
-                    FiqhRuling.question.ilike(q),
-                    FiqhRuling.ruling_text.ilike(q)
-                )
-            )
-            
-            # Filtres additionnels
-            if filters:
-                if filters.get("rite"):
-                    query_builder = query_builder.filter(FiqhRuling.rite == filters["rite"])
-                
-                if filters.get("topic"):
-                    query_builder = query_builder.filter(FiqhRuling.topic.ilike(f"%{filters['topic']}%"))
-            
-            rulings = query_builder.limit(limit).all()
-            
-            for ruling in rulings:
-                result = {
-                    "id": ruling.id,
-                    "rite": ruling.rite,
-                    "topic": ruling.topic,
-                    "question": ruling.question,
-                    "ruling_text": ruling.ruling_text,
-                    "evidences": ruling.evidences or [],
-                    "sources": ruling.sources or [],
-                    "keywords": ruling.keywords or [],
-                    "relevance_score": self._calculate_fiqh_relevance_score(query_clean, ruling),
-                    "highlights": self._generate_fiqh_highlights(query_clean, ruling)
-                }
-                results.append(result)
-            
-            # Tri par score de pertinence
-            results.sort(key=lambda x: x["relevance_score"], reverse=True)
-            return results
-            
+            return self._search_fiqh(query, filters, limit, after)
         except Exception as e:
             logger.error(f"Erreur de recherche Fiqh: {e}")
             return []
     
-    def search_universal(self, query: str, search_types: List[str] = None, limit: int = 20) -> Dict[str, List[Any]]:
-        """Recherche universelle dans tous les corpus"""
+    def _search_fiqh(self, query: str, filters: Optional[Dict[str, Any]], limit: int,
+                     after: Optional[After]) -> List[Dict[str, Any]]:
+        results = []
+        query_clean = query.strip()
+        
+        if not query_clean:
+            return results
+        
+        ranked = self._ranked("fiqh", query_clean, filters, limit, after)
+        return [self._format_ruling(ruling, query_clean, score, highlights) for ruling, score, highlights in ranked]
+    
+    def _format_ruling(self, ruling: FiqhRuling, query: str, relevance_score: float,
+                       highlights: Optional[Dict[str, List[str]]] = None) -> Dict[str, Any]:
+        """Met en forme un avis de fiqh trouvé"""
+        return {
+            "id": ruling.id,
+            "rite": ruling.rite,
+            "topic": ruling.topic,
+            "question": ruling.question,
+            "ruling_text": ruling.ruling_text,
+            "evidences": ruling.evidences or [],
+            "sources": ruling.sources or [],
+            "keywords": ruling.keywords or [],
+            "relevance_score": relevance_score,
+            "highlights": highlights if highlights is not None else self._generate_fiqh_highlights(query, ruling)
+        }
+    
+    def search_universal(self, query: str, search_types: List[str] = None, limit: int = 20,
+                         cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Recherche universelle dans tous les corpus, classée globalement.
+
+        Chaque source renvoie au plus ``limit + 1`` résultats situés après le
+        curseur, avec des scores sur la même échelle [0, 1[ ; un tas les fusionne
+        en un seul classement dont les ``limit`` premiers forment la page.
+        Le curseur mémorise le moteur qui a classé chaque source ; lève
+        ValueError s'il est invalide ou périmé.
+        """
+        position = self.decode_universal_cursor(cursor) if cursor else None
         try:
             if search_types is None:
-                search_types = ["coran", "hadiths", "fiqh"]
+                search_types = list(UNIVERSAL_SOURCES)
             
             results = {
                 "coran": [],
                 "hadiths": [],
                 "fiqh": [],
-                "total_results": 0
+                "results": [],
+                "total_results": 0,
+                "next_cursor": None,
+                "partial": False,
+                "missing_sources": [],
+                "latency_ms": {}
             }
             
             query_clean = query.strip()
             if not query_clean:
                 return results
             
-            # Recherche dans le Coran
-            if "coran" in search_types:
-                coran_results = self.search_coran_advanced(query_clean, limit=limit//3)
-                results["coran"] = coran_results
-            
-            # Recherche dans les Hadiths
-            if "hadiths" in search_types:
-                hadith_results = self.search_hadiths_advanced(query_clean, limit=limit//3)
-                results["hadiths"] = hadith_results
-            
-            # Recherche dans le Fiqh
-            if "fiqh" in search_types:
-                fiqh_results = self.search_fiqh_advanced(query_clean, limit=limit//3)
-                results["fiqh"] = fiqh_results
-            
-            # Calcul du total
-            results["total_results"] = len(results["coran"]) + len(results["hadiths"]) + len(results["fiqh"])
+            sources = [source for source in UNIVERSAL_SOURCES if source in search_types]
+            afters = {source: self._source_after(source, position) for source in sources}
+            cursor_engines = position[3] if position else {}
+            
+            # Sources en parallèle, chacune sur sa propre connexion
+            if self.fanout is not None:
+                found, latency, missing, engines = self.fanout.run(sources, query_clean, limit + 1, afters, cursor_engines)
+            else:
+                found, latency, missing = {}, {}, []
+                self.cursor_engines.update({FACET_CORPORA[source]: engine for source, engine in cursor_engines.items()})
+                for source in sources:
+                    start = time.perf_counter()
+                    try:
+                        found[source] = self.fetch_source(source, query_clean, limit + 1, afters[source])
+                    except StaleCursorError:
+                        raise
+                    except Exception as e:
+                        logger.error(f"Erreur de recherche universelle ({source}): {e}")
+                        # La transaction en échec est annulée pour les sources suivantes
+                        self._rollback()
+                        missing.append(source)
+                        continue
+                    latency[source] = round((time.perf_counter() - start) * 1000, 1)
+                engines = {source: self.served_engines[FACET_CORPORA[source]]
+                           for source in found if FACET_CORPORA[source] in self.served_engines}
+            
+            # Fusion des listes déjà classées : score décroissant, puis ordre des sources, puis id
+            streams = [[(source, item) for item in found[source]] for source in sources if source in found]
+            merged = heapq.merge(*streams, key=lambda entry: self._merge_key(*entry))
+            page = [entry for _, entry in zip(range(limit + 1), merged)]
+            
+            for source, item in page[:limit]:
+                score, _ = self._result_position(source, item)
+                results[source].append(item)
+                results["results"].append({"type": source, "score": score, "item": item})
+            
+            # Un résultat de plus que la page : la suite existe
+            if len(page) > limit:
+                last_source, last_item = page[limit - 1]
+                # Une source manquante garde le moteur de la page précédente
+                results["next_cursor"] = encode_cursor(*self._result_position(last_source, last_item), last_source,
+                                                       {**cursor_engines, **engines})
+            
+            results["latency_ms"] = latency
+            results["missing_sources"] = missing
+            results["partial"] = bool(missing)
+            results["total_results"] = len(results["results"])
             
             return results
             
+        except StaleCursorError:
+            raise
         except Exception as e:
             logger.error(f"Erreur de recherche universelle: {e}")
-            return {"coran": [], "hadiths": [], "fiqh": [], "total_results": 0}
+            return {"coran": [], "hadiths": [], "fiqh": [], "results": [], "total_results": 0, "next_cursor": None,
+                    "partial": True, "missing_sources": list(search_types or UNIVERSAL_SOURCES), "latency_ms": {}}
     
-    def _search_versets(self, query: str, filters: Optional[Dict[str, Any]], limit: int) -> List[Verset]:
-        """Recherche dans les versets avec filtres"""
-        try:
-            q = f"%{query}%"
-            query_builder = self.db.query(Verset).filter(
-                or_(
-                    Verset.texte_arabe.ilike(q),
-                    Verset.traduction_francaise.ilike(q)
-                )
-            )
-            
-            # Filtres additionnels
-            if filters:
-                if filters.get("sourate_id"):
-                    query_builder = query_builder.filter(Verset.sourate_id == filters["sourate_id"])
-                
-                if filters.get("dimension"):
-                    query_builder = query_builder.filter(Verset.dimension_principale == filters["dimension"])
-            
-            return query_builder.limit(limit).all()
-            
-        except Exception as e:
-            logger.error(f"Erreur de recherche versets: {e}")
-            return []
+    @staticmethod
+    def decode_universal_cursor(cursor: str) -> Tuple[float, int, str, Dict[str, str]]:
+        """Position (score, id, source) du dernier résultat d'une page de la recherche universelle et moteur de chaque source"""
+        score, item_id, source, engines = decode_cursor(cursor, 4)
+        if not isinstance(score, (int, float)) or not isinstance(item_id, int) or source not in UNIVERSAL_SOURCES \
+                or not isinstance(engines, dict) \
+                or not all(name in UNIVERSAL_SOURCES and isinstance(engine, str) for name, engine in engines.items()):
+            raise ValueError("Curseur de pagination invalide")
+        return float(score), item_id, source, engines
     
-    def _calculate_relevance_score(self, query: str, verset: Verset) -> float:
-        """Calcule le score de pertinence pour un verset"""
-        try:
-            score = 0.0
-            query_lower = query.lower()
-            
-            # Score basé sur la correspondance dans le texte arabe
-            if verset.texte_arabe:
-                arabic_matches = len(re.findall(re.escape(query_lower), verset.texte_arabe.lower()))
-                score += arabic_matches * 2.0
-            
-            # Score basé sur la correspondance dans la traduction
-            if verset.traduction_francaise:
-                french_matches = len(re.findall(re.escape(query_lower), verset.traduction_francaise.lower()))
-                score += french_matches * 1.5
-            
-            # Bonus pour correspondance exacte
-            if query_lower in (verset.texte_arabe or "").lower():
-                score += 1.0
-            if query_lower in (verset.traduction_francaise or "").lower():
-                score += 0.5
-            
-            return min(score, 10.0)  # Score maximum de 10
-            
-        except Exception as e:
-            logger.error(f"Erreur de calcul de score: {e}")
-            return 0.0
+    @staticmethod
+    def _source_after(source: str, position: Optional[Tuple[float, int, str, Dict[str, str]]]) -> Optional[After]:
+        """Position à partir de laquelle une source reprend, d'après le dernier résultat fusionné"""
+        if position is None:
+            return None
+        score, item_id, cursor_source, _ = position
+        order = UNIVERSAL_SOURCES.index(source) - UNIVERSAL_SOURCES.index(cursor_source)
+        if order < 0:
+            # Source classée avant celle du curseur : ses ex aequo ont déjà été servis
+            return (score, None)
+        if order > 0:
+            # Source classée après : tous ses ex aequo restent à servir (identifiants SERIAL >= 1)
+            return (score, 0)
+        return (score, item_id)
     
-    def _calculate_hadith_relevance_score(self, query: str, hadith: Hadith) -> float:
-        """Calcule le score de pertinence pour un hadith"""
-        try:
-            score = 0.0
-            query_lower = query.lower()
-            
-            # Score basé sur la correspondance dans le texte
-            if hadith.texte_francais:
-                french_matches = len(re.findall(re.escape(query_lower), hadith.texte_francais.lower()))
-                score += french_matches * 2.0
-            
-            if hadith.texte_arabe:
-                arabic_matches = len(re.findall(re.escape(query_lower), hadith.texte_arabe.lower()))
-                score += arabic_matches * 1.5
-            
-            # Bonus pour correspondance dans le narrateur
-            if hadith.narrateur and query_lower in hadith.narrateur.lower():
-                score += 1.0
-            
-            # Bonus pour correspondance dans le recueil
-            if hadith.recueil and query_lower in hadith.recueil.lower():
-                score += 0.5
-            
-            return min(score, 10.0)
-            
-        except Exception as e:
-            logger.error(f"Erreur de calcul de score hadith: {e}")
-            return 0.0
+    @staticmethod
+    def _result_position(source: str, item: Any) -> Tuple[float, int]:
+        """(score, id) d'un résultat de la recherche universelle"""
+        if source == "coran":
+            return item.score or 0.0, item.verset.id
+        return item["relevance_score"], item["id"]
+    
+    @classmethod
+    def _merge_key(cls, source: str, item: Any) -> Tuple[float, int, int]:
+        score, item_id = cls._result_position(source, item)
+        return -score, UNIVERSAL_SOURCES.index(source), item_id
     
-    def _calculate_fiqh_relevance_score(self, query: str, ruling: FiqhRuling) -> float:
-        """Calcule le score de pertinence pour un ruling fiqh"""
+    def search_source(self, source: str, query: str, limit: int, after: Optional[After] = None,
+                      filters: Optional[Dict[str, Any]] = None) -> List[Any]:
+        """Recherche dans une source de la recherche universelle"""
+        if source == "coran":
+            return self.search_coran_advanced(query, filters, limit=limit, after=after)
+        if source == "hadiths":
+            return self.search_hadiths_advanced(query, filters, limit=limit, after=after)
+        return self.search_fiqh_advanced(query, filters, limit=limit, after=after)
+    
+    def fetch_source(self, source: str, query: str, limit: int, after: Optional[After] = None,
+                     filters: Optional[Dict[str, Any]] = None) -> List[Any]:
+        """Recherche dans une source sans masquer ses erreurs (délai dépassé, base indisponible)"""
+        if source == "coran":
+            return self._search_coran(query, filters, limit, after)
+        if source == "hadiths":
+            return self._search_hadiths(query, filters, limit, after)
+        return self._search_fiqh(query, filters, limit, after)
+    
+    def search_page(self, source: str, query: str, filters: Optional[Dict[str, Any]] = None, limit: int = 20,
+                    cursor: Optional[str] = None) -> Tuple[List[Any], Optional[str]]:
+        """Page de résultats d'une source et curseur de la page suivante (None : dernière page).
+
+        La page reprend après la position (score, id) du curseur : le coût ne
+        dépend pas du rang de la page. Le curseur mémorise le moteur qui a
+        classé la page ; lève ValueError s'il est invalide ou périmé (autre
+        moteur, index modifié) et si le filtre de profil (clé ``profil``) est
+        invalide. Les erreurs de la base
+        (indisponible, statement_timeout) sont propagées : une page vide
+        signifierait à tort la fin des résultats.
+        """
+        corpus = FACET_CORPORA[source]
+        after = None
+        if cursor:
+            after, self.cursor_engines[corpus] = decode_engine_after(cursor)
+        filters = self._profile_filters(filters)
+        found = self.fetch_source(source, query, limit + 1, after, filters)
+        engine = self.served_engines.get(corpus)
+        return paginate(found, limit, lambda item: (*self._result_position(source, item), engine))
+
+    def search_facets(self, source: str, query: str,
+                      filters: Optional[Dict[str, Any]] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Comptes par facette des résultats d'une source, par nombre décroissant.
+
+        Les comptes d'une facette ignorent son propre filtre (sélection
+        multiple) et sont calculés en une passe par le moteur configuré,
+        PostgreSQL s'il n'est pas prêt ou en erreur. Lève ValueError si le
+        filtre de profil est invalide.
+        """
+        corpus = FACET_CORPORA[source]
+        query_clean = query.strip()
+        if not query_clean:
+            return {}
+        filters = self._profile_filters(filters)
+
+        counts = None
+        profile_filtered = corpus == "versets" and bool((filters or {}).get("profil"))
+        if self._uses_index(profile_filtered):
+            try:
+                counts = self.backend.facets(self.db, corpus, query_clean, filters)
+            except Exception as e:
+                logger.warning(f"Facettes {self.backend.name} indisponibles, repli sur PostgreSQL: {e}")
+                self._rollback()
+        if counts is None:
+            counts = POSTGRES_BACKEND.facets(self.db, corpus, query_clean, filters)
+        return {
+            name: [{"value": value, "count": count}
+                   for value, count in sorted(values.items(), key=lambda item: (-item[1], str(item[0])))]
+            for name, values in counts.items()
+        }
+
+    def _profile_filters(self, filters: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Filtres avec les bornes de profil analysées et la version des profils à jour (analyseur, lexique)"""
+        if not filters or not filters.get("profil"):
+            return filters
+        if self.analyzer is None:
+            raise ValueError("Filtre de profil indisponible pour cette recherche")
+        return {**filters, "profil": parse_profile_ranges(filters["profil"]),
+                "analyzer_version": self.analyzer.VERSION, "lexicon_hash": self.analyzer.lexicon_hash}
+
+    def search_fuzzy(self, query: str, search_types: Optional[List[str]] = None,
+                     threshold: float = FUZZY_THRESHOLD, limit: int = 20) -> Dict[str, Any]:
+        """Recherche approchée par trigrammes (noms mal orthographiés, translittérations)"""
         try:
-            score = 0.0
-            query_lower = query.lower()
+            if search_types is None:
+                search_types = list(FUZZY_SEARCH_TYPES)
             
-            # Score basé sur la correspondance dans le ruling
-            if ruling.ruling_text:
-                ruling_matches = len(re.findall(re.escape(query_lower), ruling.ruling_text.lower()))
-                score += ruling_matches * 2.0
+            results: Dict[str, Any] = {search_type: [] for search_type in FUZZY_SEARCH_TYPES}
+            query_clean = query.strip()
+            if not query_clean:
+                return {**results, "threshold": threshold, "total_results": 0}
+            
+            # Seuil des opérateurs indexés % et <% pour cette transaction
+            self.db_service.set_fuzzy_threshold(threshold)
+            
+            if "sourates" in search_types:
+                results["sourates"] = [
+                    {
+                        "id": sourate.id,
+                        "numero": sourate.numero,
+                        "nom_arabe": sourate.nom_arabe,
+                        "nom_francais": sourate.nom_francais,
+                        "type_revelation": sourate.type_revelation,
+                        "nombre_versets": sourate.nombre_versets,
+                        "similarity": similarity
+                    }
+                    for sourate, similarity in self.db_service.fuzzy_sourates(query_clean, limit)
+                ]
+            
+            if "versets" in search_types:
+                results["versets"] = [
+                    {
+                        "id": verset.id,
+                        "sourate_id": verset.sourate_id,
+                        "numero_verset": verset.numero_verset,
+                        "texte_arabe": verset.texte_arabe,
+                        "texte_translitteration": verset.texte_translitteration,
+                        "traduction_francaise": verset.traduction_francaise,
+                        "similarity": similarity
+                    }
+                    for verset, similarity in self.db_service.fuzzy_versets(query_clean, limit)
+                ]
             
-            # Score basé sur la correspondance dans la question
-            if ruling.question:
-                question_matches = len(re.findall(re.escape(query_lower), ruling.question.lower()))
-                score += question_matches * 1.5
+            if "hadiths" in search_types:
+                results["hadiths"] = [self._format_hadith(hadith, query_clean, similarity)
+                                      for hadith, similarity in self.db_service.fuzzy_hadiths(query_clean, limit)]
             
-            # Score basé sur la correspondance dans le topic
-            if ruling.topic:
-                topic_matches = len(re.findall(re.escape(query_lower), ruling.topic.lower()))
-                score += topic_matches * 1.0
+            if "fiqh" in search_types:
+                results["fiqh"] = [self._format_ruling(ruling, query_clean, similarity)
+                                   for ruling, similarity in self.db_service.fuzzy_fiqh(query_clean, limit)]
             
-            return min(score, 10.0)
+            results["threshold"] = threshold
+            results["total_results"] = sum(len(results[search_type]) for search_type in FUZZY_SEARCH_TYPES)
+            return results
             
         except Exception as e:
-            logger.error(f"Erreur de calcul de score fiqh: {e}")
-            return 0.0
+            logger.error(f"Erreur de recherche approchée: {e}")
+            return {**{search_type: [] for search_type in FUZZY_SEARCH_TYPES}, "threshold": threshold, "total_results": 0}
+    
+    def _ranked(self, corpus: str, query: str, filters: Optional[Dict[str, Any]], limit: int,
+                after: Optional[After] = None) -> List[Tuple[Any, float, Optional[Dict[str, List[str]]]]]:
+        """Résultats classés du moteur configuré ; PostgreSQL s'il n'est pas prêt ou en erreur.
+
+        Les filtres de profil heptuple (clé ``profil``) portent sur profils_versets :
+        seul PostgreSQL les évalue. Une position classée par un autre moteur que
+        celui qui sert la requête lève StaleCursorError.
+        """
+        profile_filtered = corpus == "versets" and bool((filters or {}).get("profil"))
+        if self._uses_index(profile_filtered):
+            self._check_cursor_engine(corpus, self.backend, after)
+            try:
+                found = self.backend.search(self.db, corpus, query, filters, limit, after)
+                self.served_engines[corpus] = self.backend.cursor_tag()
+                return found
+            except Exception as e:
+                logger.warning(f"Moteur de recherche {self.backend.name} indisponible, repli sur PostgreSQL: {e}")
+                self._rollback()
+        self._check_cursor_engine(corpus, POSTGRES_BACKEND, after)
+        found = POSTGRES_BACKEND.search(self.db, corpus, query, filters, limit, after)
+        self.served_engines[corpus] = POSTGRES_BACKEND.cursor_tag()
+        return found
+
+    def _check_cursor_engine(self, corpus: str, engine: SearchBackend, after: Optional[After]) -> None:
+        """Refuse une position de reprise classée par un autre moteur : ses scores ne sont pas comparables"""
+        expected = self.cursor_engines.get(corpus)
+        if after is not None and expected is not None and expected != engine.cursor_tag():
+            raise StaleCursorError()
+
+    def _uses_index(self, profile_filtered: bool) -> bool:
+        """Vrai si le moteur configuré est un index prêt, distinct du repli PostgreSQL.
+
+        Avec le moteur postgres, une erreur n'est pas rejouée : la même requête
+        échouerait de nouveau (et doublerait un statement_timeout).
+        """
+        return (self.backend is not None and not isinstance(self.backend, PostgresBackend)
+                and self.backend.ready and not profile_filtered)
+
+    def _rollback(self) -> None:
+        """Annule la transaction en échec (sinon « current transaction is aborted ») et rétablit le délai des requêtes"""
+        self.db.rollback()
+        if self.statement_timeout_ms is not None:
+            self.db_service.set_statement_timeout(self.statement_timeout_ms)
+    
+    @staticmethod
+    def _matches_arabic(query: str, normalized_text: Optional[str]) -> bool:
+        """Recherche d'une requête dans un texte texte_arabe_norm, normalisée de la même façon (sans tashkeel)"""
+        return bool(normalized_text) and normalize_text(query) in normalized_text
     
     def _generate_highlights(self, query: str, verset: Verset) -> Dict[str, List[str]]:
         """Génère les highlights pour un verset"""
@@ -340,7 +510,7 @@ class SearchService:
             highlights = {"arabe": [], "francais": []}
             query_clean = query.strip()
             
-            if verset.texte_arabe and query_clean in verset.texte_arabe:
+            if verset.texte_arabe and self._matches_arabic(query_clean, verset.texte_arabe_norm):
                 highlights["arabe"].append(verset.texte_arabe)
             
             if verset.traduction_francaise and query_clean in verset.traduction_francaise:
@@ -361,7 +531,7 @@ class SearchService:
             if hadith.texte_francais and query_clean in hadith.texte_francais:
                 highlights["francais"].append(hadith.texte_francais)
             
-            if hadith.texte_arabe and query_clean in hadith.texte_arabe:
+            if hadith.texte_arabe and self._matches_arabic(query_clean, hadith.texte_arabe_norm):
                 highlights["arabe"].append(hadith.texte_arabe)
             
             return highlights
@@ -387,3 +557,113 @@ class SearchService:
         except Exception as e:
             logger.error(f"Erreur de génération highlights fiqh: {e}")
             return {"ruling": [], "question": []}
+
+
+class SearchFanout:
+    """Exécution parallèle des sources de la recherche universelle.
+
+    Chaque source tourne dans un thread avec sa propre session (donc sa propre
+    connexion du pool). Au-delà de ``timeout_seconds``, les sources non
+    terminées sont signalées comme manquantes et la réponse est renvoyée avec
+    les autres ; leurs requêtes SQL sont interrompues par statement_timeout.
+    Les latences par source sont conservées pour le suivi.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], backend: Optional[SearchBackend] = None,
+                 max_workers: Optional[int] = None, timeout_seconds: Optional[float] = None, history: int = 1000,
+                 catalog: Optional[SourateCatalog] = None):
+        self.session_factory = session_factory
+        self.backend = backend
+        self.catalog = catalog
+        self.max_workers = max_workers or int(os.getenv("SEARCH_FANOUT_WORKERS", "6"))
+        self.timeout_seconds = timeout_seconds or float(os.getenv("SEARCH_SOURCE_TIMEOUT_SECONDS", "2.0"))
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="search")
+
+        self._lock = threading.Lock()
+        self._latencies = {source: deque(maxlen=history) for source in UNIVERSAL_SOURCES}
+        self._calls = dict.fromkeys(UNIVERSAL_SOURCES, 0)
+        self._timeouts = dict.fromkeys(UNIVERSAL_SOURCES, 0)
+        self._errors = dict.fromkeys(UNIVERSAL_SOURCES, 0)
+
+    def run(self, sources: List[str], query: str, limit: int, afters: Optional[Dict[str, Optional[After]]] = None,
+            cursor_engines: Optional[Dict[str, str]] = None
+            ) -> Tuple[Dict[str, List[Any]], Dict[str, float], List[str], Dict[str, str]]:
+        """Interroge les sources en parallèle : (résultats, latences en ms, sources manquantes, moteur de chaque source).
+
+        Lève StaleCursorError si une source n'est plus servie par le moteur de ``cursor_engines``.
+        """
+        afters = afters or {}
+        cursor_engines = cursor_engines or {}
+        futures = {self._pool.submit(self._search_source, source, query, limit, afters.get(source),
+                                     cursor_engines.get(source)): source
+                   for source in sources}
+        done, _ = wait(futures, timeout=self.timeout_seconds)
+
+        found: Dict[str, List[Any]] = {}
+        latency: Dict[str, float] = {}
+        missing: List[str] = []
+        engines: Dict[str, str] = {}
+        for future, source in futures.items():
+            if future not in done:
+                # Une source encore en file n'est pas lancée ; une source en cours se termine seule
+                future.cancel()
+                missing.append(source)
+                with self._lock:
+                    self._timeouts[source] += 1
+                continue
+            try:
+                found[source], latency[source], engine = future.result()
+            except StaleCursorError:
+                raise
+            except Exception as e:
+                logger.error(f"Erreur de recherche universelle ({source}): {e}")
+                missing.append(source)
+                continue
+            if engine is not None:
+                engines[source] = engine
+        return found, latency, missing, engines
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Appels, dépassements de délai, erreurs et latences (ms) par source"""
+        with self._lock:
+            snapshot = {source: (sorted(self._latencies[source]), self._calls[source],
+                                 self._timeouts[source], self._errors[source]) for source in UNIVERSAL_SOURCES}
+
+        metrics: Dict[str, Any] = {"workers": self.max_workers, "timeout_seconds": self.timeout_seconds, "sources": {}}
+        for source, (recent, calls, timeouts, errors) in snapshot.items():
+            stats = {"calls": calls, "timeouts": timeouts, "errors": errors}
+            for name, quantile in (("latency_ms_p50", 0.5), ("latency_ms_p95", 0.95), ("latency_ms_p99", 0.99)):
+                stats[name] = recent[min(len(recent) - 1, int(quantile * len(recent)))] if recent else 0.0
+            stats["latency_ms_max"] = recent[-1] if recent else 0.0
+            metrics["sources"][source] = stats
+        return metrics
+
+    def shutdown(self) -> None:
+        """Arrête le pool de threads sans attendre les recherches en cours"""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _search_source(self, source: str, query: str, limit: int, after: Optional[After] = None,
+                       cursor_engine: Optional[str] = None) -> Tuple[List[Any], float, Optional[str]]:
+        start = time.perf_counter()
+        db = self.session_factory()
+        try:
+            timeout_ms = int(self.timeout_seconds * 1000)
+            DatabaseService(db).set_statement_timeout(timeout_ms)
+            search_service = SearchService(db, self.backend, catalog=self.catalog, statement_timeout_ms=timeout_ms)
+            corpus = FACET_CORPORA[source]
+            if cursor_engine is not None:
+                search_service.cursor_engines[corpus] = cursor_engine
+            found = search_service.fetch_source(source, query, limit, after)
+            engine = search_service.served_engines.get(corpus)
+        except Exception:
+            with self._lock:
+                self._errors[source] += 1
+            raise
+        finally:
+            db.close()
+
+        elapsed = round((time.perf_counter() - start) * 1000, 1)
+        with self._lock:
+            self._calls[source] += 1
+            self._latencies[source].append(elapsed)
+        return found, elapsed, engine
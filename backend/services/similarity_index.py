@@ -0,0 +1,179 @@
+"""
+Index des plus proches voisins des profils heptuple (sourates et versets)
+
+Les profils (7 scores) sont ramenés à la norme 1 et rangés dans une matrice
+float32 contiguë : la similarité cosinus de tous les éléments avec un profil
+requête est un seul produit matrice-vecteur, et les k meilleurs voisins sont
+extraits par sélection partielle (argpartition) plutôt que par un tri complet.
+Sans NumPy, les mêmes calculs sont faits en Python pur sur le même tampon.
+"""
+import heapq
+import math
+import threading
+import time
+from array import array
+from itertools import chain
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from database import PROFILE_DIMENSIONS, DatabaseService
+from models import ProfilHeptuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+SIMILARITY_TYPES = ("sourates", "versets")
+SIMILARITY_MAX_K = 100
+
+PROFILE_COLUMNS = [f"{dimension}_score" for dimension in PROFILE_DIMENSIONS]
+DIMENSION_COUNT = len(PROFILE_COLUMNS)
+
+
+def unit_vector(profile: Sequence[float]) -> Optional[List[float]]:
+    """Profil ramené à la norme 1 (None pour un profil nul, sans direction)"""
+    norm = math.sqrt(sum(value * value for value in profile))
+    if norm == 0:
+        return None
+    return [value / norm for value in profile]
+
+
+def profile_scores(profil: Any) -> List[int]:
+    """Les 7 scores d'une ligne profils_heptuple ou profils_versets (0 si absent)"""
+    return [getattr(profil, column) or 0 for column in PROFILE_COLUMNS]
+
+
+class ProfileMatrix:
+    """Profils d'un type d'élément : matrice float32 n×7 des profils normalisés et description des éléments.
+
+    Les lignes sont rangées par identifiant croissant ; à similarité égale,
+    le voisin d'identifiant le plus petit vient en premier.
+    """
+
+    __slots__ = ("ids", "items", "positions", "profiles", "matrix")
+
+    def __init__(self, ids: List[int], profiles: List[List[int]], items: List[Dict[str, Any]]):
+        self.ids = ids
+        self.profiles = profiles
+        self.items = items
+        self.positions = {item_id: position for position, item_id in enumerate(ids)}
+        # Un profil nul reste dans la matrice avec une similarité nulle à tout profil
+        flat = array('f', chain.from_iterable(unit_vector(p) or [0.0] * DIMENSION_COUNT for p in profiles))
+        self.matrix = np.frombuffer(flat, dtype=np.float32).reshape(len(ids), DIMENSION_COUNT) if np is not None else flat
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def profile(self, item_id: int) -> Optional[List[int]]:
+        position = self.positions.get(item_id)
+        return None if position is None else self.profiles[position]
+
+    def nearest(self, profile: Sequence[float], k: int, exclude: Optional[int] = None) -> List[Tuple[int, float]]:
+        """(position, similarité cosinus) des k profils les plus proches, par similarité décroissante"""
+        query = unit_vector(profile)
+        if query is None or not self.ids:
+            return []
+        excluded = self.positions.get(exclude) if exclude is not None else None
+
+        if np is not None:
+            similarities = self.matrix @ np.asarray(query, dtype=np.float32)
+            if excluded is not None:
+                similarities[excluded] = -np.inf
+            k = min(k, len(self.ids) - (excluded is not None))
+            if k <= 0:
+                return []
+            top = np.argpartition(-similarities, k - 1)[:k] if k < len(self.ids) else np.arange(len(self.ids))
+            top = top[np.lexsort((top, -similarities[top]))]
+            return [(int(position), float(similarities[position])) for position in top]
+
+        scored = (
+            (sum(q * m for q, m in zip(query, self.matrix[start:start + DIMENSION_COUNT])), -position)
+            for position, start in enumerate(range(0, len(self.matrix), DIMENSION_COUNT))
+            if position != excluded
+        )
+        return [(-negated, similarity) for similarity, negated in heapq.nlargest(k, scored)]
+
+
+class SimilarityIndex:
+    """Voisins les plus proches des sourates et versets par leur profil heptuple.
+
+    Les profils de sourates sont les plus récents de profils_heptuple, ceux
+    des versets les profils précalculés à jour pour l'analyseur et le lexique
+    courants (job jobs.precompute_verse_profiles). L'index est rechargé en
+    entier à chaque rafraîchissement : quelques milliers de lignes de 7 entiers.
+    """
+
+    name = "similarity"
+
+    def __init__(self, analyzer: Any):
+        self.analyzer = analyzer
+        self.matrices: Dict[str, ProfileMatrix] = {kind: ProfileMatrix([], [], []) for kind in SIMILARITY_TYPES}
+        self.ready = False
+        self._build_lock = threading.Lock()
+        self._stats = {"builds": 0, "last_build_ms": None}
+
+    @property
+    def backend(self) -> str:
+        """Implémentation utilisée : ``numpy`` ou ``python``"""
+        return "numpy" if np is not None else "python"
+
+    def build(self, db: Session) -> Dict[str, int]:
+        """Recharge les profils puis substitue les nouvelles matrices aux matrices courantes"""
+        with self._build_lock:
+            start = time.perf_counter()
+            db_service = DatabaseService(db)
+
+            sourates = db_service.get_sourates_with_latest_profile()
+            versets = db_service.get_current_verse_profiles(self.analyzer.VERSION, self.analyzer.lexicon_hash)
+            self.matrices = {
+                "sourates": ProfileMatrix(
+                    [s.id for s, _ in sourates],
+                    [profile_scores(profil) for _, profil in sourates],
+                    [{"numero": s.numero, "nom_arabe": s.nom_arabe, "nom_francais": s.nom_francais} for s, _ in sourates],
+                ),
+                "versets": ProfileMatrix(
+                    [verset_id for verset_id, _, _, _ in versets],
+                    [profile_scores(profil) for _, _, _, profil in versets],
+                    [{"sourate_id": sourate_id, "numero_verset": numero} for _, sourate_id, numero, _ in versets],
+                ),
+            }
+            self.ready = True
+            self._stats["builds"] += 1
+            self._stats["last_build_ms"] = round((time.perf_counter() - start) * 1000, 1)
+            return {kind: len(matrix) for kind, matrix in self.matrices.items()}
+
+    def refresh(self, db: Session) -> Dict[str, int]:
+        return self.build(db)
+
+    def profile(self, kind: str, item_id: int) -> Optional[List[int]]:
+        """Profil indexé d'une sourate ou d'un verset (None s'il n'est pas indexé)"""
+        return self.matrices[kind].profile(item_id)
+
+    def similar(self, profile: Sequence[float], types: Sequence[str], k: int = 10,
+                exclude: Optional[Tuple[str, int]] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """k plus proches voisins d'un profil pour chaque type demandé, par similarité décroissante"""
+        results = {}
+        for kind in types:
+            matrix = self.matrices[kind]
+            excluded = exclude[1] if exclude and exclude[0] == kind else None
+            results[kind] = [
+                {
+                    "id": matrix.ids[position],
+                    "similarity": round(similarity, 4),
+                    **matrix.items[position],
+                    "profil_heptuple": dict(zip(ProfilHeptuple.model_fields, matrix.profiles[position])),
+                }
+                for position, similarity in matrix.nearest(profile, k, excluded)
+            ]
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Taille des matrices, implémentation et durée de construction"""
+        return {
+            "ready": self.ready,
+            "backend": self.backend,
+            "profiles": {kind: len(matrix) for kind, matrix in self.matrices.items()},
+            **self._stats,
+        }
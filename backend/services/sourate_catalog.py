@@ -0,0 +1,104 @@
+"""
+Catalogue en mémoire des 114 sourates et de leur profil heptuple le plus récent
+
+Le catalogue est un instantané immuable (tuples nommés, dictionnaires en
+lecture seule) chargé au démarrage : les recherches et comparaisons y lisent
+les sourates par id ou par numéro en O(1), sans requête. Il est relu à
+chaque rafraîchissement et remplacé d'un bloc si son contenu a changé.
+"""
+import threading
+import time
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, NamedTuple, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from database import PROFILE_DIMENSIONS, DatabaseService
+from services.similarity_index import profile_scores
+
+
+class CatalogSourate(NamedTuple):
+    """Sourate du catalogue et scores de son profil heptuple le plus récent (None sans profil)"""
+    id: int
+    numero: int
+    nom_arabe: str
+    nom_francais: str
+    type_revelation: str
+    nombre_versets: int
+    profile: Optional[Tuple[int, ...]]
+
+    def profil_heptuple(self) -> Optional[Dict[str, int]]:
+        """Profil au format des réponses de l'API (dimension -> score)"""
+        return None if self.profile is None else dict(zip(PROFILE_DIMENSIONS, self.profile))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Sourate et profil au format des réponses de l'API"""
+        return {
+            "id": self.id,
+            "numero": self.numero,
+            "nom_arabe": self.nom_arabe,
+            "nom_francais": self.nom_francais,
+            "type_revelation": self.type_revelation,
+            "nombre_versets": self.nombre_versets,
+            "profil_heptuple": self.profil_heptuple(),
+        }
+
+
+class _Snapshot:
+    """Instantané immuable du catalogue, remplacé d'un bloc à chaque changement"""
+
+    __slots__ = ("sourates", "by_id", "by_numero")
+
+    def __init__(self, sourates: Tuple[CatalogSourate, ...]):
+        self.sourates = sourates
+        self.by_id: Mapping[int, CatalogSourate] = MappingProxyType({s.id: s for s in sourates})
+        self.by_numero: Mapping[int, CatalogSourate] = MappingProxyType({s.numero: s for s in sourates})
+
+
+class SourateCatalog:
+    """Sourates et profils heptuple servis depuis la mémoire, construits au démarrage et rafraîchis si modifiés"""
+
+    name = "sourates"
+
+    def __init__(self):
+        self.ready = False
+        self._snapshot = _Snapshot(())
+        self._build_lock = threading.Lock()
+        self._stats = {"builds": 0, "changes": 0, "last_build_ms": None}
+
+    def build(self, db: Session) -> Dict[str, int]:
+        """Relit les sourates et leurs profils puis publie un nouvel instantané s'il diffère du courant"""
+        with self._build_lock:
+            start = time.perf_counter()
+            sourates = tuple(
+                CatalogSourate(s.id, s.numero, s.nom_arabe, s.nom_francais, s.type_revelation, s.nombre_versets,
+                               tuple(profile_scores(s)) if s.profil_id is not None else None)
+                for s in DatabaseService(db).get_sourates_with_profile()
+            )
+            if sourates != self._snapshot.sourates:
+                self._snapshot = _Snapshot(sourates)
+                self._stats["changes"] += 1
+            self.ready = True
+            self._stats["builds"] += 1
+            self._stats["last_build_ms"] = round((time.perf_counter() - start) * 1000, 1)
+            return {"sourates": len(sourates), "profils": sum(s.profile is not None for s in sourates)}
+
+    def refresh(self, db: Session) -> Dict[str, int]:
+        return self.build(db)
+
+    def get(self, sourate_id: int) -> Optional[CatalogSourate]:
+        """Sourate par id (None si absente du catalogue)"""
+        return self._snapshot.by_id.get(sourate_id)
+
+    def get_by_numero(self, numero: int) -> Optional[CatalogSourate]:
+        """Sourate par numéro (None si absente du catalogue)"""
+        return self._snapshot.by_numero.get(numero)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Taille du catalogue et durée de construction"""
+        return {
+            "ready": self.ready,
+            "sourates": len(self._snapshot.sourates),
+            "profils": sum(s.profile is not None for s in self._snapshot.sourates),
+            **self._stats,
+        }
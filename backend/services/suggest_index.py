@@ -0,0 +1,297 @@
+"""
+Index d'autocomplétion par préfixe : noms de sourates, recueils, narrateurs,
+thèmes de fiqh et termes fréquents des corpus
+
+Les libellés normalisés sont rangés dans un tableau trié interrogé par
+dichotomie (bisect) ; les préfixes courts, dont la plage couvre une grande
+partie du vocabulaire, ont leurs meilleures suggestions précalculées. Les
+fréquences sont tenues à jour ligne par ligne : un rafraîchissement ne relit
+que les lignes nouvelles ou modifiées, puis publie un nouvel instantané.
+"""
+import heapq
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from itertools import chain
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from database import FiqhRuling, Hadith, Sourate, Verset
+from services.text_normalizer import tokenize
+
+SUGGEST_TYPES = ("sourate", "recueil", "narrateur", "theme", "terme")
+
+# Nombre maximum de suggestions par requête (et par préfixe précalculé)
+SUGGEST_MAX_LIMIT = 20
+# Longueur maximale des préfixes dont les suggestions sont précalculées
+PRECOMPUTED_PREFIX_LENGTH = 2
+# Un terme n'est proposé qu'à partir de cette longueur et de ce nombre de documents
+MIN_TERM_LENGTH = 3
+MIN_TERM_FREQUENCY = 2
+
+# Mots grammaticaux (forme normalisée) exclus des termes proposés
+STOP_WORDS = frozenset("""
+    les des une est que qui dans pour par sur pas plus avec son ses ont aux ces
+    cette tout tous leur leurs elle ils elles nous vous mais comme sont etre
+    avait fait lui meme ceux celui dont sans sous entre vers donc ainsi
+    the and for with that this from are was were his her their them they not
+    who which what have has had will shall unto upon your you
+    في من على الى عن ان الذي التي ما لا هو هي هم ذلك هذا هذه كان قال ثم او
+""".split())
+
+
+class SuggestSource(NamedTuple):
+    """Table alimentant l'autocomplétion : libellés proposés tels quels et champs découpés en termes"""
+    model: Any
+    # Colonne -> type de suggestion du libellé
+    labels: Dict[str, str]
+    terms: Tuple[str, ...]
+    # Colonne donnant le poids d'un libellé (1 par ligne sinon)
+    weight: Optional[str]
+    # Vrai si la suggestion renvoie à la ligne (id de référence)
+    linked: bool
+    # Colonne de date permettant de repérer les lignes modifiées
+    timestamp: str
+
+
+SUGGEST_SOURCES: Dict[str, SuggestSource] = {
+    "sourates": SuggestSource(
+        model=Sourate,
+        labels={"nom_arabe": "sourate", "nom_francais": "sourate", "nom_anglais": "sourate"},
+        terms=(),
+        weight="nombre_versets",
+        linked=True,
+        timestamp="updated_at",
+    ),
+    "versets": SuggestSource(
+        model=Verset,
+        labels={},
+        terms=("texte_arabe", "traduction_francaise"),
+        weight=None,
+        linked=False,
+        timestamp="updated_at",
+    ),
+    "hadiths": SuggestSource(
+        model=Hadith,
+        labels={"recueil": "recueil", "narrateur": "narrateur"},
+        terms=("texte_francais", "texte_arabe"),
+        weight=None,
+        linked=False,
+        timestamp="updated_at",
+    ),
+    "fiqh": SuggestSource(
+        model=FiqhRuling,
+        labels={"topic": "theme"},
+        terms=("question", "ruling_text"),
+        weight=None,
+        linked=False,
+        timestamp="updated_at",
+    ),
+}
+
+# Suggestion : (type, libellé normalisé) ; contribution d'une ligne : (clé, libellé affiché, poids, id de référence)
+EntryKey = Tuple[str, str]
+Contribution = Tuple[EntryKey, str, int, Optional[int]]
+
+
+def normalize_label(text: str) -> str:
+    """Forme de comparaison d'un libellé ou d'un préfixe : jetons normalisés séparés par une espace"""
+    return " ".join(token for token in tokenize(text).tokens if token)
+
+
+class _Snapshot:
+    """Instantané immuable de l'index, remplacé d'un bloc à chaque mise à jour"""
+
+    __slots__ = ("keys", "key_entries", "entries", "top")
+
+    def __init__(self, entries: List[Tuple[str, str, int, Optional[int]]],
+                 keys: List[str], key_entries: List[int],
+                 top: Dict[str, Dict[str, List[int]]]):
+        # entries[i] = (type, libellé affiché, fréquence, id de référence)
+        self.entries = entries
+        # Clés de recherche triées (libellé normalisé et ses fins de mot) -> suggestion
+        self.keys = keys
+        self.key_entries = key_entries
+        # Préfixe court -> type -> meilleures suggestions par fréquence décroissante
+        self.top = top
+
+    def lookup(self, prefix: str, types: Sequence[str], limit: int) -> List[int]:
+        frequency = lambda index: (self.entries[index][2], -index)
+        if len(prefix) <= PRECOMPUTED_PREFIX_LENGTH:
+            by_type = self.top.get(prefix, {})
+            return heapq.nlargest(limit, chain.from_iterable(by_type.get(kind, ()) for kind in types), key=frequency)
+
+        start = bisect_left(self.keys, prefix)
+        end = bisect_left(self.keys, prefix + "\uffff", start)
+        wanted = set(types)
+        candidates = {index for index in self.key_entries[start:end] if self.entries[index][0] in wanted}
+        return heapq.nlargest(limit, candidates, key=frequency)
+
+
+class SuggestIndex:
+    """Suggestions par préfixe classées par fréquence, construites au démarrage et rafraîchies par incréments"""
+
+    name = "suggest"
+
+    def __init__(self, sources: Optional[Dict[str, SuggestSource]] = None):
+        self.sources = sources or SUGGEST_SOURCES
+        self.ready = False
+        # (type, libellé normalisé) -> [fréquence, libellé affiché, id de référence]
+        self._entries: Dict[EntryKey, List[Any]] = {}
+        # (source, id de ligne) -> contributions de la ligne aux suggestions
+        self._contributions: Dict[Tuple[str, int], Tuple[Contribution, ...]] = {}
+        self._refreshed_at: Dict[str, Any] = {}
+        self._snapshot = _Snapshot([], [], [], {})
+        self._build_lock = threading.Lock()
+        self._stats = {"builds": 0, "refreshes": 0, "last_build_ms": None, "last_refresh_ms": None}
+
+    def build(self, db: Session) -> Dict[str, int]:
+        """Relit toutes les sources puis publie l'instantané"""
+        with self._build_lock:
+            start = time.perf_counter()
+            # Les fréquences sont recomptées de zéro : un échec laisse l'index à reconstruire
+            self.ready = False
+            self._entries = {}
+            self._contributions = {}
+            counts = {}
+            for name, source in self.sources.items():
+                self._refreshed_at[name] = db.query(func.now()).scalar()
+                rows = self._rows(db, source)
+                for row in rows:
+                    self._add_row(name, source, row)
+                counts[name] = len(rows)
+            self._publish()
+            self.ready = True
+            self._stats["builds"] += 1
+            self._stats["last_build_ms"] = round((time.perf_counter() - start) * 1000, 1)
+            return counts
+
+    def refresh(self, db: Session) -> Dict[str, int]:
+        """Recompte les lignes nouvelles, modifiées ou supprimées puis publie l'instantané"""
+        if not self.ready:
+            return self.build(db)
+
+        with self._build_lock:
+            start = time.perf_counter()
+            changes = {}
+            for name, source in self.sources.items():
+                now = db.query(func.now()).scalar()
+                current_ids = {row_id for row_id, in db.query(source.model.id)}
+                known_ids = {row_id for source_name, row_id in self._contributions if source_name == name}
+
+                removed = known_ids - current_ids
+                for row_id in removed:
+                    self._remove_row(name, row_id)
+                timestamp = getattr(source.model, source.timestamp)
+                new_ids = current_ids - known_ids
+                rows = self._rows(db, source, or_(source.model.id.in_(sorted(new_ids)), timestamp >= self._refreshed_at[name]))
+                for row in rows:
+                    self._remove_row(name, row.id)
+                    self._add_row(name, source, row)
+                self._refreshed_at[name] = now
+                changes[name] = len(rows) + len(removed)
+
+            if any(changes.values()):
+                self._publish()
+            self._stats["refreshes"] += 1
+            self._stats["last_refresh_ms"] = round((time.perf_counter() - start) * 1000, 1)
+            return changes
+
+    def suggest(self, prefix: str, types: Optional[Iterable[str]] = None,
+                limit: int = 10) -> List[Dict[str, Any]]:
+        """Suggestions dont un mot commence par ``prefix``, par fréquence décroissante"""
+        normalized = normalize_label(prefix)
+        if not normalized:
+            return []
+        snapshot = self._snapshot
+        indices = snapshot.lookup(normalized, tuple(types or SUGGEST_TYPES), min(limit, SUGGEST_MAX_LIMIT))
+        results = []
+        for index in indices:
+            kind, label, count, ref = snapshot.entries[index]
+            results.append({"text": label, "type": kind, "count": count, "id": ref})
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Taille de l'index et durées de construction et de rafraîchissement"""
+        return {
+            "ready": self.ready,
+            "suggestions": len(self._snapshot.entries),
+            "keys": len(self._snapshot.keys),
+            **self._stats,
+        }
+
+    def _rows(self, db: Session, source: SuggestSource, condition=None) -> List[Any]:
+        names = dict.fromkeys(("id", *source.labels, *source.terms, *([source.weight] if source.weight else [])))
+        query = db.query(*[getattr(source.model, name) for name in names])
+        if condition is not None:
+            query = query.filter(condition)
+        return query.all()
+
+    def _add_row(self, name: str, source: SuggestSource, row: Any) -> None:
+        values = row._mapping
+        contributions: Dict[EntryKey, Contribution] = {}
+        weight = (values[source.weight] or 1) if source.weight else 1
+        ref = values["id"] if source.linked else None
+
+        for column, kind in source.labels.items():
+            label = (values[column] or "").strip()
+            normalized = normalize_label(label)
+            if normalized:
+                contributions[(kind, normalized)] = ((kind, normalized), label, weight, ref)
+
+        # Un terme compte une fois par ligne, quel que soit son nombre d'occurrences
+        for column in source.terms:
+            text = values[column]
+            if not text:
+                continue
+            stream = tokenize(text)
+            for position, token in enumerate(stream.tokens):
+                if len(token) < MIN_TERM_LENGTH or token in STOP_WORDS or token.isdigit():
+                    continue
+                key = ("terme", token)
+                if key not in contributions:
+                    token_start, token_end = stream.offsets(position)
+                    contributions[key] = (key, text[token_start:token_end].casefold(), 1, None)
+
+        for key, label, count, ref_id in contributions.values():
+            entry = self._entries.get(key)
+            if entry is None:
+                self._entries[key] = [count, label, ref_id]
+            else:
+                entry[0] += count
+        self._contributions[(name, values["id"])] = tuple(contributions.values())
+
+    def _remove_row(self, name: str, row_id: int) -> None:
+        for key, _, count, _ in self._contributions.pop((name, row_id), ()):
+            entry = self._entries[key]
+            entry[0] -= count
+            if entry[0] <= 0:
+                del self._entries[key]
+
+    def _publish(self) -> None:
+        """Trie les clés de recherche et précalcule les préfixes courts dans un nouvel instantané"""
+        entries = []
+        keyed: List[Tuple[str, int]] = []
+        for (kind, normalized), (count, label, ref) in self._entries.items():
+            if kind == "terme" and count < MIN_TERM_FREQUENCY:
+                continue
+            index = len(entries)
+            entries.append((kind, label, count, ref))
+            # Un libellé de plusieurs mots se retrouve aussi par le début de chacun de ses mots
+            words = normalized.split(" ")
+            keyed.extend((" ".join(words[position:]), index) for position in range(len(words)))
+        keyed.sort()
+
+        short: Dict[str, Dict[str, set]] = defaultdict(lambda: defaultdict(set))
+        for key, index in keyed:
+            for length in range(1, min(PRECOMPUTED_PREFIX_LENGTH, len(key)) + 1):
+                short[key[:length]][entries[index][0]].add(index)
+        frequency = lambda index: (entries[index][2], -index)
+        top = {
+            prefix: {kind: heapq.nlargest(SUGGEST_MAX_LIMIT, indices, key=frequency) for kind, indices in by_type.items()}
+            for prefix, by_type in short.items()
+        }
+        self._snapshot = _Snapshot(entries, [key for key, _ in keyed], [index for _, index in keyed], top)
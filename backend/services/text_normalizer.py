@@ -0,0 +1,134 @@
+"""
+Normalisation et découpage en jetons des textes analysés (arabe, français, anglais)
+"""
+import re
+import unicodedata
+from array import array
+from collections import Counter
+from functools import lru_cache
+from itertools import accumulate
+from typing import List, Tuple
+
+# Signes diacritiques arabes (tashkeel, marques coraniques) et tatweel : ils
+# font partie du mot et ne doivent pas le couper en plusieurs jetons.
+ARABIC_MARKS = (
+    '\u0610-\u061A\u064B-\u065F\u0670'
+    '\u06D6-\u06DC\u06DF-\u06E8\u06EA-\u06ED'
+)
+TATWEEL = '\u0640'
+
+# Découpage en alternance [mot, séparateur, mot, ...] sur le texte brut
+_SPLIT_PATTERN = re.compile(r'([^\w\u0300-\u036F' + ARABIC_MARKS + TATWEEL + r']+)')
+_ARABIC_CHAR_PATTERN = re.compile(r'[\u0600-\u06FF]')
+
+# Variantes unifiées après décomposition NFKD (les hamzas et madda
+# portées sont des marques combinantes et disparaissent avec elles).
+_ARABIC_UNIFICATION = str.maketrans({
+    '\u0671': '\u0627',  # alef wasla -> alef
+    '\u0649': '\u064A',  # alef maqsura -> ya
+    '\u06CC': '\u064A',  # ya persan -> ya
+    '\u0629': '\u0647',  # ta marbuta -> ha
+    TATWEEL: None,
+})
+
+
+@lru_cache(maxsize=200_000)
+def normalize_token(token: str) -> str:
+    """Normalise un jeton : casse, accents, tashkeel, tatweel et variantes arabes.
+
+    - ``Mystère`` -> ``mystere``
+    - ``الرَّحْمَٰنِ`` -> ``الرحمن``
+    - ``أحد`` / ``إله`` / ``آخرة`` -> ``احد`` / ``اله`` / ``اخره``
+    """
+    decomposed = unicodedata.normalize('NFKD', token.casefold())
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return stripped.translate(_ARABIC_UNIFICATION)
+
+
+def normalize_text(text: str) -> str:
+    """Normalise un texte complet en conservant ses séparateurs"""
+    parts = _SPLIT_PATTERN.split(text)
+    parts[0::2] = [normalize_token(token) for token in parts[0::2]]
+    return ''.join(parts)
+
+
+@lru_cache(maxsize=200_000)
+def _count_arabic_chars(token: str) -> int:
+    return len(_ARABIC_CHAR_PATTERN.findall(token))
+
+
+class TokenStream:
+    """Flux de jetons normalisés d'un texte, produit une seule fois par analyse.
+
+    ``tokens[i]`` est le i-ème mot normalisé, ``separators[i]`` le séparateur
+    brut qui le suit, et ``starts[i]``/``ends[i]`` sa position dans le texte
+    d'origine. ``arabic_chars``/``char_count`` comptent les caractères des
+    mots (bloc arabe / total) pour la détection de langue. Un jeton vide peut apparaître en début ou fin de flux quand le
+    texte commence ou finit par un séparateur.
+    """
+
+    __slots__ = ("text_length", "tokens", "separators", "starts", "ends",
+                 "word_count", "arabic_chars", "char_count")
+
+    def __init__(self, text_length: int, tokens: List[str], separators: List[str],
+                 starts: array, ends: array, word_count: int,
+                 arabic_chars: int, char_count: int):
+        self.text_length = text_length
+        self.tokens = tokens
+        self.separators = separators
+        self.starts = starts
+        self.ends = ends
+        self.word_count = word_count
+        self.arabic_chars = arabic_chars
+        self.char_count = char_count
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def offsets(self, index: int) -> Tuple[int, int]:
+        """Position (début, fin) du jeton ``index`` dans le texte d'origine"""
+        return self.starts[index], self.ends[index]
+
+
+def tokenize(text: str) -> TokenStream:
+    """Découpe et normalise un texte en un flux de jetons réutilisable"""
+    parts = _SPLIT_PATTERN.split(text)
+    raw_tokens = parts[0::2]
+    separators = parts[1::2]
+
+    # Les statistiques de caractères ne sont calculées qu'une fois par mot distinct
+    vocabulary = Counter(raw_tokens)
+    arabic_chars = 0
+    char_count = 0
+    for raw, count in vocabulary.items():
+        arabic_chars += _count_arabic_chars(raw) * count
+        char_count += len(raw) * count
+
+    bounds = list(accumulate(map(len, parts), initial=0))
+    word_count = len(raw_tokens) - vocabulary.get('', 0)
+
+    return TokenStream(
+        text_length=len(text),
+        tokens=list(map(normalize_token, raw_tokens)),
+        separators=separators,
+        starts=array('l', bounds[0::2]),
+        ends=array('l', bounds[1::2]),
+        word_count=word_count,
+        arabic_chars=arabic_chars,
+        char_count=char_count,
+    )
+
+
+def split_complete(text: str) -> Tuple[str, str]:
+    """Sépare un texte partiel en (partie au découpage définitif, reste).
+
+    La partie définitive s'arrête juste avant l'avant-dernier mot : elle finit
+    par un séparateur complet, et le reste (un mot, un séparateur pouvant se
+    prolonger et un mot éventuellement coupé) est à recombiner avec la suite
+    du texte.
+    """
+    parts = _SPLIT_PATTERN.split(text)
+    if len(parts) < 3:
+        return "", text
+    cut = len(text) - sum(map(len, parts[-3:]))
+    return text[:cut], text[cut:]
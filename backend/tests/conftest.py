@@ -0,0 +1,35 @@
+"""
+Fixtures communes : application FastAPI avec authentification et session
+de base de données remplacées (aucun service externe n'est requis)
+"""
+import os
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+
+
+@pytest.fixture
+def user():
+    return MagicMock(id=1, is_active=True)
+
+
+@pytest.fixture
+def db():
+    return MagicMock()
+
+
+@pytest.fixture
+def client(user, db):
+    """Client de test : utilisateur authentifié et session ``db`` injectés dans les routes"""
+    main.app.dependency_overrides[main.get_current_active_user] = lambda: user
+    main.app.dependency_overrides[main.verify_token] = lambda: "test"
+    main.app.dependency_overrides[main.get_db] = lambda: db
+    main.analysis_cache.clear()
+    yield TestClient(main.app, base_url="http://localhost")
+    main.app.dependency_overrides.clear()
@@ -0,0 +1,90 @@
+"""
+Elasticsearch en mémoire pour les tests du moteur de recherche : index,
+alias, _bulk, scan et recherche triée par (score, id) avec search_after
+
+Les documents n'ont pas de pertinence calculée : chaque document correspond
+à toute requête, avec le score brut fixé par le test (``scores``).
+"""
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class _Indices:
+    def __init__(self, client: "FakeElasticsearch"):
+        self.client = client
+
+    def create(self, index: str, mappings: Dict[str, Any], settings: Dict[str, Any]) -> None:
+        assert index not in self.client.indexes, f"index {index} déjà créé"
+        self.client.indexes[index] = {}
+
+    def put_settings(self, index: str, settings: Dict[str, Any]) -> None:
+        pass
+
+    def refresh(self, index: str) -> None:
+        self.client.resolve(index)
+
+    def delete(self, index: str, ignore_unavailable: bool = False) -> None:
+        if index not in self.client.indexes and not ignore_unavailable:
+            raise KeyError(index)
+        self.client.indexes.pop(index, None)
+
+    def exists_alias(self, name: str) -> bool:
+        return name in self.client.aliases
+
+    def get_alias(self, name: str) -> Dict[str, Any]:
+        return {self.client.aliases[name]: {"aliases": {name: {}}}}
+
+    def update_aliases(self, actions: List[Dict[str, Any]]) -> None:
+        for action in actions:
+            (kind, target), = action.items()
+            if kind == "remove":
+                assert self.client.aliases.get(target["alias"]) == target["index"]
+                del self.client.aliases[target["alias"]]
+            else:
+                self.client.aliases[target["alias"]] = target["index"]
+
+
+class FakeElasticsearch:
+    def __init__(self, scores: Optional[Dict[int, float]] = None):
+        # index -> id -> document
+        self.indexes: Dict[str, Dict[int, Dict[str, Any]]] = {}
+        self.aliases: Dict[str, str] = {}
+        # id -> score brut renvoyé pour toute requête (1.0 par défaut)
+        self.scores = scores or {}
+        self.indices = _Indices(self)
+        self.searches = 0
+
+    def resolve(self, name: str) -> Dict[int, Dict[str, Any]]:
+        return self.indexes[self.aliases.get(name, name)]
+
+    def search(self, index: str, query: Dict[str, Any], size: int, sort: Optional[List[Any]] = None,
+               search_after: Optional[List[Any]] = None, **kwargs: Any) -> Dict[str, Any]:
+        self.searches += 1
+        ranked = sorted(((self.scores.get(doc_id, 1.0), doc_id) for doc_id in self.resolve(index)),
+                        key=lambda item: (-item[0], item[1]))
+        if search_after is not None:
+            after_score, after_id = search_after
+            ranked = [(score, doc_id) for score, doc_id in ranked
+                      if score < after_score or (score == after_score and doc_id > after_id)]
+        return {"hits": {"hits": [{"_id": str(doc_id), "sort": [score, doc_id]} for score, doc_id in ranked[:size]]}}
+
+
+class FakeHelpers:
+    """Remplace elasticsearch.helpers (streaming_bulk, scan) pour FakeElasticsearch"""
+
+    @staticmethod
+    def streaming_bulk(client: FakeElasticsearch, actions: Iterable[Dict[str, Any]],
+                       **kwargs: Any) -> Iterator[Tuple[bool, Dict[str, Any]]]:
+        for action in actions:
+            documents = client.resolve(action["_index"])
+            doc_id = int(action["_id"])
+            if action.get("_op_type") == "delete":
+                found = documents.pop(doc_id, None) is not None
+                yield found, {"delete": {"_id": doc_id, "status": 200 if found else 404}}
+            else:
+                documents[doc_id] = action["_source"]
+                yield True, {"index": {"_id": doc_id, "status": 201}}
+
+    @staticmethod
+    def scan(client: FakeElasticsearch, index: str, query: Dict[str, Any], **kwargs: Any) -> Iterator[Dict[str, Any]]:
+        for doc_id in list(client.resolve(index)):
+            yield {"_id": str(doc_id)}
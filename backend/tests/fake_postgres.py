@@ -0,0 +1,74 @@
+"""
+Moteur SQLAlchemy PostgreSQL (psycopg2) sans serveur : les requêtes sont
+compilées et exécutées normalement, une connexion DB-API factice enregistre
+les instructions et renvoie les lignes préparées par le test
+"""
+from typing import Any, Callable, List, Sequence, Tuple
+
+from sqlalchemy import create_engine, event
+
+# Réponse à une instruction SQL : (noms de colonnes, lignes)
+Responder = Callable[[str], Tuple[Sequence[str], List[tuple]]]
+
+
+class _Cursor:
+    def __init__(self, connection: "_Connection"):
+        self.connection = connection
+        self.description = None
+        self.rowcount = -1
+        self._rows: List[tuple] = []
+
+    def execute(self, statement: str, parameters: Any = None) -> None:
+        columns, rows = self.connection.responder(statement)
+        self.description = [(name, None, None, None, None, None, None) for name in columns] or None
+        self._rows = list(rows)
+        self.rowcount = len(self._rows)
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchmany(self, size: int = 1):
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+    def close(self) -> None:
+        pass
+
+
+class _Connection:
+    notices: List[str] = []
+
+    def __init__(self, responder: Responder):
+        self.responder = responder
+
+    def cursor(self, *args, **kwargs) -> _Cursor:
+        return _Cursor(self)
+
+    def commit(self) -> None:
+        pass
+
+    def rollback(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+def no_rows(statement: str) -> Tuple[Sequence[str], List[tuple]]:
+    return (), []
+
+
+def fake_postgres_engine(responder: Responder = no_rows):
+    """Moteur factice et liste (remplie au fil de l'eau) des instructions SQL exécutées"""
+    engine = create_engine("postgresql+psycopg2://", creator=lambda: _Connection(responder), _initialize=False)
+    statements: List[str] = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    return engine, statements
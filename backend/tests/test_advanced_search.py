@@ -0,0 +1,36 @@
+"""
+Recherche avancée : sourates des versets lues dans le catalogue, par id
+"""
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import main
+from database import DatabaseService
+from services.sourate_catalog import SourateCatalog
+
+# Identifiants distincts des numéros : une lecture par numéro renverrait une autre sourate
+SOURATES = [
+    SimpleNamespace(id=11, numero=2, nom_arabe="البقرة", nom_francais="La Vache", type_revelation="Médinoise",
+                    nombre_versets=286, profil_id=None),
+    SimpleNamespace(id=2, numero=112, nom_arabe="الإخلاص", nom_francais="Le Monothéisme pur",
+                    type_revelation="Mecquoise", nombre_versets=4, profil_id=None),
+]
+VERSETS = [
+    (SimpleNamespace(id=7, sourate_id=2, numero_verset=1, texte_arabe="قُلْ هُوَ اللَّهُ أَحَدٌ",
+                     traduction_francaise="Dis : Il est Allah, Unique"), 0.5, {}),
+    (SimpleNamespace(id=8, sourate_id=11, numero_verset=255, texte_arabe="اللَّهُ لَا إِلَٰهَ إِلَّا هُوَ",
+                     traduction_francaise="Allah ! Point de divinité à part Lui"), 0.25, {}),
+]
+
+
+def test_verse_sourates_come_from_catalog(client, monkeypatch):
+    monkeypatch.setattr(main, "sourate_catalog", SourateCatalog())
+    with patch.object(DatabaseService, "get_sourates_with_profile", return_value=SOURATES), \
+         patch.object(DatabaseService, "search_versets_ranked", return_value=VERSETS), \
+         patch.object(DatabaseService, "search_hadiths_ranked", return_value=[]), \
+         patch.object(DatabaseService, "get_sourate_by_numero") as by_numero:
+        response = client.get("/api/v2/search/advanced", params={"query": "Allah"})
+
+    assert response.status_code == 200
+    assert [result["sourate"]["numero"] for result in response.json()] == [112, 2]
+    by_numero.assert_not_called()
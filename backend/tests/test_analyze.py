@@ -0,0 +1,57 @@
+"""
+Analyse d'un texte : sauvegarde de la prédiction IA une seule fois par texte
+"""
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import IntegrityError
+
+from database import AIPrediction
+
+
+class PredictionTable:
+    """Session minimale : ai_predictions avec input_text_hash UNIQUE, comme en base"""
+
+    def __init__(self):
+        self.rows = {}
+
+    def add(self, obj):
+        if isinstance(obj, AIPrediction):
+            if obj.input_text_hash in self.rows:
+                raise IntegrityError("INSERT INTO ai_predictions", {}, Exception("duplicate key"))
+            self.rows[obj.input_text_hash] = obj
+
+    def execute(self, stmt):
+        compiled = stmt.compile(dialect=postgresql.dialect())
+        inserted = 0
+        for name, text_hash in compiled.params.items():
+            if not name.startswith("input_text_hash"):
+                continue
+            if text_hash in self.rows:
+                if "DO NOTHING" not in str(compiled):
+                    raise IntegrityError(str(compiled), {}, Exception("duplicate key"))
+                continue
+            self.rows[text_hash] = compiled.params
+            inserted += 1
+        return type("Result", (), {"rowcount": inserted})()
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+@pytest.fixture
+def db():
+    return PredictionTable()
+
+
+def test_same_text_analyzed_twice_with_different_options(client, db):
+    texte = "Au nom d'Allah, le Tout Miséricordieux, le Très Miséricordieux"
+
+    first = client.post("/api/v2/analyze", json={"texte": texte, "include_details": False})
+    second = client.post("/api/v2/analyze", json={"texte": texte, "include_details": True})
+
+    assert first.status_code == 200
+    assert second.status_code == 200
+    assert len(db.rows) == 1
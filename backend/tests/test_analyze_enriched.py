@@ -0,0 +1,15 @@
+"""
+Analyse enrichie : même présentation de l'analyse que /api/v2/analyze
+"""
+
+
+def test_enriched_analysis_uses_shared_profile_format(client):
+    texte = "Au nom d'Allah, le Tout Miséricordieux, le Très Miséricordieux"
+
+    plain = client.post("/api/v2/analyze", json={"texte": texte}).json()
+    enriched = client.post("/api/v2/analyze-enriched", json={"texte": texte}).json()
+
+    assert enriched["nombre_references"] == 0
+    plain.pop("processing_time_ms")
+    enriched["analyse"].pop("processing_time_ms")
+    assert enriched["analyse"] == plain
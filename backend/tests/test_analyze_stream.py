@@ -0,0 +1,45 @@
+"""
+Analyse en flux : étapes exécutées dans la file bornée de l'exécuteur d'analyse
+"""
+import json
+
+import pytest
+
+import main
+from services.analysis_executor import AnalysisExecutor
+
+TEXTE = "Au nom d'Allah, le Tout Miséricordieux, le Très Miséricordieux. " * 20
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    executor = AnalysisExecutor(main.analyzer, mode="process", max_workers=1, max_queue_size=2)
+    monkeypatch.setattr(main, "analysis_executor", executor)
+    yield executor
+    executor.shutdown()
+
+
+def stream_events(client, **params):
+    response = client.post("/api/v2/analyze/stream", content=TEXTE.encode("utf-8"),
+                           params=params, headers={"Content-Type": "text/plain"})
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+def test_stream_steps_are_counted_by_executor(client, executor):
+    events = stream_events(client, snapshot_every=100)
+
+    assert events[-1]["type"] == "final"
+    # Étapes d'une session à état : un pool de threads, jamais les processus de travail
+    assert executor._pool is None
+    assert executor.get_metrics()["completed"] >= 2
+
+
+def test_stream_rejected_when_queue_is_full(client, executor):
+    executor._in_flight = executor.max_queue_size
+
+    events = stream_events(client)
+
+    assert events[-1]["type"] == "error"
+    assert events[-1]["status_code"] == 503
+    assert executor.get_metrics()["rejected"] == 1
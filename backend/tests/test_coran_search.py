@@ -0,0 +1,31 @@
+"""
+Recherche dans le Coran : une sourate absente du catalogue est lue en base, le verset trouvé est gardé
+"""
+from unittest.mock import MagicMock, patch
+
+from database import DatabaseService
+from services.search_service import POSTGRES_BACKEND, SearchService
+
+
+def verset(verset_id, sourate_id):
+    return MagicMock(id=verset_id, sourate_id=sourate_id, numero_verset=1, texte_arabe="بسم الله",
+                     traduction_francaise="Au nom de Dieu")
+
+
+def sourate(sourate_id):
+    return MagicMock(id=sourate_id, numero=sourate_id, nom_arabe="", nom_francais=f"Sourate {sourate_id}",
+                     type_revelation="Mecquoise", nombre_versets=7)
+
+
+def test_catalog_miss_reads_sourate_from_database():
+    catalog = MagicMock(ready=True)
+    catalog.get.side_effect = lambda sourate_id: sourate(1) if sourate_id == 1 else None
+    ranked = [(verset(10, 1), 0.9, {}), (verset(20, 2), 0.5, {})]
+
+    with patch.object(POSTGRES_BACKEND, "search", return_value=ranked), \
+         patch.object(DatabaseService, "get_sourate_by_id", side_effect=sourate) as from_database:
+        results = SearchService(MagicMock(), catalog=catalog).fetch_source("coran", "Dieu", 10)
+
+    assert [result.verset.id for result in results] == [10, 20]
+    assert [result.sourate.numero for result in results] == [1, 2]
+    from_database.assert_called_once_with(2)
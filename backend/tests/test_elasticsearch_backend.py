@@ -0,0 +1,114 @@
+"""
+Moteur Elasticsearch : pagination par curseur, bascule d'alias et suppression
+des documents orphelins, contre un Elasticsearch en mémoire
+"""
+import itertools
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+import pytest
+
+from services import elasticsearch_backend
+from services.elasticsearch_backend import ElasticsearchBackend, normalize_score
+from tests.fake_elasticsearch import FakeElasticsearch, FakeHelpers
+
+
+class FakeQuery:
+    def __init__(self, session: "FakeSession", rows: List[Dict[str, Any]], columns: int):
+        self.session = session
+        self.rows = rows
+        self.columns = columns
+
+    def filter(self, condition: Any) -> "FakeQuery":
+        # Lignes nouvelles ou modifiées fournies par le test
+        return FakeQuery(self.session, self.session.changed, self.columns)
+
+    def order_by(self, *columns: Any) -> "FakeQuery":
+        return FakeQuery(self.session, sorted(self.rows, key=lambda row: row["id"]), self.columns)
+
+    def yield_per(self, size: int):
+        return iter([SimpleNamespace(_mapping=row) for row in self.rows])
+
+    def scalar(self):
+        return next(self.session.clock)
+
+    def __iter__(self):
+        return iter([(row["id"],) for row in self.rows])
+
+
+class FakeSession:
+    """Session réduite aux lectures de l'indexeur (identifiants, lignes, horloge)"""
+
+    def __init__(self, rows: List[Dict[str, Any]]):
+        self.rows = rows
+        self.changed: List[Dict[str, Any]] = []
+        self.clock = itertools.count()
+
+    def query(self, *columns: Any) -> FakeQuery:
+        return FakeQuery(self, self.rows, len(columns))
+
+
+def ruling(doc_id: int) -> Dict[str, Any]:
+    return {"id": doc_id, "ruling_text": f"avis {doc_id}", "question": "priere", "topic": "salat",
+            "rite": "hanafi", "updated_at": None, "created_at": None}
+
+
+@pytest.fixture(autouse=True)
+def fake_helpers(monkeypatch):
+    monkeypatch.setattr(elasticsearch_backend, "helpers", FakeHelpers)
+
+
+def make_backend(client: FakeElasticsearch) -> ElasticsearchBackend:
+    return ElasticsearchBackend(client=client, prefix="test", corpora={"fiqh": elasticsearch_backend.CORPORA["fiqh"]})
+
+
+def test_cursor_pages_cover_rounded_score_ties():
+    # Scores bruts distincts dont les scores normalisés arrondis sont égaux par paquets,
+    # avec un ordre Elasticsearch (score brut) inverse de l'ordre des identifiants
+    raw_scores = {doc_id: 3.0 + (60 - doc_id) * 0.0004 for doc_id in range(1, 61)}
+    client = FakeElasticsearch(raw_scores)
+    backend = make_backend(client)
+    backend.build(FakeSession([ruling(doc_id) for doc_id in raw_scores]))
+
+    expected = sorted(((doc_id, normalize_score(raw)) for doc_id, raw in raw_scores.items()),
+                      key=lambda item: (-item[1], item[0]))
+    assert len({score for _, score in expected}) < len(expected) / 2
+
+    pages, after = [], None
+    while True:
+        page = backend.search_ids("fiqh", "priere", None, 7, after)
+        pages.extend(page)
+        if len(page) < 7:
+            break
+        after = (page[-1][1], page[-1][0])
+
+    assert pages == expected
+
+
+def test_rebuild_swaps_alias_and_drops_previous_index():
+    client = FakeElasticsearch()
+    backend = make_backend(client)
+    db = FakeSession([ruling(1), ruling(2)])
+
+    backend.build(db)
+    (first,) = client.indexes
+    assert client.aliases == {"test-fiqh": first}
+
+    db.rows.append(ruling(3))
+    assert backend.build(db) == {"fiqh": 3}
+    (second,) = client.indexes
+    assert second != first
+    assert client.aliases == {"test-fiqh": second}
+    assert set(client.indexes[second]) == {1, 2, 3}
+
+
+def test_refresh_deletes_orphans_and_indexes_changes():
+    client = FakeElasticsearch()
+    backend = make_backend(client)
+    db = FakeSession([ruling(1), ruling(2), ruling(3)])
+    backend.build(db)
+
+    db.rows = [ruling(1), ruling(3), ruling(4)]
+    db.changed = [ruling(4)]
+    assert backend.refresh(db) == {"fiqh": 2}
+    assert set(client.resolve("test-fiqh")) == {1, 3, 4}
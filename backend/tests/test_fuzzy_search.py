@@ -0,0 +1,25 @@
+"""
+Recherche approchée : taille de page validée comme pour les autres recherches
+"""
+from unittest.mock import patch
+
+import pytest
+
+import main
+from services.search_service import SearchService
+
+
+@pytest.mark.parametrize("limit", [0, -5])
+def test_fuzzy_search_rejects_non_positive_limit(client, limit):
+    response = client.get("/api/v2/search/fuzzy", params={"query": "fatiha", "limit": limit})
+
+    assert response.status_code == 400
+
+
+def test_fuzzy_search_caps_limit(client):
+    with patch.object(SearchService, "search_fuzzy", return_value={}) as search:
+        response = client.get("/api/v2/search/fuzzy",
+                              params={"query": "fatiha", "limit": main.SEARCH_MAX_PAGE_SIZE + 1})
+
+    assert response.status_code == 200
+    assert search.call_args.args[-1] == main.SEARCH_MAX_PAGE_SIZE
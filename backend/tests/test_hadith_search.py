@@ -0,0 +1,18 @@
+"""
+Recherche de hadiths : correspondance plein texte ou mot-clé exact, les deux indexées (GIN)
+"""
+from sqlalchemy.dialects import postgresql
+
+from database import DatabaseService, Hadith
+
+
+def test_keyword_match_uses_array_containment():
+    search = DatabaseService(None)._hadiths_search("niyya")
+    (condition,) = search.conditions
+    sql = str(condition.compile(dialect=postgresql.dialect()))
+
+    assert "hadiths.mots_cles @> " in sql
+    assert "ANY" not in sql
+    indexed = {tuple(index.columns.keys()) for index in Hadith.__table__.indexes
+               if index.dialect_options["postgresql"]["using"] == "gin"}
+    assert ("mots_cles",) in indexed
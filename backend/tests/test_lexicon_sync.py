@@ -0,0 +1,46 @@
+"""
+Rechargement du lexique : publication dans Redis et synchronisation des autres workers
+"""
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import main
+from services.lexicon import DEFAULT_DIMENSION_KEYWORDS, compute_lexicon_hash, parse_lexicon
+
+CUSTOM_LEXICON = {str(int(dim_id)): {lang: [*words, f"terme{int(dim_id)}"] for lang, words in keywords.items()}
+                  for dim_id, keywords in DEFAULT_DIMENSION_KEYWORDS.items()}
+CUSTOM_VERSION = compute_lexicon_hash(parse_lexicon(CUSTOM_LEXICON))
+
+
+@pytest.fixture(autouse=True)
+def lexicon_file(tmp_path, monkeypatch):
+    path = tmp_path / "lexique.json"
+    path.write_text(json.dumps(CUSTOM_LEXICON), encoding="utf-8")
+    monkeypatch.setenv("LEXICON_FILE", str(path))
+    monkeypatch.setattr(main, "SessionLocal", MagicMock)
+    yield
+    main.analyzer.lexicon.load(DEFAULT_DIMENSION_KEYWORDS, "builtin")
+
+
+def test_reload_publishes_lexicon(client, user):
+    user.role = "admin"
+    with patch.object(main.redis_service, "publish_lexicon", return_value=True) as publish:
+        response = client.post("/api/v2/admin/lexicon/reload", params={"source": "file"})
+
+    assert response.status_code == 200
+    assert response.json()["propagated"] is True
+    publish.assert_called_once_with("file", CUSTOM_VERSION)
+
+
+def test_worker_loads_published_lexicon():
+    published = {"source": "file", "version": CUSTOM_VERSION}
+    with patch.object(main.redis_service, "get_published_lexicon", return_value=published), \
+         patch.object(main.analysis_executor, "reload_lexicon") as reload_pool:
+        assert main.sync_lexicon() is True
+        assert main.analyzer.lexicon_hash == CUSTOM_VERSION
+        # Déjà à jour : rien à recharger
+        assert main.sync_lexicon() is False
+
+    reload_pool.assert_called_once()
@@ -0,0 +1,56 @@
+"""
+Filtres de profil heptuple : seuls les profils de versets à jour (analyseur,
+lexique, texte inchangé) sont comparés aux bornes de scores
+"""
+import pytest
+from sqlalchemy.orm import Session
+
+import main
+from database import DatabaseService
+from services.search_service import SearchService
+from tests.fake_postgres import fake_postgres_engine
+
+CURRENT_PROFILE = ("profils_versets.analyzer_version = ", "profils_versets.lexicon_hash = ",
+                   "profils_versets.texte_hash = md5(versets.texte_arabe)")
+
+
+class Unreachable(Exception):
+    pass
+
+
+def respond(statement):
+    # Seul le SQL envoyé est vérifié : la base ne répond pas
+    raise Unreachable(statement)
+
+
+@pytest.fixture
+def engine():
+    return fake_postgres_engine(respond)
+
+
+def test_versets_by_profile_join_current_profiles(engine):
+    engine, statements = engine
+    with Session(engine) as session, pytest.raises(Unreachable):
+        DatabaseService(session).get_versets_by_profile({"tawhid": (80, None)}, "1.0", "abc")
+
+    (statement,) = statements
+    assert all(condition in statement for condition in CURRENT_PROFILE)
+    assert "profils_versets.tawhid_score >= " in statement
+
+
+def test_search_profile_filter_reads_current_profiles(engine):
+    engine, statements = engine
+    with Session(engine) as session, pytest.raises(Unreachable):
+        search_service = SearchService(session, analyzer=main.analyzer)
+        search_service.search_page("coran", "priere", {"profil": "tawhid>=80"}, 10)
+
+    (statement,) = statements
+    assert "EXISTS" in statement
+    assert all(condition in statement for condition in CURRENT_PROFILE)
+
+
+def test_search_profile_filter_requires_analyzer(engine):
+    engine, _ = engine
+    with Session(engine) as session:
+        with pytest.raises(ValueError):
+            SearchService(session).search_page("coran", "priere", {"profil": "tawhid>=80"}, 10)
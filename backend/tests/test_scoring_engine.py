@@ -0,0 +1,38 @@
+"""
+Scoring par lot : profils identiques à l'analyse texte par texte, en NumPy comme en Python pur
+"""
+import pytest
+
+from services.heptuple_analyzer import HeptupleAnalyzer
+from services.scoring_engine import ScoringEngine, np
+from services.text_normalizer import tokenize
+
+
+@pytest.fixture(scope="module")
+def analyzer():
+    return HeptupleAnalyzer()
+
+
+@pytest.fixture(scope="module")
+def texts(analyzer):
+    texts = ["", "texte sans mot-clé", "the unseen and the creation of the heavens"]
+    for keywords in analyzer.dimension_keywords.values():
+        for lang in ("ar", "fr", "en"):
+            texts.append(" et ".join(keywords[lang][:3]))
+            texts.append(" ".join(keywords[lang][:1] * 4) + " " * 1200)
+    return texts
+
+
+@pytest.mark.parametrize("use_numpy", [
+    False,
+    pytest.param(True, marks=pytest.mark.skipif(np is None, reason="NumPy non installé")),
+])
+def test_batch_matches_per_text_analysis(analyzer, texts, use_numpy):
+    engine = ScoringEngine(analyzer.dimension_keywords, use_numpy=use_numpy)
+    streams = [tokenize(text) for text in texts]
+    batch = engine.score(streams, [analyzer.detect_language(stream) for stream in streams])
+
+    expected = [analyzer.analyze_text_heptuple(text) for text in texts]
+    assert engine.backend == ("numpy" if use_numpy else "python")
+    assert batch.normalized == [result.profil_heptuple.to_array() for result in expected]
+    assert batch.confidence == [result.confidence_scores for result in expected]
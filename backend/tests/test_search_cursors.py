@@ -0,0 +1,68 @@
+"""
+Curseurs de pagination : une position n'est reprise que par le moteur qui l'a classée
+"""
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import main
+from services.pagination import StaleCursorError, decode_engine_after, encode_cursor
+from services.search_backends import MemoryBackend
+from services.search_index import SearchIndex
+from services.search_service import POSTGRES_BACKEND, SearchService
+
+
+def ranked(*ids):
+    return [(MagicMock(id=doc_id), 0.5, {}) for doc_id in ids]
+
+
+@pytest.fixture
+def memory_backend():
+    index = SearchIndex()
+    index.ready = True
+    index.generation = 1
+    backend = MemoryBackend(index)
+    with patch.object(MemoryBackend, "search", return_value=ranked(1, 2)):
+        yield backend
+
+
+def test_page_cursor_records_index_generation(memory_backend):
+    page, cursor = SearchService(MagicMock(), memory_backend).search_page("hadiths", "priere", limit=1)
+
+    assert [item["id"] for item in page] == [1]
+    assert decode_engine_after(cursor) == ((0.5, 1), "memory:1")
+
+
+def test_cursor_from_previous_generation_is_stale(memory_backend):
+    _, cursor = SearchService(MagicMock(), memory_backend).search_page("hadiths", "priere", limit=1)
+    memory_backend.index.generation = 2
+
+    with pytest.raises(StaleCursorError):
+        SearchService(MagicMock(), memory_backend).search_page("hadiths", "priere", limit=1, cursor=cursor)
+
+
+def test_index_cursor_is_not_resumed_by_postgres_fallback(memory_backend):
+    _, cursor = SearchService(MagicMock(), memory_backend).search_page("hadiths", "priere", limit=1)
+
+    with patch.object(MemoryBackend, "search", side_effect=RuntimeError("index indisponible")), \
+         patch.object(POSTGRES_BACKEND, "search") as postgres:
+        with pytest.raises(StaleCursorError):
+            SearchService(MagicMock(), memory_backend).search_page("hadiths", "priere", limit=1, cursor=cursor)
+
+    postgres.assert_not_called()
+
+
+def test_universal_cursor_from_other_engine_is_stale(memory_backend):
+    cursor = encode_cursor(0.5, 1, "hadiths", {"hadiths": "postgres"})
+
+    with pytest.raises(StaleCursorError):
+        SearchService(MagicMock(), memory_backend).search_universal("priere", ["hadiths"], limit=1, cursor=cursor)
+
+
+def test_stale_cursor_returns_400(client, memory_backend, monkeypatch):
+    monkeypatch.setattr(main, "search_backend", memory_backend)
+    cursor = encode_cursor(0.5, 1, "memory:0")
+
+    response = client.get("/api/v2/search/hadiths", params={"query": "priere", "cursor": cursor, "facets": False})
+
+    assert response.status_code == 400
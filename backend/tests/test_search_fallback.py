@@ -0,0 +1,36 @@
+"""
+Repli du moteur de recherche sur PostgreSQL : transaction annulée, pas de requête rejouée
+"""
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from database import DatabaseService
+from services.search_backends import PostgresBackend, SearchBackend
+from services.search_service import POSTGRES_BACKEND, SearchService
+
+ERROR = OperationalError("SELECT", {}, Exception("canceling statement due to statement timeout"))
+
+
+def test_postgres_backend_error_is_not_replayed():
+    with patch.object(PostgresBackend, "search", side_effect=ERROR) as search:
+        with pytest.raises(OperationalError):
+            SearchService(MagicMock(), PostgresBackend()).fetch_source("hadiths", "priere", 10)
+
+    search.assert_called_once()
+
+
+def test_index_error_rolls_back_before_fallback():
+    db = MagicMock()
+    backend = MagicMock(spec=SearchBackend, ready=True)
+    backend.name = "memory"
+    backend.search.side_effect = ERROR
+    calls = []
+    db.rollback.side_effect = lambda: calls.append("rollback")
+
+    with patch.object(DatabaseService, "set_statement_timeout", side_effect=lambda ms: calls.append(ms)), \
+         patch.object(POSTGRES_BACKEND, "search", side_effect=lambda *args: calls.append("postgres") or []):
+        SearchService(db, backend, statement_timeout_ms=2000).fetch_source("fiqh", "priere", 10)
+
+    assert calls == ["rollback", 2000, "postgres"]
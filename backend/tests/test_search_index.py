@@ -0,0 +1,17 @@
+"""
+Rafraîchissement incrémental des index de recherche (moteur, suggestions)
+"""
+import pytest
+
+from services.search_index import CORPORA
+from services.suggest_index import SUGGEST_SOURCES
+
+
+@pytest.mark.parametrize("model, timestamp", [
+    *((spec.model, spec.timestamp) for spec in CORPORA.values()),
+    *((source.model, source.timestamp) for source in SUGGEST_SOURCES.values()),
+])
+def test_refresh_timestamp_tracks_updates(model, timestamp):
+    column = model.__table__.columns[timestamp]
+    assert timestamp == "updated_at"
+    assert column.onupdate is not None
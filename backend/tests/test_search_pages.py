@@ -0,0 +1,24 @@
+"""
+Pages de recherche par source : une erreur de la base n'est pas une fin de résultats
+"""
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+import main
+from services.search_backends import PostgresBackend
+
+
+@pytest.fixture
+def failing_search(monkeypatch):
+    monkeypatch.setattr(main, "search_backend", PostgresBackend())
+    error = OperationalError("SELECT", {}, Exception("canceling statement due to statement timeout"))
+    monkeypatch.setattr(PostgresBackend, "search", MagicMock(side_effect=error))
+
+
+@pytest.mark.parametrize("source", ["coran", "hadiths", "fiqh"])
+def test_database_error_returns_500(client, failing_search, source):
+    response = client.get(f"/api/v2/search/{source}", params={"query": "priere", "facets": False})
+
+    assert response.status_code == 500
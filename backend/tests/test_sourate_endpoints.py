@@ -0,0 +1,40 @@
+"""
+Routes d'une sourate : la sourate est lue dans le catalogue en mémoire, pas en base
+"""
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import main
+from database import DatabaseService
+from services.sourate_catalog import CatalogSourate
+
+SOURATE = CatalogSourate(id=1, numero=1, nom_arabe="الفاتحة", nom_francais="L'Ouverture",
+                         type_revelation="mecquoise", nombre_versets=7, profile=None)
+
+
+@pytest.fixture
+def catalog(monkeypatch):
+    catalog = MagicMock(ready=True)
+    catalog.get_by_numero.side_effect = lambda numero: SOURATE if numero == 1 else None
+    monkeypatch.setattr(main, "sourate_catalog", catalog)
+    with patch.object(DatabaseService, "get_sourate_by_numero") as from_database:
+        yield from_database
+
+
+def test_versets_read_sourate_from_catalog(client, catalog):
+    with patch.object(DatabaseService, "get_versets_with_profiles", return_value=[]) as versets:
+        response = client.get("/api/v2/sourates/1/versets")
+
+    assert response.status_code == 200
+    assert versets.call_args.args[0] == SOURATE.id
+    catalog.assert_not_called()
+
+
+@pytest.mark.parametrize("path", ["/api/v2/sourates/115/versets", "/api/v2/sourates/115/timeline"])
+def test_unknown_sourate_returns_404(client, catalog, path):
+    with patch.object(main.redis_service, "get_cache", return_value=None):
+        response = client.get(path)
+
+    assert response.status_code == 404
+    catalog.assert_not_called()
@@ -0,0 +1,60 @@
+"""
+Liste des sourates : sourates et profil le plus récent lus en une seule requête
+"""
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.orm import Session
+
+import main
+from database import PROFILE_DIMENSIONS, DatabaseService
+from tests.fake_postgres import fake_postgres_engine
+
+COLUMNS = ["id", "numero", "nom_arabe", "nom_francais", "type_revelation", "nombre_versets", "profil_id",
+           *[f"{dimension}_score" for dimension in PROFILE_DIMENSIONS]]
+ROWS = [
+    (1, 1, "الفاتحة", "L'Ouverture", "Mecquoise", 7, 10, 90, 60, 85, 70, 95, 80, 20),
+    (2, 2, "البقرة", "La Vache", "Médinoise", 286, None, None, None, None, None, None, None, None),
+]
+
+
+def respond(statement):
+    if statement.startswith("SELECT"):
+        return COLUMNS, ROWS
+    if "RETURNING" in statement:
+        return ["id"], [(1,)]
+    return (), []
+
+
+@pytest.fixture
+def engine():
+    return fake_postgres_engine(respond)
+
+
+def test_get_sourates_with_profile_runs_one_query(engine):
+    engine, statements = engine
+    with Session(engine) as session:
+        sourates = DatabaseService(session).get_sourates_with_profile()
+
+    assert len(statements) == 1
+    assert "LEFT OUTER JOIN LATERAL" in statements[0]
+    assert [s.numero for s in sourates] == [1, 2]
+    assert sourates[1].profil_id is None
+
+
+def test_list_endpoint_reads_sourates_in_one_query(client, engine):
+    engine, statements = engine
+    session = Session(engine)
+    main.app.dependency_overrides[main.get_db] = lambda: session
+    with patch.object(main.redis_service, "get_cached_sourates", return_value=None), \
+         patch.object(main.redis_service, "cache_sourates"):
+        response = client.get("/api/v2/sourates")
+    session.close()
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body[0]["profil_heptuple"]["tawhid"] == 95
+    assert body[1]["profil_heptuple"] is None
+    # Une lecture, puis la ligne d'audit usage_analytics
+    assert [statement.split()[0] for statement in statements] == ["SELECT", "INSERT"]
+    assert "usage_analytics" in statements[1]
@@ -0,0 +1,60 @@
+"""
+Recherche universelle : une source en erreur est signalée manquante, jamais vide
+"""
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+import main
+from services.search_service import SearchFanout, SearchService
+
+
+def fake_source(self, query, filters, limit, after):
+    raise OperationalError("SELECT ...", {}, Exception("canceling statement due to statement timeout"))
+
+
+def fake_fiqh(self, query, filters, limit, after):
+    return [{"id": 1, "relevance_score": 0.5}]
+
+
+@pytest.fixture
+def failing_hadiths():
+    with patch.object(SearchService, "_search_hadiths", fake_source), \
+         patch.object(SearchService, "_search_fiqh", fake_fiqh), \
+         patch.object(SearchService, "_search_coran", lambda *args: []):
+        yield
+
+
+def test_fanout_reports_failing_source_as_missing(failing_hadiths):
+    fanout = SearchFanout(MagicMock, max_workers=3, timeout_seconds=5)
+    try:
+        results = SearchService(MagicMock(), fanout=fanout).search_universal("priere")
+        metrics = fanout.get_metrics()
+    finally:
+        fanout.shutdown()
+
+    assert results["partial"] is True
+    assert results["missing_sources"] == ["hadiths"]
+    assert [entry["type"] for entry in results["results"]] == ["fiqh"]
+    assert metrics["sources"]["hadiths"]["errors"] == 1
+    assert metrics["sources"]["fiqh"]["errors"] == 0
+
+
+def test_sequential_search_reports_failing_source_as_missing(failing_hadiths):
+    results = SearchService(MagicMock()).search_universal("priere")
+
+    assert results["partial"] is True
+    assert results["missing_sources"] == ["hadiths"]
+    assert results["total_results"] == 1
+
+
+def test_partial_response_is_not_cached(client, failing_hadiths):
+    with patch.object(main.search_fanout, "session_factory", MagicMock), \
+         patch.object(main.redis_service, "get_cached_search_results", return_value=None), \
+         patch.object(main.redis_service, "cache_search_results") as cache:
+        response = client.post("/api/v2/search/universal", json={"query": "priere"})
+
+    assert response.status_code == 200
+    assert response.json()["missing_sources"] == ["hadiths"]
+    cache.assert_not_called()
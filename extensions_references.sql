@@ -17,6 +17,14 @@ CREATE TABLE hadiths (
     mots_cles TEXT[],
     themes TEXT[],
     contexte_historique TEXT,
+    -- Texte arabe normalisé (normalize_arabic, init.sql) pour la recherche
+    texte_arabe_norm TEXT GENERATED ALWAYS AS (normalize_arabic(texte_arabe)) STORED,
+    -- Vecteur plein texte (français, arabe normalisé, narrateur et recueil sans racinisation)
+    search_vector TSVECTOR GENERATED ALWAYS AS (
+        setweight(to_tsvector('french', coalesce(texte_francais, '')), 'A') ||
+        setweight(to_tsvector('arabic', coalesce(normalize_arabic(texte_arabe), '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(narrateur, '') || ' ' || coalesce(recueil, '')), 'C')
+    ) STORED,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
@@ -36,7 +44,19 @@ CREATE TABLE exegeses (
     themes TEXT[],
     references_hadiths INTEGER[],
     langue VARCHAR(10) DEFAULT 'ar',
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    -- Texte arabe normalisé des exégèses en arabe (les autres langues n'en ont pas)
+    texte_arabe_norm TEXT GENERATED ALWAYS AS (
+        CASE WHEN langue IN ('fr', 'en') THEN NULL ELSE normalize_arabic(texte_exegese) END
+    ) STORED,
+    -- Vecteur plein texte (texte dans la configuration de sa langue, arabe normalisé, auteur et ouvrage)
+    search_vector TSVECTOR GENERATED ALWAYS AS (
+        setweight(to_tsvector(CASE langue WHEN 'fr' THEN 'french'::regconfig WHEN 'en' THEN 'english'::regconfig
+            ELSE 'arabic'::regconfig END,
+            coalesce(CASE WHEN langue IN ('fr', 'en') THEN texte_exegese ELSE normalize_arabic(texte_exegese) END, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(auteur, '') || ' ' || coalesce(titre_ouvrage, '')), 'C')
+    ) STORED,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
 -- Table des Citations et Références historiques
@@ -54,6 +74,12 @@ CREATE TABLE citations (
     themes TEXT[],
     mots_cles TEXT[],
     verified BOOLEAN DEFAULT FALSE,
+    -- Vecteur plein texte (texte original sans racinisation, traduction française, auteur)
+    search_vector TSVECTOR GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(texte_original, '')), 'A') ||
+        setweight(to_tsvector('french', coalesce(texte_traduit, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(auteur, '')), 'C')
+    ) STORED,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
@@ -100,6 +126,19 @@ CREATE INDEX idx_citations_themes ON citations USING GIN(themes);
 CREATE INDEX idx_histoires_dimension ON histoires(dimension_heptuple);
 CREATE INDEX idx_histoires_epoque ON histoires(epoque);
 
+-- Index de recherche plein texte (websearch_to_tsquery, ts_rank_cd)
+CREATE INDEX idx_hadiths_search ON hadiths USING GIN(search_vector);
+CREATE INDEX idx_exegeses_search ON exegeses USING GIN(search_vector);
+CREATE INDEX idx_citations_search ON citations USING GIN(search_vector);
+
+-- Index trigrammes pour la recherche approchée des noms (narrateurs, recueils)
+CREATE INDEX idx_hadiths_narrateur_trgm ON hadiths USING GIN(narrateur gin_trgm_ops);
+CREATE INDEX idx_hadiths_recueil_trgm ON hadiths USING GIN(recueil gin_trgm_ops);
+
+-- Date de modification tenue à jour (update_updated_at_column, init.sql) : rafraîchissement des index de recherche
+CREATE TRIGGER update_hadiths_updated_at BEFORE UPDATE ON hadiths FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+CREATE TRIGGER update_exegeses_updated_at BEFORE UPDATE ON exegeses FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
 -- Insertion de hadiths d'exemple pour chaque dimension heptuple
 INSERT INTO hadiths (numero_hadith, recueil, livre, chapitre, texte_arabe, texte_francais, narrateur, degre_authenticite, dimension_heptuple, mots_cles, themes, contexte_historique) VALUES
 -- Dimension Mystères
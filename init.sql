@@ -5,6 +5,18 @@
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 CREATE EXTENSION IF NOT EXISTS "pg_trgm";
 
+-- Normalisation arabe identique à services.text_normalizer.normalize_token :
+-- décomposition NFKD, suppression des marques combinantes (tashkeel, hamzas et
+-- madda portées, marques coraniques), alef wasla -> alef, alef maqsura et ya
+-- persan -> ya, ta marbuta -> ha, suppression du tatweel
+CREATE OR REPLACE FUNCTION normalize_arabic(texte TEXT) RETURNS TEXT AS $$
+    SELECT translate(
+        regexp_replace(normalize(lower(texte), NFKD), '[\u0300-\u036F\u0610-\u061A\u064B-\u065F\u0670\u06D6-\u06DC\u06DF-\u06E4\u06E7-\u06E8\u06EA-\u06ED\u08CA-\u08E1\u08E3-\u08FF]', '', 'g'),
+        U&'\0671\0649\06CC\0629\0640',
+        U&'\0627\064A\064A\0647'
+    )
+$$ LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE;
+
 -- Table des utilisateurs
 CREATE TABLE users (
     id SERIAL PRIMARY KEY,
@@ -66,14 +78,46 @@ CREATE TABLE versets (
     texte_translitteration TEXT,
     traduction_francaise TEXT,
     traduction_anglaise TEXT,
+    -- Texte arabe normalisé (sans tashkeel, hamzas et alef unifiés) pour la recherche
+    texte_arabe_norm TEXT GENERATED ALWAYS AS (normalize_arabic(texte_arabe)) STORED,
     dimension_principale INTEGER CHECK (dimension_principale >= 1 AND dimension_principale <= 7),
     dimensions_secondaires INTEGER[] DEFAULT '{}',
     mots_cles JSONB DEFAULT '[]',
     notes_exegetiques TEXT,
     created_at TIMESTAMP DEFAULT NOW(),
+    updated_at TIMESTAMP DEFAULT NOW(),
     UNIQUE(sourate_id, numero_verset)
 );
 
+-- Table des profils heptuple précalculés des versets (job jobs.precompute_verse_profiles)
+CREATE TABLE profils_versets (
+    verset_id INTEGER PRIMARY KEY REFERENCES versets(id) ON DELETE CASCADE,
+    mysteres_score INTEGER CHECK (mysteres_score >= 0 AND mysteres_score <= 100),
+    creation_score INTEGER CHECK (creation_score >= 0 AND creation_score <= 100),
+    attributs_score INTEGER CHECK (attributs_score >= 0 AND attributs_score <= 100),
+    eschatologie_score INTEGER CHECK (eschatologie_score >= 0 AND eschatologie_score <= 100),
+    tawhid_score INTEGER CHECK (tawhid_score >= 0 AND tawhid_score <= 100),
+    guidance_score INTEGER CHECK (guidance_score >= 0 AND guidance_score <= 100),
+    egarement_score INTEGER CHECK (egarement_score >= 0 AND egarement_score <= 100),
+    dimension_principale INTEGER CHECK (dimension_principale >= 1 AND dimension_principale <= 7),
+    confidence_score DECIMAL(3,2) CHECK (confidence_score >= 0 AND confidence_score <= 1),
+    analyzer_version VARCHAR(20) NOT NULL,
+    lexicon_hash VARCHAR(64) NOT NULL,
+    texte_hash VARCHAR(32) NOT NULL,
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
+-- Table du lexique des mots-clés par dimension (rechargé à chaud, LEXICON_SOURCE=db)
+CREATE TABLE lexique_heptuple (
+    id SERIAL PRIMARY KEY,
+    dimension INTEGER NOT NULL CHECK (dimension >= 1 AND dimension <= 7),
+    langue VARCHAR(2) NOT NULL CHECK (langue IN ('ar', 'fr', 'en')),
+    terme VARCHAR(200) NOT NULL,
+    actif BOOLEAN DEFAULT true,
+    created_at TIMESTAMP DEFAULT NOW(),
+    UNIQUE(dimension, langue, terme)
+);
+
 -- Table des analyses exégétiques
 CREATE TABLE analyses_exegetiques (
     id SERIAL PRIMARY KEY,
@@ -179,7 +223,18 @@ CREATE INDEX idx_sourates_numero ON sourates(numero);
 CREATE INDEX idx_sourates_type ON sourates(type_revelation);
 CREATE INDEX idx_versets_sourate ON versets(sourate_id);
 CREATE INDEX idx_versets_dimension ON versets(dimension_principale);
-CREATE INDEX idx_profils_sourate ON profils_heptuple(sourate_id);
+-- Profil le plus récent par sourate (LEFT JOIN LATERAL de la liste des sourates) lu dans l'index seul
+CREATE INDEX idx_profils_sourate_latest ON profils_heptuple(sourate_id, created_at DESC NULLS LAST, id DESC)
+    INCLUDE (mysteres_score, creation_score, attributs_score, eschatologie_score, tawhid_score, guidance_score, egarement_score);
+CREATE INDEX idx_profils_versets_version ON profils_versets(analyzer_version, lexicon_hash);
+-- Un index par dimension : les filtres de bornes sur plusieurs dimensions sont combinés (BitmapAnd)
+CREATE INDEX idx_profils_versets_mysteres ON profils_versets(mysteres_score);
+CREATE INDEX idx_profils_versets_creation ON profils_versets(creation_score);
+CREATE INDEX idx_profils_versets_attributs ON profils_versets(attributs_score);
+CREATE INDEX idx_profils_versets_eschatologie ON profils_versets(eschatologie_score);
+CREATE INDEX idx_profils_versets_tawhid ON profils_versets(tawhid_score);
+CREATE INDEX idx_profils_versets_guidance ON profils_versets(guidance_score);
+CREATE INDEX idx_profils_versets_egarement ON profils_versets(egarement_score);
 CREATE INDEX idx_analyses_verset ON analyses_exegetiques(verset_id);
 CREATE INDEX idx_analyses_dimension ON analyses_exegetiques(dimension_ciblee);
 CREATE INDEX idx_ai_predictions_hash ON ai_predictions(input_text_hash);
@@ -188,7 +243,11 @@ CREATE INDEX idx_study_sessions_user ON study_sessions(user_id);
 
 -- Index pour recherche textuelle
 CREATE INDEX idx_versets_texte_gin ON versets USING gin(to_tsvector('french', traduction_francaise));
-CREATE INDEX idx_versets_arabe_gin ON versets USING gin(to_tsvector('arabic', texte_arabe));
+CREATE INDEX idx_versets_arabe_gin ON versets USING gin(to_tsvector('arabic', texte_arabe_norm));
+
+-- Index trigrammes pour la recherche approchée (opérateurs % et <% de pg_trgm)
+CREATE INDEX idx_sourates_nom_francais_trgm ON sourates USING gin(nom_francais gin_trgm_ops);
+CREATE INDEX idx_versets_translitteration_trgm ON versets USING gin(texte_translitteration gin_trgm_ops);
 
 -- Insertion des données de base - Les 114 sourates
 INSERT INTO sourates (numero, nom_arabe, nom_francais, nom_anglais, type_revelation, nombre_versets, ordre_revelation) VALUES
@@ -227,6 +286,114 @@ INSERT INTO versets (sourate_id, numero_verset, texte_arabe, traduction_francais
 (1, 6, 'اهْدِنَا الصِّرَاطَ الْمُسْتَقِيمَ', 'Guide-nous dans le droit chemin', 6, '["guidance", "droit chemin", "voie"]'),
 (1, 7, 'صِرَاطَ الَّذِينَ أَنْعَمْتَ عَلَيْهِمْ غَيْرِ الْمَغْضُوبِ عَلَيْهِمْ وَلَا الضَّالِّينَ', 'le chemin de ceux que Tu as comblés de faveurs, non pas de ceux qui ont encouru Ta colère, ni des égarés', 7, '["chemin", "faveurs", "colère", "égarés", "guidance"]);
 
+-- Lexique initial des mots-clés par dimension (identique au lexique intégré de l'analyseur)
+INSERT INTO lexique_heptuple (dimension, langue, terme) VALUES
+(1, 'ar', 'غيب'),
+(1, 'ar', 'سر'),
+(1, 'ar', 'مجهول'),
+(1, 'ar', 'خفية'),
+(1, 'ar', 'أسرار'),
+(1, 'fr', 'mystère'),
+(1, 'fr', 'secret'),
+(1, 'fr', 'inconnu'),
+(1, 'fr', 'caché'),
+(1, 'fr', 'mystérieux'),
+(1, 'en', 'mystery'),
+(1, 'en', 'secret'),
+(1, 'en', 'unknown'),
+(1, 'en', 'hidden'),
+(1, 'en', 'mysterious'),
+(2, 'ar', 'خلق'),
+(2, 'ar', 'خلقنا'),
+(2, 'ar', 'السماء'),
+(2, 'ar', 'الأرض'),
+(2, 'ar', 'الكون'),
+(2, 'fr', 'création'),
+(2, 'fr', 'créé'),
+(2, 'fr', 'ciel'),
+(2, 'fr', 'terre'),
+(2, 'fr', 'univers'),
+(2, 'en', 'creation'),
+(2, 'en', 'created'),
+(2, 'en', 'heaven'),
+(2, 'en', 'earth'),
+(2, 'en', 'universe'),
+(3, 'ar', 'الرحمن'),
+(3, 'ar', 'الرحيم'),
+(3, 'ar', 'العزيز'),
+(3, 'ar', 'الحكيم'),
+(3, 'ar', 'السميع'),
+(3, 'fr', 'miséricordieux'),
+(3, 'fr', 'sage'),
+(3, 'fr', 'puissant'),
+(3, 'fr', 'entendant'),
+(3, 'fr', 'voyant'),
+(3, 'en', 'merciful'),
+(3, 'en', 'wise'),
+(3, 'en', 'powerful'),
+(3, 'en', 'hearing'),
+(3, 'en', 'seeing'),
+(4, 'ar', 'القيامة'),
+(4, 'ar', 'الآخرة'),
+(4, 'ar', 'الجنة'),
+(4, 'ar', 'النار'),
+(4, 'ar', 'الحساب'),
+(4, 'fr', 'résurrection'),
+(4, 'fr', 'au-delà'),
+(4, 'fr', 'paradis'),
+(4, 'fr', 'enfer'),
+(4, 'fr', 'jugement'),
+(4, 'en', 'resurrection'),
+(4, 'en', 'hereafter'),
+(4, 'en', 'paradise'),
+(4, 'en', 'hell'),
+(4, 'en', 'judgment'),
+(5, 'ar', 'الله'),
+(5, 'ar', 'واحد'),
+(5, 'ar', 'أحد'),
+(5, 'ar', 'لا إله إلا الله'),
+(5, 'ar', 'التوحيد'),
+(5, 'fr', 'dieu'),
+(5, 'fr', 'un'),
+(5, 'fr', 'unique'),
+(5, 'fr', 'unicité'),
+(5, 'fr', 'adoration'),
+(5, 'en', 'god'),
+(5, 'en', 'one'),
+(5, 'en', 'unique'),
+(5, 'en', 'oneness'),
+(5, 'en', 'worship'),
+(6, 'ar', 'الهداية'),
+(6, 'ar', 'الرشد'),
+(6, 'ar', 'الصراط المستقيم'),
+(6, 'ar', 'الخير'),
+(6, 'ar', 'الحق'),
+(6, 'fr', 'guidance'),
+(6, 'fr', 'droiture'),
+(6, 'fr', 'chemin droit'),
+(6, 'fr', 'bien'),
+(6, 'fr', 'vérité'),
+(6, 'en', 'guidance'),
+(6, 'en', 'righteousness'),
+(6, 'en', 'straight path'),
+(6, 'en', 'good'),
+(6, 'en', 'truth'),
+(7, 'ar', 'الضلال'),
+(7, 'ar', 'الغواية'),
+(7, 'ar', 'الشر'),
+(7, 'ar', 'الباطل'),
+(7, 'ar', 'الظلم'),
+(7, 'fr', 'égarement'),
+(7, 'fr', 'tentation'),
+(7, 'fr', 'mal'),
+(7, 'fr', 'faux'),
+(7, 'fr', 'injustice'),
+(7, 'en', 'misguidance'),
+(7, 'en', 'temptation'),
+(7, 'en', 'evil'),
+(7, 'en', 'false'),
+(7, 'en', 'injustice');
+
 -- Fonctions utilitaires
 CREATE OR REPLACE FUNCTION update_updated_at_column()
 RETURNS TRIGGER AS $$
@@ -239,6 +406,7 @@ $$ language 'plpgsql';
 -- Triggers pour mise à jour automatique des timestamps
 CREATE TRIGGER update_users_updated_at BEFORE UPDATE ON users FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 CREATE TRIGGER update_sourates_updated_at BEFORE UPDATE ON sourates FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+CREATE TRIGGER update_versets_updated_at BEFORE UPDATE ON versets FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 CREATE TRIGGER update_study_sessions_updated_at BEFORE UPDATE ON study_sessions FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
 -- Vue pour les statistiques des dimensions
@@ -303,6 +471,8 @@ FROM profils_heptuple;
 COMMENT ON TABLE sourates IS 'Table contenant les 114 sourates du Coran avec leurs métadonnées';
 COMMENT ON TABLE profils_heptuple IS 'Profils heptuple des sourates selon la vision de la Fatiha';
 COMMENT ON TABLE versets IS 'Versets individuels avec leurs traductions et classifications';
+COMMENT ON TABLE lexique_heptuple IS 'Mots-clés de l''analyseur heptuple par dimension et par langue';
+COMMENT ON TABLE profils_versets IS 'Profils heptuple précalculés des versets, par version d''analyseur et de lexique';
 COMMENT ON TABLE analyses_exegetiques IS 'Analyses exégétiques traditionnelles et modernes';
 COMMENT ON TABLE users IS 'Utilisateurs de la plateforme (experts, chercheurs, etc.)';
 COMMENT ON TABLE ai_predictions IS 'Cache des prédictions IA pour optimiser les performances';